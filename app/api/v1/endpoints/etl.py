@@ -2,23 +2,36 @@ import asyncio
 import json
 import os
 import uuid
-
-from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect, status
-from fastapi.responses import FileResponse, JSONResponse
+from typing import Any, Dict, Optional
+
+from fastapi import (
+    APIRouter,
+    Header,
+    HTTPException,
+    Query,
+    Response,
+    WebSocket,
+    WebSocketDisconnect,
+    status,
+)
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 
 from app.core.config import settings
+from app.core.constants import JobStatus
 from app.models.schemas import ETLJobRequest, ETLJobResult
 from app.services.etl_logger import read_log_file
 from app.worker.job_store import (
+    ProgressStream,
+    claim_job,
     compute_request_hash,
-    get_idempotent_job_id,
-    get_job,
+    get_job_async,
+    get_job_versioned_async,
+    job_status,
+    job_version_async,
     list_jobs,
-    save_job,
-    set_idempotent_job_id,
-    subscribe_to_job,
+    wait_for_job_change,
 )
-from app.worker.tasks import run_etl_task
+from app.worker.tasks import enqueue_etl_job, run_etl_task
 
 router = APIRouter()
 
@@ -26,27 +39,23 @@ router = APIRouter()
 # ── helpers ───────────────────────────────────────────────────────────────────
 
 
-def _new_pending_job(job_id: str) -> ETLJobResult:
-    result = ETLJobResult(
-        job_id=job_id,
-        success=False,
-        message="queued",
-        total_rows=0,
-        processed_rows=0,
-        failed_rows=0,
+def _duplicate_response(job: ETLJobResult) -> JSONResponse:
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={
+            "success": True,
+            "message": "Duplicate request — returning existing job.",
+            "job_id": job.job_id,
+            "status": job.message,
+            "idempotent": True,
+        },
     )
-    save_job(result)
-    return result
 
 
 def _dispatch(request: ETLJobRequest, job_id: str) -> None:
     """Send job to Celery worker queue."""
     request_dict = json.loads(request.model_dump_json())
-    run_etl_task.apply_async(
-        kwargs={"request_dict": request_dict, "job_id": job_id},
-        queue="etl.default",
-        task_id=job_id,
-    )
+    enqueue_etl_job(request_dict, job_id)
 
 
 # ── endpoints ─────────────────────────────────────────────────────────────────
@@ -66,22 +75,19 @@ async def run_job(request: ETLJobRequest) -> JSONResponse:
     request_dict = json.loads(request.model_dump_json())
     req_hash = compute_request_hash(request_dict)
 
-    existing_job_id = get_idempotent_job_id(req_hash)
-    if existing_job_id:
-        cached = get_job(existing_job_id)
-        if cached and cached.message not in ("queued", "running"):
-            return JSONResponse(
-                status_code=(
-                    status.HTTP_200_OK
-                    if cached.success
-                    else status.HTTP_422_UNPROCESSABLE_ENTITY
-                ),
-                content={**cached.model_dump(), "idempotent": True},
-            )
-
-    job_id = existing_job_id or str(uuid.uuid4())
-    set_idempotent_job_id(req_hash, job_id)
-    _new_pending_job(job_id)
+    new_job_id = str(uuid.uuid4())
+    job_id, cached = claim_job(req_hash, new_job_id)
+    if job_id != new_job_id:
+        if cached.message in ("queued", "running"):
+            return _duplicate_response(cached)
+        return JSONResponse(
+            status_code=(
+                status.HTTP_200_OK
+                if cached.success
+                else status.HTTP_422_UNPROCESSABLE_ENTITY
+            ),
+            content={**cached.model_dump(), "idempotent": True},
+        )
 
     loop = asyncio.get_event_loop()
     result_dict = await loop.run_in_executor(
@@ -109,24 +115,11 @@ async def run_job_async(request: ETLJobRequest) -> JSONResponse:
     request_dict = json.loads(request.model_dump_json())
     req_hash = compute_request_hash(request_dict)
 
-    existing_job_id = get_idempotent_job_id(req_hash)
-    if existing_job_id:
-        cached = get_job(existing_job_id)
-        if cached:
-            return JSONResponse(
-                status_code=status.HTTP_202_ACCEPTED,
-                content={
-                    "success": True,
-                    "message": "Duplicate request — returning existing job.",
-                    "job_id": existing_job_id,
-                    "status": cached.message,
-                    "idempotent": True,
-                },
-            )
+    new_job_id = str(uuid.uuid4())
+    job_id, cached = claim_job(req_hash, new_job_id)
+    if job_id != new_job_id:
+        return _duplicate_response(cached)
 
-    job_id = str(uuid.uuid4())
-    set_idempotent_job_id(req_hash, job_id)
-    _new_pending_job(job_id)
     _dispatch(request, job_id)
 
     return JSONResponse(
@@ -145,8 +138,33 @@ async def run_job_async(request: ETLJobRequest) -> JSONResponse:
     response_model=ETLJobResult,
     summary="Poll job status / result",
 )
-async def get_job_status(job_id: str) -> JSONResponse:
-    result = get_job(job_id)
+async def get_job_status(
+    job_id: str,
+    wait: float = Query(
+        0,
+        ge=0,
+        le=60,
+        description="With If-None-Match, hold the request up to this many "
+        "seconds until the job changes",
+    ),
+    if_none_match: Optional[str] = Header(None),
+) -> Response:
+    """
+    Returns the job result with an `ETag` that changes whenever the job
+    record is written. Send it back as `If-None-Match` to get an empty 304
+    while nothing has changed — that check reads only the version counter.
+    """
+    version = await job_version_async(job_id)
+    if version is not None and if_none_match == _etag(version):
+        if wait:
+            version = await wait_for_job_change(job_id, version, wait)
+        if version is not None and if_none_match == _etag(version):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers={"ETag": _etag(version)},
+            )
+
+    result, version = await get_job_versioned_async(job_id)
     if not result:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -157,17 +175,38 @@ async def get_job_status(job_id: str) -> JSONResponse:
         if result.message in ("queued", "running")
         else status.HTTP_200_OK
     )
-    return JSONResponse(status_code=http_status, content=result.model_dump())
+    return JSONResponse(
+        status_code=http_status,
+        content=result.model_dump(),
+        headers={"ETag": _etag(version)},
+    )
+
+
+def _etag(version: int) -> str:
+    return f'"{version}"'
 
 
-@router.get("/jobs", summary="List all ETL jobs")
-async def get_all_jobs() -> JSONResponse:
-    jobs = list_jobs()
+@router.get("/jobs", summary="List ETL jobs, newest first")
+async def get_all_jobs(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(
+        None, description="`next_cursor` from the previous page"
+    ),
+    job_status: Optional[JobStatus] = Query(None, alias="status"),
+) -> JSONResponse:
+    try:
+        jobs, next_cursor, total = list_jobs(
+            limit=limit, cursor=cursor, status=job_status
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
     return JSONResponse(
         status_code=status.HTTP_200_OK,
         content={
             "success": True,
-            "total": len(jobs),
+            "total": total,
+            "count": len(jobs),
+            "next_cursor": next_cursor,
             "jobs": [j.model_dump() for j in jobs],
         },
     )
@@ -208,84 +247,142 @@ async def download_invalid_rows(job_id: str) -> FileResponse:
 # ── WebSocket ─────────────────────────────────────────────────────────────────
 
 
+def _result_event(job: ETLJobResult) -> Dict[str, Any]:
+    return {
+        "job_id": job.job_id,
+        "stage": "done" if job.success else "failed",
+        "result": job.model_dump(),
+    }
+
+
+async def _progress_events(job_id: str, last_event_id: Optional[str]):
+    """
+    Yield the job's progress events from the Redis stream, replaying from
+    the start (or after `last_event_id`), then the final job result. Yields
+    None each time a blocking read times out so callers can send keepalives.
+    """
+    async with ProgressStream(job_id, last_event_id) as stream:
+        block_ms: Optional[int] = None  # drain the backlog before blocking
+        while True:
+            events = await stream.read(block_ms)
+            for event in events:
+                yield event
+                if event.get("stage") in ("done", "failed"):
+                    final = await get_job_async(job_id)
+                    if final:
+                        yield _result_event(final)
+                    return
+
+            if not events:
+                # Nothing new: the job may have finished with its stream expired
+                current = await get_job_async(job_id)
+                if current is None or job_status(current) not in (
+                    JobStatus.QUEUED,
+                    JobStatus.RUNNING,
+                ):
+                    if current:
+                        yield _result_event(current)
+                    return
+                if block_ms is not None:
+                    yield None
+                block_ms = ProgressStream.BLOCK_MS
+
+
+@router.get("/events/{job_id}", summary="Live progress as Server-Sent Events")
+async def etl_progress_sse(
+    job_id: str,
+    last_event_id: Optional[str] = Header(None),
+) -> StreamingResponse:
+    """
+    The WebSocket's event stream over plain HTTP (`text/event-stream`).
+    Each message's `id:` is the event_id, so a reconnecting EventSource
+    resumes automatically via the `Last-Event-ID` header.
+    """
+    if await job_version_async(job_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No job found with id '{job_id}'.",
+        )
+
+    async def body():
+        async for event in _progress_events(job_id, last_event_id):
+            if event is None:
+                yield ": keepalive\n\n"
+                continue
+            event_id = event.get("event_id")
+            prefix = f"id: {event_id}\n" if event_id else ""
+            yield f"{prefix}data: {json.dumps(event)}\n\n"
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.websocket("/ws/etl/{job_id}")
-async def etl_progress_ws(websocket: WebSocket, job_id: str):
+async def etl_progress_ws(
+    websocket: WebSocket, job_id: str, last_event_id: Optional[str] = None
+):
     """
     Stream live ETL progress to the client.
 
-    The Celery task publishes JSON events to Redis channel `etl:<job_id>`.
-    This handler subscribes and forwards each event to the WebSocket client.
+    The Celery task appends JSON events to the Redis stream
+    `job:events:<job_id>`. This handler replays the stream from the start
+    (or after `?last_event_id=` when reconnecting), then follows it through
+    the process's shared stream reader and forwards each new event.
 
     Event shape:
         {
             "job_id":   "...",
+            "event_id": "1718000000000-0",
             "stage":    "extract|filter|transform|validate|aggregate|load|done|failed",
             "progress": 0-100,
             "message":  "...",
             // optional: total_rows, processed_rows, failed_rows
         }
-    Connection closes automatically on stage "done" or "failed".
+    After "done" or "failed" the full job result follows and the connection
+    closes.
     """
     await websocket.accept()
 
-    current = get_job(job_id)
-    if not current:
+    if not await get_job_async(job_id):
         await websocket.send_json({"error": f"Job '{job_id}' not found."})
         await websocket.close(code=1008)
         return
 
-    # Send snapshot of current state immediately
-    await websocket.send_json(
-        {
-            "job_id": job_id,
-            "stage": "current_status",
-            "progress": 100 if current.message not in ("queued", "running") else 0,
-            "message": current.message,
-        }
-    )
-
-    if current.message not in ("queued", "running"):
-        await websocket.send_json(
-            {
-                "job_id": job_id,
-                "stage": "done" if current.success else "failed",
-                "result": current.model_dump(),
-            }
-        )
-        await websocket.close()
-        return
-
-    loop = asyncio.get_event_loop()
-    pubsub = await loop.run_in_executor(None, subscribe_to_job, job_id)
-
+    events = _progress_events(job_id, last_event_id)
+    # Watch the socket too, so a client that goes away is noticed at once
+    receiver = asyncio.ensure_future(websocket.receive())
+    reader: Optional[asyncio.Future] = None
     try:
         while True:
-            message = await loop.run_in_executor(
-                None, lambda: pubsub.get_message(timeout=0.1)
+            if reader is None:
+                reader = asyncio.ensure_future(events.__anext__())
+            done, _ = await asyncio.wait(
+                {reader, receiver}, return_when=asyncio.FIRST_COMPLETED
             )
-            if message and message.get("type") == "message":
-                try:
-                    event = json.loads(message["data"])
-                    await websocket.send_json(event)
-                    if event.get("stage") in ("done", "failed"):
-                        final = get_job(job_id)
-                        if final:
-                            await websocket.send_json(
-                                {
-                                    "job_id": job_id,
-                                    "stage": event["stage"],
-                                    "result": final.model_dump(),
-                                }
-                            )
-                        break
-                except (json.JSONDecodeError, RuntimeError):
+            if receiver in done:
+                if receiver.result()["type"] == "websocket.disconnect":
                     break
-            else:
-                await asyncio.sleep(0.05)
-    except WebSocketDisconnect:
+                receiver = asyncio.ensure_future(websocket.receive())
+                continue
+
+            finished, reader = reader, None
+            try:
+                event = finished.result()
+            except StopAsyncIteration:
+                break
+            if event is not None:
+                await websocket.send_json(event)
+    except (WebSocketDisconnect, RuntimeError):
         pass
     finally:
-        await loop.run_in_executor(None, pubsub.close)
+        receiver.cancel()
+        if reader is not None:
+            reader.cancel()
+            await asyncio.gather(reader, return_exceptions=True)
+        await events.aclose()
         try:
             await websocket.close()
         except Exception:
@@ -1,22 +1,63 @@
+import logging
 import os
+from contextlib import suppress
 from datetime import datetime
+from typing import List, Optional
 
-from fastapi import APIRouter, File, HTTPException, UploadFile, status
+from fastapi import APIRouter, File, HTTPException, Query, Request, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
 
 from app.core.config import settings
 from app.core.constants import ALLOWED_EXTENSIONS, MAX_FILE_SIZE
-from app.models.schemas import ColumnInfo, FileUploadResponse
-from app.services.file_processor import FileProcessor
-from app.utils.file_helpers import generate_unique_filename, save_upload_file
+from app.models.schemas import ChunkedUploadInit, ColumnInfo, FileUploadResponse
+from app.services.chunked_upload import (
+    abort_upload,
+    complete_upload,
+    create_upload,
+    upload_filename,
+    upload_state,
+    write_part,
+)
+from app.services.file_processor import (
+    cache_excel_sheets,
+    excel_sheet_names,
+    invalidate_columnar_cache,
+)
+from app.services.file_profile import (
+    build_fast_profile,
+    get_cached_column_stats,
+    get_profile,
+    invalidate_profile,
+    load_profile,
+    save_profile,
+)
+from app.utils.file_helpers import (
+    forget_upload,
+    generate_unique_filename,
+    read_upload_hash,
+    register_upload,
+    release_upload,
+    reuse_upload,
+    save_upload_file,
+)
+from app.worker.tasks import profile_file_task
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
 
 
 @router.post("/upload", response_model=FileUploadResponse, summary="Upload a data file")
-async def upload_file(file: UploadFile = File(...)) -> JSONResponse:
+async def upload_file(
+    file: UploadFile = File(...),
+    fast: Optional[bool] = Query(
+        None,
+        description="Respond with a sampled profile and compute exact stats in "
+        "the background. Defaults to on above FAST_PROFILE_THRESHOLD_MB.",
+    ),
+) -> JSONResponse:
     file_ext = os.path.splitext(file.filename or "")[1].lower()
     if file_ext not in ALLOWED_EXTENSIONS:
         raise HTTPException(
@@ -35,52 +76,258 @@ async def upload_file(file: UploadFile = File(...)) -> JSONResponse:
             detail=f"File too large ({file_size / (1024**3):.2f} GB). Maximum allowed size is {MAX_FILE_SIZE / (1024**3):.0f} GB.",
         )
 
-    unique_filename = generate_unique_filename(file.filename or "upload")
-    file_path = os.path.join(settings.UPLOAD_DIR, unique_filename)
-
+    file_path = os.path.join(
+        settings.UPLOAD_DIR, generate_unique_filename(file.filename or "upload")
+    )
     try:
-        await save_upload_file(file=file, file_path=file_path)
+        sha256 = await save_upload_file(file=file, file_path=file_path)
+        return _ingest_upload(file_path, file_ext, file_size, sha256, fast)
+    except Exception as exc:
+        _discard_upload(file_path)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error processing file: {exc}",
+        )
+    finally:
+        await file.close()
 
-        processor = FileProcessor(file_path=file_path)
-        metadata = processor.get_file_metadata()
 
-        columns = [
-            ColumnInfo(
-                name=col_name,
-                dtype=col_info["dtype"],
-                missing_value_count=col_info["missing_count"],
-                unique_value_count=col_info["unique_count"],
-                sample_values=col_info.get("sample_values", []),
-                suggested_type=col_info.get("suggested_type"),
+def _ingest_upload(
+    file_path: str,
+    file_ext: str,
+    file_size: int,
+    sha256: str,
+    fast: Optional[bool],
+) -> JSONResponse:
+    """Deduplicate, profile and describe a file just written to `file_path`."""
+    # Identical content already stored: take a reference to that file and
+    # reuse its caches
+    file_id = reuse_upload(settings.UPLOAD_DIR, sha256, file_ext)
+    if file_id:
+        os.remove(file_path)
+        stored_path = os.path.join(settings.UPLOAD_DIR, file_id)
+        try:
+            return _describe_upload(
+                stored_path, file_ext, file_size, sha256, fast, deduplicated=True
             )
-            for col_name, col_info in metadata["columns"].items()
-        ]
+        except Exception:
+            _delete_upload(stored_path)  # hand the reference back
+            raise
 
-        return JSONResponse(
-            status_code=status.HTTP_200_OK,
-            content={
-                "success": True,
-                "message": "File uploaded successfully.",
-                "data": {
-                    "file_id": unique_filename,
-                    "table_name": metadata["table_name"],
-                    "row_count": metadata["row_count"],
-                    "column_count": metadata["column_count"],
-                    "has_missing_values": metadata["has_missing_values"],
-                    "columns": [col.model_dump() for col in columns],
-                    "preview": metadata["preview"],
-                },
-            },
+    register_upload(file_path, sha256)
+    return _describe_upload(
+        file_path, file_ext, file_size, sha256, fast, deduplicated=False
+    )
+
+
+def _describe_upload(
+    stored_path: str,
+    file_ext: str,
+    file_size: int,
+    sha256: str,
+    fast: Optional[bool],
+    deduplicated: bool,
+) -> JSONResponse:
+    """Profile a stored upload and build the upload response."""
+    file_id = os.path.basename(stored_path)
+    profile = load_profile(stored_path) if deduplicated else None
+
+    if fast is None:
+        fast = file_size > settings.FAST_PROFILE_THRESHOLD_MB * 1024**2
+    if profile is None and fast:
+        profile = build_fast_profile(stored_path)
+        save_profile(stored_path, profile)
+        if not profile["complete"]:
+            _schedule_full_profile(file_id)
+    elif profile is None:
+        # Profile every column now so info/column-stats are served from cache
+        profile = get_profile(stored_path)
+    metadata = profile["metadata"]
+
+    columns = [
+        ColumnInfo(
+            name=col_name,
+            dtype=col_info["dtype"],
+            missing_value_count=col_info["missing_count"],
+            unique_value_count=col_info["unique_count"],
+            sample_values=col_info.get("sample_values", []),
+            suggested_type=col_info.get("suggested_type"),
         )
+        for col_name, col_info in metadata["columns"].items()
+    ]
+
+    data = {
+        "file_id": file_id,
+        "sha256": sha256,
+        "deduplicated": deduplicated,
+        "table_name": metadata["table_name"],
+        "row_count": metadata["row_count"],
+        "row_count_exact": metadata["row_count_exact"],
+        "profile_complete": profile["complete"],
+        "column_count": metadata["column_count"],
+        "has_missing_values": metadata["has_missing_values"],
+        "columns": [col.model_dump() for col in columns],
+        "preview": metadata["preview"],
+    }
+    if file_ext in (".xls", ".xlsx"):
+        # Other sheets are read with ?sheet= / sheet_name, see /sheets/{file_id}
+        data["sheets"] = excel_sheet_names(stored_path)
+
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "success": True,
+            "message": (
+                "Identical file already uploaded; reusing it."
+                if deduplicated
+                else "File uploaded successfully."
+            ),
+            "data": data,
+        },
+    )
+
+
+def _discard_upload(file_path: str) -> None:
+    if os.path.exists(file_path):
+        os.remove(file_path)
+    invalidate_profile(file_path)
+    invalidate_columnar_cache(file_path)
+    forget_upload(file_path)
+
+
+def _delete_upload(file_path: str) -> bool:
+    """
+    Drop one reference to a stored upload, deleting the file and its caches
+    with the last one. True if the file went.
+    """
+    if not release_upload(file_path):
+        return False
+    with suppress(FileNotFoundError):
+        os.remove(file_path)
+    invalidate_profile(file_path)
+    invalidate_columnar_cache(file_path)
+    return True
+
+
+def _schedule_full_profile(file_id: str) -> None:
+    try:
+        profile_file_task.apply_async(args=[file_id], retry=False)
     except Exception as exc:
-        if os.path.exists(file_path):
-            os.remove(file_path)
+        # The sampled profile stays in place; uploading must not depend on it
+        logger.warning("Could not queue full profile for %s: %s", file_id, exc)
+
+
+# ── resumable chunked upload ──────────────────────────────────────────────────
+
+
+@router.post(
+    "/uploads",
+    status_code=status.HTTP_201_CREATED,
+    summary="Start a resumable chunked upload",
+)
+async def initiate_chunked_upload(request: ChunkedUploadInit) -> JSONResponse:
+    file_ext = os.path.splitext(request.filename)[1].lower()
+    if file_ext not in ALLOWED_EXTENSIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid file type '{file_ext}'. Allowed: {', '.join(sorted(ALLOWED_EXTENSIONS))}",
+        )
+    if request.size > MAX_FILE_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File too large ({request.size / (1024**3):.2f} GB). Maximum allowed size is {MAX_FILE_SIZE / (1024**3):.0f} GB.",
+        )
+    try:
+        # Also sweeps abandoned uploads; keep the disk work off the event loop
+        state = await run_in_threadpool(create_upload, request.filename, request.size)
+    except OSError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_507_INSUFFICIENT_STORAGE,
+            detail=f"Could not reserve space for the upload: {exc}",
+        )
+    return JSONResponse(
+        status_code=status.HTTP_201_CREATED,
+        content={"success": True, "data": state},
+    )
+
+
+@router.put("/uploads/{upload_id}", summary="Upload one part at a byte offset")
+async def upload_part(
+    upload_id: str,
+    request: Request,
+    offset: int = Query(..., ge=0, description="Byte offset of this part"),
+) -> JSONResponse:
+    """
+    The raw request body is written at `offset`. Parts may be sent in any
+    order or in parallel; re-sending a part is harmless.
+    """
+    try:
+        state = await write_part(upload_id, offset, request.stream())
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc))
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    return JSONResponse(
+        status_code=status.HTTP_200_OK, content={"success": True, "data": state}
+    )
+
+
+@router.get("/uploads/{upload_id}", summary="Received and missing byte ranges")
+async def get_chunked_upload(upload_id: str) -> JSONResponse:
+    try:
+        state = upload_state(upload_id)
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc))
+    return JSONResponse(
+        status_code=status.HTTP_200_OK, content={"success": True, "data": state}
+    )
+
+
+@router.post(
+    "/uploads/{upload_id}/complete", summary="Finish a chunked upload and profile it"
+)
+async def complete_chunked_upload(
+    upload_id: str,
+    fast: Optional[bool] = Query(
+        None,
+        description="As for /upload: sampled profile now, exact one in the background.",
+    ),
+) -> JSONResponse:
+    try:
+        filename = upload_filename(upload_id)
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc))
+
+    file_ext = os.path.splitext(filename)[1].lower()
+    file_path = os.path.join(settings.UPLOAD_DIR, generate_unique_filename(filename))
+    try:
+        # Hashing reads the whole file; keep it off the event loop
+        sha256, file_size = await run_in_threadpool(
+            complete_upload, upload_id, file_path
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc))
+
+    try:
+        return _ingest_upload(file_path, file_ext, file_size, sha256, fast)
+    except Exception as exc:
+        _discard_upload(file_path)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error processing file: {exc}",
         )
-    finally:
-        await file.close()
+
+
+@router.delete("/uploads/{upload_id}", summary="Abort a chunked upload")
+async def abort_chunked_upload(upload_id: str) -> JSONResponse:
+    try:
+        abort_upload(upload_id)
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc))
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={"success": True, "message": "Upload aborted."},
+    )
 
 
 @router.get("/list", summary="List all uploaded files")
@@ -89,7 +336,7 @@ async def list_files() -> JSONResponse:
         files = []
         for filename in sorted(os.listdir(settings.UPLOAD_DIR)):
             _, ext = os.path.splitext(filename)
-            if ext.lower() not in ALLOWED_EXTENSIONS:
+            if filename.startswith(".") or ext.lower() not in ALLOWED_EXTENSIONS:
                 continue
             file_path = os.path.join(settings.UPLOAD_DIR, filename)
             stat = os.stat(file_path)
@@ -99,6 +346,7 @@ async def list_files() -> JSONResponse:
                     "filename": os.path.splitext(filename)[0],
                     "extension": ext,
                     "size_bytes": stat.st_size,
+                    "sha256": read_upload_hash(file_path),
                     "uploaded_at": datetime.fromtimestamp(stat.st_ctime).isoformat(),
                 }
             )
@@ -114,19 +362,46 @@ async def list_files() -> JSONResponse:
         )
 
 
+_SHEET_QUERY = Query(None, description="Excel sheet; the first sheet by default")
+
+
+def _check_sheet(file_path: str, sheet: Optional[str]) -> None:
+    if sheet is None:
+        return
+    if not file_path.lower().endswith((".xls", ".xlsx")):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Only Excel files have sheets.",
+        )
+    if sheet not in excel_sheet_names(file_path):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Sheet '{sheet}' not found.",
+        )
+
+
 @router.get("/info/{file_id}", summary="Get metadata for a specific file")
-async def get_file_info(file_id: str) -> JSONResponse:
+async def get_file_info(
+    file_id: str, sheet: Optional[str] = _SHEET_QUERY
+) -> JSONResponse:
     file_path = os.path.join(settings.UPLOAD_DIR, file_id)
     if not os.path.exists(file_path):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="File not found."
         )
+    _check_sheet(file_path, sheet)
 
     try:
-        metadata = FileProcessor(file_path).get_file_metadata()
+        profile = get_profile(file_path, sheet)
         return JSONResponse(
             status_code=status.HTTP_200_OK,
-            content={"success": True, "data": metadata},
+            content={
+                "success": True,
+                "data": {
+                    **profile["metadata"],
+                    "profile_complete": profile["complete"],
+                },
+            },
         )
     except Exception as exc:
         raise HTTPException(
@@ -139,15 +414,18 @@ async def get_file_info(file_id: str) -> JSONResponse:
     "/column-stats/{file_id}/{column_name}",
     summary="Get statistics for a single column",
 )
-async def get_column_stats(file_id: str, column_name: str) -> JSONResponse:
+async def get_column_stats(
+    file_id: str, column_name: str, sheet: Optional[str] = _SHEET_QUERY
+) -> JSONResponse:
     file_path = os.path.join(settings.UPLOAD_DIR, file_id)
     if not os.path.exists(file_path):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="File not found."
         )
+    _check_sheet(file_path, sheet)
 
     try:
-        stats = FileProcessor(file_path).get_column_stats(column_name)
+        stats = get_cached_column_stats(file_path, column_name, sheet)
         return JSONResponse(
             status_code=status.HTTP_200_OK,
             content={"success": True, "data": stats},
@@ -161,6 +439,106 @@ async def get_column_stats(file_id: str, column_name: str) -> JSONResponse:
         )
 
 
+@router.get("/profile/{file_id}", summary="Get statistics for all columns")
+async def get_file_column_profile(
+    file_id: str, sheet: Optional[str] = _SHEET_QUERY
+) -> JSONResponse:
+    file_path = os.path.join(settings.UPLOAD_DIR, file_id)
+    if not os.path.exists(file_path):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="File not found."
+        )
+    _check_sheet(file_path, sheet)
+
+    try:
+        profile = get_profile(file_path, sheet)
+        metadata = profile["metadata"]
+        return JSONResponse(
+            status_code=status.HTTP_200_OK,
+            content={
+                "success": True,
+                "data": {
+                    "file_id": file_id,
+                    "row_count": metadata["row_count"],
+                    "row_count_exact": metadata["row_count_exact"],
+                    "column_count": metadata["column_count"],
+                    "profile_complete": profile["complete"],
+                    "columns": profile["column_stats"],
+                },
+            },
+        )
+    except Exception as exc:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error computing profile: {exc}",
+        )
+
+
+@router.get("/sheets/{file_id}", summary="List the sheets of an Excel file")
+async def list_sheets(file_id: str) -> JSONResponse:
+    file_path = os.path.join(settings.UPLOAD_DIR, file_id)
+    if not os.path.exists(file_path):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="File not found."
+        )
+    if not file_path.lower().endswith((".xls", ".xlsx")):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Only Excel files have sheets.",
+        )
+
+    try:
+        sheets = await run_in_threadpool(excel_sheet_names, file_path)
+        return JSONResponse(
+            status_code=status.HTTP_200_OK,
+            content={"success": True, "data": {"file_id": file_id, "sheets": sheets}},
+        )
+    except Exception as exc:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error reading workbook: {exc}",
+        )
+
+
+@router.post(
+    "/sheets/{file_id}/cache",
+    summary="Parse Excel sheets in parallel into columnar caches",
+)
+async def cache_sheets(
+    file_id: str,
+    sheets: Optional[List[str]] = Query(
+        None, description="Sheets to parse; all sheets when omitted"
+    ),
+) -> JSONResponse:
+    file_path = os.path.join(settings.UPLOAD_DIR, file_id)
+    if not os.path.exists(file_path):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="File not found."
+        )
+    if not file_path.lower().endswith((".xls", ".xlsx")):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Only Excel files have sheets.",
+        )
+
+    try:
+        row_counts = await run_in_threadpool(cache_excel_sheets, file_path, sheets)
+        return JSONResponse(
+            status_code=status.HTTP_200_OK,
+            content={
+                "success": True,
+                "data": {"file_id": file_id, "row_counts": row_counts},
+            },
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc))
+    except Exception as exc:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error parsing sheets: {exc}",
+        )
+
+
 @router.delete("/{file_id}", summary="Delete an uploaded file")
 async def delete_file(file_id: str) -> JSONResponse:
     file_path = os.path.join(settings.UPLOAD_DIR, file_id)
@@ -170,7 +548,8 @@ async def delete_file(file_id: str) -> JSONResponse:
         )
 
     try:
-        os.remove(file_path)
+        # Identical uploads share one file; it goes with the last of them
+        _delete_upload(file_path)
         return JSONResponse(
             status_code=status.HTTP_200_OK,
             content={"success": True, "message": "File deleted successfully."},
@@ -11,14 +11,8 @@ from app.models.schemas import (
     TestConnectionRequest,
 )
 from app.services.db_reader import get_source_schema
-from app.worker.job_store import (
-    compute_request_hash,
-    get_idempotent_job_id,
-    get_job,
-    save_job,
-    set_idempotent_job_id,
-)
-from app.worker.tasks import run_etl_task
+from app.worker.job_store import claim_job, compute_request_hash
+from app.worker.tasks import enqueue_etl_job, run_etl_task
 from app.models.schemas import ETLJobResult
 
 router = APIRouter()
@@ -37,20 +31,21 @@ def _migration_to_etl(req: DBMigrationRequest) -> ETLJobRequest:
         db_destination=req.db_destination,
         batch_size=req.batch_size,
         max_retries=req.max_retries,
+        partitions=req.partitions,
     )
 
 
-def _new_pending(job_id: str) -> ETLJobResult:
-    r = ETLJobResult(
-        job_id=job_id,
-        success=False,
-        message="queued",
-        total_rows=0,
-        processed_rows=0,
-        failed_rows=0,
+def _duplicate(job: ETLJobResult) -> JSONResponse:
+    return JSONResponse(
+        status_code=202,
+        content={
+            "success": True,
+            "message": "Duplicate — returning existing job.",
+            "job_id": job.job_id,
+            "status": job.message,
+            "idempotent": True,
+        },
     )
-    save_job(r)
-    return r
 
 
 # ── routes ────────────────────────────────────────────────────────────────────
@@ -115,18 +110,15 @@ async def run_migration(request: DBMigrationRequest) -> JSONResponse:
 
     request_dict = json.loads(etl_request.model_dump_json())
     req_hash = compute_request_hash(request_dict)
-    existing = get_idempotent_job_id(req_hash)
-    if existing:
-        cached = get_job(existing)
-        if cached and cached.message not in ("queued", "running"):
-            return JSONResponse(
-                status_code=200 if cached.success else 422,
-                content={**cached.model_dump(), "idempotent": True},
-            )
-
-    job_id = existing or str(uuid.uuid4())
-    set_idempotent_job_id(req_hash, job_id)
-    _new_pending(job_id)
+    new_job_id = str(uuid.uuid4())
+    job_id, cached = claim_job(req_hash, new_job_id)
+    if job_id != new_job_id:
+        if cached.message in ("queued", "running"):
+            return _duplicate(cached)
+        return JSONResponse(
+            status_code=200 if cached.success else 422,
+            content={**cached.model_dump(), "idempotent": True},
+        )
 
     loop = asyncio.get_event_loop()
     result_dict = await loop.run_in_executor(
@@ -148,30 +140,12 @@ async def run_migration_async(request: DBMigrationRequest) -> JSONResponse:
 
     request_dict = json.loads(etl_request.model_dump_json())
     req_hash = compute_request_hash(request_dict)
-    existing = get_idempotent_job_id(req_hash)
-    if existing:
-        cached = get_job(existing)
-        if cached:
-            return JSONResponse(
-                status_code=202,
-                content={
-                    "success": True,
-                    "message": "Duplicate — returning existing job.",
-                    "job_id": existing,
-                    "status": cached.message,
-                    "idempotent": True,
-                },
-            )
-
-    job_id = str(uuid.uuid4())
-    set_idempotent_job_id(req_hash, job_id)
-    _new_pending(job_id)
-
-    run_etl_task.apply_async(
-        kwargs={"request_dict": request_dict, "job_id": job_id},
-        queue="etl.default",
-        task_id=job_id,
-    )
+    new_job_id = str(uuid.uuid4())
+    job_id, cached = claim_job(req_hash, new_job_id)
+    if job_id != new_job_id:
+        return _duplicate(cached)
+
+    enqueue_etl_job(request_dict, job_id)
 
     return JSONResponse(
         status_code=202,
@@ -18,11 +18,34 @@ class Settings(BaseSettings):
     DEFAULT_BATCH_SIZE: int = 10_000
     MAX_RETRIES: int = 3
     RETRY_DELAY_SECONDS: float = 2.0
+    # Threads used by SchemaMapper to convert columns; 1 = sequential
+    TRANSFORM_MAX_WORKERS: int = 1
+    # Above this in-memory size Aggregator hash-partitions to Parquet buckets
+    AGGREGATION_MEMORY_BUDGET_MB: int = 512
+    AGGREGATION_SPILL_BUCKETS: int = 32
+    SPILL_DIR: str = ""  # "" = system temp dir
+    # Keep an Arrow copy of CSV/Excel uploads so they are parsed only once
+    COLUMNAR_CACHE_ENABLED: bool = True
+    # Processes parsing the sheets of one Excel workbook; 1 = sequential
+    EXCEL_MAX_WORKERS: int = 4
+    # Uploads above this size get a sampled profile; exact stats follow from
+    # a background task
+    FAST_PROFILE_THRESHOLD_MB: int = 50
+    PROFILE_HEAD_ROWS: int = 1_000
+    PROFILE_SAMPLE_ROWS: int = 10_000
+    # Columns with more non-null values get a HyperLogLog distinct count
+    PROFILE_EXACT_DISTINCT_MAX_ROWS: int = 5_000_000
+    # Chunked uploads idle this long are removed, freeing their reserved space
+    CHUNKED_UPLOAD_TTL_HOURS: float = 24.0
 
     # Redis / Celery
     REDIS_URL: str = "redis://localhost:6379/0"
     CELERY_BROKER_URL: str = "redis://localhost:6379/0"
     CELERY_RESULT_BACKEND: str = "redis://localhost:6379/1"
+    # Per-job cap on progress publishes from a worker; stage changes always go out
+    PROGRESS_MAX_EVENTS_PER_SECOND: float = 5.0
+    # Approximate cap on events kept in each job's progress stream
+    PROGRESS_STREAM_MAXLEN: int = 1000
 
 
 settings = Settings()
@@ -70,6 +70,8 @@ class AggregationFunction(str, Enum):
     MIN = "min"
     MAX = "max"
     COUNT_DISTINCT = "count_distinct"
+    APPROX_COUNT_DISTINCT = "approx_count_distinct"  # HyperLogLog
+    APPROX_PERCENTILE = "approx_percentile"  # t-digest; needs "percentile"
 
 
 class ValidationRuleType(str, Enum):
@@ -111,3 +113,10 @@ DEFAULT_BATCH_SIZE = 10_000
 MAX_BATCH_SIZE = 100_000
 MAX_RETRIES = 3
 RETRY_DELAY_SECONDS = 2
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCESS = "success"
+    FAILED = "failed"
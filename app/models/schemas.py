@@ -32,6 +32,11 @@ class FileUploadResponse(BaseModel):
     data: Optional[Dict[str, Any]] = None
 
 
+class ChunkedUploadInit(BaseModel):
+    filename: str = Field(..., min_length=1)
+    size: int = Field(..., ge=0, description="Total file size in bytes")
+
+
 class FileMetadata(BaseModel):
     file_id: str
     table_name: str
@@ -53,6 +58,8 @@ class ColumnMapping(BaseModel):
     date_format: Optional[DateFormat] = None
     datetime_format: Optional[DateTimeFormat] = None
     max_length: Optional[int] = None
+    # Decimal separator of numeric text: "." (1,234.5) or "," (1.234,5)
+    decimal_separator: str = Field(default=".", pattern=r"^[.,]$")
     is_nullable: bool = True
     is_primary_key: bool = False
     is_unique: bool = False
@@ -94,8 +101,22 @@ class FilterRule(BaseModel):
 # ─────────────────────────────────────────────
 class AggregationRule(BaseModel):
     group_by: List[str]
-    aggregations: List[Dict[str, str]]
+    aggregations: List[Dict[str, Union[str, float]]]
     # e.g. [{"column": "amount", "function": "sum", "alias": "total_amount"}]
+    # approx_percentile also takes "percentile": 0.95 (a fraction, 0–1)
+
+    @model_validator(mode="after")
+    def validate_percentiles(self):
+        for agg in self.aggregations:
+            if agg.get("function") != AggregationFunction.APPROX_PERCENTILE.value:
+                continue
+            try:
+                q = float(agg.get("percentile", 0.5))
+            except ValueError:
+                q = -1.0
+            if not 0 <= q <= 1:
+                raise ValueError("'percentile' must be a number between 0 and 1.")
+        return self
 
 
 # ─────────────────────────────────────────────
@@ -172,9 +193,72 @@ class DatabaseDestination(BaseModel):
     index_columns: Optional[List[str]] = None
 
 
+class ParquetOptions(BaseModel):
+    compression: str = Field(
+        default="snappy", pattern="^(none|snappy|gzip|brotli|zstd|lz4)$"
+    )
+    # Codec-specific: zstd 1–22, gzip 1–9, brotli 0–11; None = codec default
+    compression_level: Optional[int] = None
+    # Rows per row group; smaller groups mean finer-grained reads and
+    # lower writer memory, larger ones better compression
+    row_group_size: int = Field(default=128 * 1024, gt=0)
+    # True / False for every column, or the columns to dictionary-encode
+    use_dictionary: Union[bool, List[str]] = True
+    # True / False for every column, or the columns to keep min/max stats for
+    write_statistics: Union[bool, List[str]] = True
+    # Convert and write one row group at a time instead of the whole frame
+    incremental: bool = True
+
+    @model_validator(mode="after")
+    def validate_compression_level(self):
+        if self.compression_level is None:
+            return self
+        bounds = _COMPRESSION_LEVELS.get(self.compression)
+        if bounds is None:
+            raise ValueError(
+                f"'{self.compression}' compression does not take a compression_level."
+            )
+        low, high = bounds
+        if not low <= self.compression_level <= high:
+            raise ValueError(
+                f"compression_level for '{self.compression}' must be between "
+                f"{low} and {high}."
+            )
+        return self
+
+
+# Valid compression_level range per Parquet codec; the others take none
+_COMPRESSION_LEVELS = {"gzip": (1, 9), "brotli": (0, 11), "zstd": (1, 22)}
+
+
 class FileDestination(BaseModel):
     format: str = Field(pattern="^(csv|excel|parquet)$")
     output_path: str
+    parquet: Optional[ParquetOptions] = None
+    # CSV formatting: "pandas" matches DataFrame.to_csv, "arrow" is faster
+    # but quotes strings and writes true/false. A .gz / .zst output_path is
+    # compressed on the fly.
+    csv_engine: str = Field(default="pandas", pattern="^(pandas|arrow)$")
+
+    # Hive-style output: output_path becomes a directory of
+    # col=value/.../part-<id>-<n>.<ext> files (csv or parquet only)
+    partition_by: Optional[List[str]] = None
+    max_rows_per_file: int = Field(default=1_000_000, gt=0)
+    max_open_files: int = Field(default=256, gt=0)
+    # "replace" clears the partitions being written; "append" adds files
+    # next to what is already there
+    existing_data: str = Field(default="replace", pattern="^(replace|append)$")
+
+    @model_validator(mode="after")
+    def validate_format_options(self):
+        if self.parquet is not None and self.format != "parquet":
+            raise ValueError("'parquet' options require format 'parquet'.")
+        if self.partition_by is not None:
+            if not self.partition_by:
+                raise ValueError("partition_by must name at least one column.")
+            if self.format == "excel":
+                raise ValueError("partition_by supports csv and parquet output only.")
+        return self
 
 
 class APIDestinationAuth(BaseModel):
@@ -233,12 +317,27 @@ class DatabaseSource(BaseModel):
         default=0, ge=0, description="Rows per chunk. 0 = no chunking."
     )
 
+    # Numeric column used to split the source into key ranges when the job
+    # runs with partitions > 1
+    partition_column: Optional[str] = None
+
     @model_validator(mode="after")
     def validate_source(self):
         if not self.table_name and not self.query:
             raise ValueError("Either 'table_name' or 'query' must be provided.")
         if self.table_name and self.query:
             raise ValueError("Only one of 'table_name' or 'query' may be provided.")
+        # Key-range partitions filter the selected columns on
+        # partition_column, so it has to be one of them
+        if (
+            self.partition_column
+            and self.columns
+            and self.partition_column not in self.columns
+        ):
+            raise ValueError(
+                f"'partition_column' ({self.partition_column}) must be one of "
+                "'columns' when 'columns' is set."
+            )
         return self
 
 
@@ -250,6 +349,8 @@ class ETLJobRequest(BaseModel):
     file_id: Optional[str] = None
     api_source: Optional[APISource] = None
     db_source: Optional[DatabaseSource] = None
+    # Excel sheet to read from file_id; the first sheet when omitted
+    sheet_name: Optional[str] = None
 
     # Transformations
     column_mappings: List[ColumnMapping]
@@ -261,6 +362,10 @@ class ETLJobRequest(BaseModel):
     batch_size: int = Field(default=10_000, gt=0, le=100_000)
     max_retries: int = Field(default=3, ge=0, le=10)
 
+    # >1 fans the job out over several workers (async runs only). CSV splits
+    # by byte range, Parquet by row group, DB sources by partition_column.
+    partitions: int = Field(default=1, ge=1, le=64)
+
     # Destinations (at least one required)
     db_destination: Optional[DatabaseDestination] = None
     file_destination: Optional[FileDestination] = None
@@ -279,6 +384,13 @@ class ETLJobRequest(BaseModel):
             raise ValueError("Only one source may be provided at a time.")
         if not any([self.db_destination, self.file_destination, self.api_destination]):
             raise ValueError("At least one destination must be specified.")
+        if self.partitions > 1:
+            if self.aggregations:
+                raise ValueError("Aggregations are not supported with partitions > 1.")
+            if self.file_destination and not self.file_destination.partition_by:
+                raise ValueError(
+                    "file_destination needs partition_by with partitions > 1."
+                )
         return self
 
 
@@ -347,3 +459,4 @@ class DBMigrationRequest(BaseModel):
 
     batch_size: int = Field(default=10_000, gt=0, le=100_000)
     max_retries: int = Field(default=3, ge=0, le=10)
+    partitions: int = Field(default=1, ge=1, le=64)
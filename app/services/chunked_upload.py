@@ -0,0 +1,269 @@
+"""
+Resumable chunked uploads.
+
+    POST   /files/uploads                    → upload_id (target preallocated)
+    PUT    /files/uploads/{id}?offset=N      → body written at byte N
+    GET    /files/uploads/{id}               → received ranges / what is missing
+    POST   /files/uploads/{id}/complete      → file moved into UPLOAD_DIR
+    DELETE /files/uploads/{id}               → abort
+
+State lives on disk so any API worker can serve any part:
+
+    uploaded_files/.uploads/<upload_id>/meta.json      filename + size
+    uploaded_files/.uploads/<upload_id>/data           preallocated target
+    uploaded_files/.uploads/<upload_id>/ranges/<a>-<b> one marker per written span
+    uploaded_files/.uploads/<upload_id>/head.json      early profile (CSV)
+
+Parts are written with os.pwrite straight into `data`, so they may arrive
+in any order or in parallel. Range markers are created, never rewritten, so
+concurrent parts need no locking. A part cut off mid-stream still records
+the bytes that made it, and the client resumes from the first gap.
+
+Uploads that see no new part for CHUNKED_UPLOAD_TTL_HOURS are removed, with
+their preallocated space, the next time an upload is started.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+import uuid
+from contextlib import suppress
+from typing import Any, AsyncIterator, Dict, List, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.constants import CHUNK_SIZE
+from app.services.file_processor import FileProcessor, read_csv_bytes
+
+_UPLOAD_ID = re.compile(r"^[0-9a-f]{32}$")
+
+# Contiguous bytes from offset 0 needed before a CSV head profile is built
+_HEAD_BYTES = 1024 * 1024
+# Request chunks are gathered up to this much per pwrite, so each trip to
+# the thread pool carries a useful amount of data
+_WRITE_BYTES = 1024 * 1024
+
+
+def create_upload(filename: str, size: int) -> Dict[str, Any]:
+    sweep_abandoned_uploads()
+    upload_id = uuid.uuid4().hex
+    directory = _upload_dir(upload_id, must_exist=False)
+    os.makedirs(os.path.join(directory, "ranges"))
+    with open(os.path.join(directory, "meta.json"), "w") as fh:
+        json.dump({"filename": filename, "size": size}, fh)
+
+    fd = os.open(os.path.join(directory, "data"), os.O_WRONLY | os.O_CREAT, 0o644)
+    try:
+        if size and hasattr(os, "posix_fallocate"):
+            os.posix_fallocate(fd, 0, size)  # fail now, not halfway, if disk is full
+        else:
+            os.ftruncate(fd, size)
+    finally:
+        os.close(fd)
+    return upload_state(upload_id)
+
+
+async def write_part(
+    upload_id: str, offset: int, chunks: AsyncIterator[bytes]
+) -> Dict[str, Any]:
+    """
+    Write a streamed part at `offset`; returns the updated upload state.
+    The disk writes and bookkeeping run on the thread pool.
+    """
+    directory = _upload_dir(upload_id)
+    size = _meta(directory)["size"]
+    if not 0 <= offset <= size:
+        raise ValueError(f"Offset {offset} is outside the file (size {size}).")
+
+    pos = offset
+    buffer = bytearray()
+    fd = os.open(os.path.join(directory, "data"), os.O_WRONLY)
+    try:
+        async for chunk in chunks:
+            if pos + len(buffer) + len(chunk) > size:
+                raise ValueError(f"Part runs past the declared size ({size} bytes).")
+            buffer += chunk
+            if len(buffer) >= _WRITE_BYTES:
+                pos += await run_in_threadpool(os.pwrite, fd, buffer, pos)
+                buffer = bytearray()
+    finally:
+        # Record whatever landed, even if the stream broke off
+        await run_in_threadpool(_finish_part, fd, buffer, directory, offset, pos)
+
+    return await run_in_threadpool(_state_after_part, upload_id, directory)
+
+
+def _finish_part(
+    fd: int, buffer: bytearray, directory: str, offset: int, pos: int
+) -> None:
+    try:
+        if buffer:
+            pos += os.pwrite(fd, buffer, pos)
+    finally:
+        os.close(fd)
+        if pos > offset:
+            open(os.path.join(directory, "ranges", f"{offset}-{pos}"), "w").close()
+
+
+def _state_after_part(upload_id: str, directory: str) -> Dict[str, Any]:
+    state = upload_state(upload_id)
+    _maybe_profile_head(directory, state)
+    return state
+
+
+def upload_state(upload_id: str) -> Dict[str, Any]:
+    directory = _upload_dir(upload_id)
+    meta = _meta(directory)
+    received = _received_ranges(directory)
+    state = {
+        "upload_id": upload_id,
+        "filename": meta["filename"],
+        "size": meta["size"],
+        "received_bytes": sum(end - start for start, end in received),
+        "received": [list(r) for r in received],
+        "missing": [list(r) for r in _gaps(received, meta["size"])],
+    }
+    with suppress(OSError, ValueError):
+        with open(os.path.join(directory, "head.json")) as fh:
+            state["head_profile"] = json.load(fh)
+    return state
+
+
+def complete_upload(upload_id: str, target_path: str) -> Tuple[str, int]:
+    """
+    Move the finished file to `target_path`. Returns (sha256, size).
+    Raises ValueError if any byte range is still missing.
+    """
+    directory = _upload_dir(upload_id)
+    size = _meta(directory)["size"]
+    missing = _gaps(_received_ranges(directory), size)
+    if missing:
+        raise ValueError(f"Upload incomplete; missing byte ranges: {missing[:5]}")
+
+    data = os.path.join(directory, "data")
+    digest = hashlib.sha256()
+    with open(data, "rb") as fh:
+        for chunk in iter(lambda: fh.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    os.replace(data, target_path)
+    shutil.rmtree(directory, ignore_errors=True)
+    return digest.hexdigest(), size
+
+
+def upload_filename(upload_id: str) -> str:
+    return _meta(_upload_dir(upload_id))["filename"]
+
+
+def abort_upload(upload_id: str) -> None:
+    shutil.rmtree(_upload_dir(upload_id))
+
+
+def sweep_abandoned_uploads() -> List[str]:
+    """
+    Remove uploads with no new part for CHUNKED_UPLOAD_TTL_HOURS, releasing
+    the space reserved for them. Returns the removed upload ids.
+    """
+    root = os.path.join(settings.UPLOAD_DIR, ".uploads")
+    cutoff = time.time() - settings.CHUNKED_UPLOAD_TTL_HOURS * 3600
+    removed = []
+    with suppress(FileNotFoundError):
+        for upload_id in os.listdir(root):
+            directory = os.path.join(root, upload_id)
+            try:
+                # pwrite touches data, and every finished part adds a marker
+                # to ranges/
+                active = max(
+                    os.path.getmtime(os.path.join(directory, name))
+                    for name in ("", "data", "ranges")
+                    if os.path.exists(os.path.join(directory, name))
+                )
+            except (OSError, ValueError):
+                continue  # removed meanwhile
+            if active < cutoff:
+                shutil.rmtree(directory, ignore_errors=True)
+                removed.append(upload_id)
+    return removed
+
+
+# ── helpers ───────────────────────────────────────────────────────────────────
+
+
+def _upload_dir(upload_id: str, must_exist: bool = True) -> str:
+    if not _UPLOAD_ID.match(upload_id):
+        raise FileNotFoundError(f"Unknown upload '{upload_id}'.")
+    directory = os.path.join(settings.UPLOAD_DIR, ".uploads", upload_id)
+    if must_exist and not os.path.isdir(directory):
+        raise FileNotFoundError(f"Unknown upload '{upload_id}'.")
+    return directory
+
+
+def _meta(directory: str) -> Dict[str, Any]:
+    with open(os.path.join(directory, "meta.json")) as fh:
+        return json.load(fh)
+
+
+def _received_ranges(directory: str) -> List[Tuple[int, int]]:
+    """Merged, sorted [start, end) spans covered by the written parts."""
+    spans = sorted(
+        tuple(map(int, name.split("-")))
+        for name in os.listdir(os.path.join(directory, "ranges"))
+    )
+    merged: List[Tuple[int, int]] = []
+    for start, end in spans:
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _gaps(received: List[Tuple[int, int]], size: int) -> List[Tuple[int, int]]:
+    gaps, pos = [], 0
+    for start, end in received:
+        if start > pos:
+            gaps.append((pos, start))
+        pos = max(pos, end)
+    if pos < size:
+        gaps.append((pos, size))
+    return gaps
+
+
+def _maybe_profile_head(directory: str, state: Dict[str, Any]) -> None:
+    """
+    Profile a CSV's head as soon as its first megabyte is in, so columns,
+    types and a preview are known before the rest of the file arrives.
+    """
+    head_path = os.path.join(directory, "head.json")
+    if "head_profile" in state or not state["filename"].lower().endswith(".csv"):
+        return
+    received = state["received"]
+    needed = min(_HEAD_BYTES, state["size"])
+    if not received or received[0][0] != 0 or received[0][1] < needed:
+        return
+
+    with open(os.path.join(directory, "data"), "rb") as fh:
+        head = fh.read(needed)
+    if needed < state["size"]:
+        head = head[: head.rfind(b"\n") + 1]  # whole lines only
+    try:
+        df = read_csv_bytes(head)
+    except ValueError:
+        return
+    metadata = FileProcessor(state["filename"], df=df).get_file_metadata()
+    metadata.update(row_count=None, row_count_exact=False)
+    # Parts may finish together: each writes its own temp file, and losing
+    # the race (or the disk) only costs the head profile, never the part
+    tmp = f"{head_path}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(tmp, "w") as fh:
+            json.dump(metadata, fh, default=str)
+        os.replace(tmp, head_path)
+    except OSError:
+        with suppress(OSError):
+            os.remove(tmp)
+        return
+    state["head_profile"] = metadata
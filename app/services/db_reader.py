@@ -90,27 +90,14 @@ def get_source_schema(source: DatabaseSource) -> List[Dict[str, Any]]:
     Return column metadata for a source table without fetching any rows.
     Used by the /migrate/preview endpoint.
     """
-    connector = _get_connector(source.connection)
-
     # Use a LIMIT 0 query to get schema without data
     if source.query:
         preview_sql = f"SELECT * FROM ({source.query}) AS _q LIMIT 0"
     else:
-        col_str = "*"
-        if source.columns:
-            # quoting handled by connector type
-            if source.connection.db_type == DatabaseType.MYSQL:
-                col_str = ", ".join(f"`{c}`" for c in source.columns)
-            else:
-                col_str = ", ".join(f'"{c}"' for c in source.columns)
-
-        if source.connection.db_type == DatabaseType.MYSQL:
-            preview_sql = f"SELECT {col_str} FROM `{source.table_name}` LIMIT 0"
-        else:
-            preview_sql = f'SELECT {col_str} FROM "{source.table_name}" LIMIT 0'
-
-    connector2 = _get_connector(source.connection)
-    empty_df = connector2.read_dataframe(query=preview_sql)
+        preview_sql = f"{base_select_sql(source)} LIMIT 0"
+
+    connector = _get_connector(source.connection)
+    empty_df = connector.read_dataframe(query=preview_sql)
 
     return [
         {
@@ -122,3 +109,50 @@ def get_source_schema(source: DatabaseSource) -> List[Dict[str, Any]]:
         }
         for col in empty_df.columns
     ]
+
+
+def sample_column_mappings(
+    source: DatabaseSource, rows: int = 1_000
+) -> List[ColumnMapping]:
+    """Infer pass-through mappings from the first `rows` rows of the source."""
+    connector = _get_connector(source.connection)
+    sample = connector.read_dataframe(
+        query=f"SELECT * FROM ({base_select_sql(source)}) AS _s LIMIT {rows}"
+    )
+    return _auto_column_mappings(sample)
+
+
+def key_bounds(source: DatabaseSource, column: str) -> Tuple[Any, Any]:
+    """MIN and MAX of `column` over the source rows (None, None if empty)."""
+    quoted = quote_identifier(source.connection.db_type, column)
+    connector = _get_connector(source.connection)
+    df = connector.read_dataframe(
+        query=(
+            f"SELECT MIN({quoted}) AS lo, MAX({quoted}) AS hi "
+            f"FROM ({base_select_sql(source)}) AS _b"
+        )
+    )
+    lo, hi = df.iloc[0]["lo"], df.iloc[0]["hi"]
+    if pd.isna(lo) or pd.isna(hi):
+        return None, None
+    return lo, hi
+
+
+# ── SQL helpers ───────────────────────────────────────────────────────────────
+
+
+def quote_identifier(db_type: DatabaseType, name: str) -> str:
+    if db_type == DatabaseType.MYSQL:
+        return f"`{name}`"
+    return f'"{name}"'
+
+
+def base_select_sql(source: DatabaseSource) -> str:
+    """The SELECT a source reads from: its custom query, or table + columns."""
+    if source.query:
+        return source.query
+    db_type = source.connection.db_type
+    col_str = "*"
+    if source.columns:
+        col_str = ", ".join(quote_identifier(db_type, c) for c in source.columns)
+    return f"SELECT {col_str} FROM {quote_identifier(db_type, source.table_name)}"
@@ -18,9 +18,12 @@ class ETLLogger:
     - Writes JSON-lines to logs/{job_id}.jsonl
     - Saves invalid rows to invalid_rows/{job_id}_invalid.csv (or .xlsx)
     - Exposes in-memory event list for the API response
+
+    append=True continues an existing log (e.g. the callback of a
+    partitioned job) instead of truncating it.
     """
 
-    def __init__(self, job_id: Optional[str] = None):
+    def __init__(self, job_id: Optional[str] = None, append: bool = False):
         self.job_id = job_id or str(uuid.uuid4())
         self.events: List[Dict[str, Any]] = []
 
@@ -28,9 +31,12 @@ class ETLLogger:
         os.makedirs(settings.INVALID_ROWS_DIR, exist_ok=True)
 
         self.log_file = os.path.join(settings.LOG_DIR, f"{self.job_id}.jsonl")
-        self._file_handle = open(self.log_file, "w", encoding="utf-8")
+        self._file_handle = open(
+            self.log_file, "a" if append else "w", encoding="utf-8"
+        )
 
-        self.log(LogLevel.INFO, "ETL job started", {"job_id": self.job_id})
+        message = "ETL job resumed" if append else "ETL job started"
+        self.log(LogLevel.INFO, message, {"job_id": self.job_id})
 
     # ── public API ──────────────────────────────────────────────────────────
 
@@ -55,6 +61,9 @@ class ETLLogger:
         py_level = getattr(logging, level.value, logging.INFO)
         logging.getLogger("etl").log(py_level, f"[{self.job_id}] {message}")
 
+    def debug(self, message: str, extra: Optional[Dict[str, Any]] = None) -> None:
+        self.log(LogLevel.DEBUG, message, extra)
+
     def info(self, message: str, extra: Optional[Dict[str, Any]] = None) -> None:
         self.log(LogLevel.INFO, message, extra)
 
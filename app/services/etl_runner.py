@@ -106,7 +106,7 @@ def run_etl_job(request: ETLJobRequest) -> ETLJobResult:
                 if not os.path.exists(file_path):
                     raise FileNotFoundError(f"Source file not found: {request.file_id}")
                 logger.info("Extracting file", {"file_id": request.file_id})
-                df = FileProcessor(file_path).df
+                df = FileProcessor(file_path, sheet_name=request.sheet_name).df
 
             total_rows = len(df)
             logger.info(f"Extracted {total_rows} rows, {len(df.columns)} columns")
@@ -114,7 +114,9 @@ def run_etl_job(request: ETLJobRequest) -> ETLJobResult:
             # 2. Filter
             if request.filters:
                 logger.info(f"Applying {len(request.filters)} filter rule(s)")
-                df, filtered_out = RowFilter().apply(df, request.filters)
+                row_filter = RowFilter()
+                df, filtered_out = row_filter.apply(df, request.filters)
+                logger.debug("Filter plan", {"plan": row_filter.plan.describe()})
                 logger.info(
                     f"After filtering: {len(df)} kept, {len(filtered_out)} discarded",
                     {"discarded_rows": len(filtered_out)},
@@ -143,9 +145,11 @@ def run_etl_job(request: ETLJobRequest) -> ETLJobResult:
                 logger.info(
                     f"Running {len(request.validation_rules)} validation rule(s)"
                 )
-                df, invalid_df, validation_errors = DataValidator().validate(
+                validator = DataValidator()
+                df, invalid_df, validation_errors = validator.validate(
                     df, request.validation_rules
                 )
+                logger.debug("Validation plan", {"plan": validator.plan.describe()})
                 failed_rows = len(invalid_df)
                 logger.info(
                     f"Validation: {len(df)} valid, {failed_rows} invalid",
@@ -193,7 +197,7 @@ def run_etl_job(request: ETLJobRequest) -> ETLJobResult:
             if request.file_destination:
                 dest = request.file_destination
                 logger.info(f"Writing to file: {dest.output_path} ({dest.format})")
-                file_result = FileWriter().write(df, dest.output_path, dest.format)
+                file_result = FileWriter().write_destination(df, dest)
                 logger.info(
                     f"Wrote {file_result['rows_written']} rows to {dest.output_path}"
                 )
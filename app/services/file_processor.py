@@ -1,10 +1,24 @@
+import importlib.util
+import io
+import json
+import logging
+import multiprocessing
 import os
-from typing import Any, Dict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import suppress
+from typing import Any, Dict, List, Optional
+from urllib.parse import quote
 
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
 
+from app.core.config import settings
 from app.core.constants import ALLOWED_EXTENSIONS
+from app.services.sketches import HyperLogLog
+
+logger = logging.getLogger(__name__)
 
 
 def _is_string_col(col: pd.Series) -> bool:
@@ -16,6 +30,19 @@ def _is_string_col(col: pd.Series) -> bool:
     return pd.api.types.is_string_dtype(col) or col.dtype == object
 
 
+_CSV_ENCODINGS = ["utf-8", "latin-1", "iso-8859-1", "cp1252"]
+
+
+def read_csv_bytes(data: bytes, dtype: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+    """Parse an in-memory CSV (header + rows) with the usual encoding fallback."""
+    for encoding in _CSV_ENCODINGS:
+        try:
+            return pd.read_csv(io.BytesIO(data), encoding=encoding, dtype=dtype)
+        except UnicodeDecodeError:
+            continue
+    raise ValueError("Could not decode CSV data with any supported encoding.")
+
+
 # Common date format strings tried in order during type suggestion.
 # Trying explicit formats avoids pandas UserWarning about format inference.
 _COMMON_DATE_FORMATS = [
@@ -57,10 +84,21 @@ def _infer_date(sample: "pd.Series") -> None:
 
 class FileProcessor:
 
-    def __init__(self, file_path: str):
+    def __init__(
+        self,
+        file_path: str,
+        df: Optional[pd.DataFrame] = None,
+        sheet_name: Optional[str] = None,
+    ):
+        """
+        `df` profiles an already-loaded frame (e.g. a sample) instead.
+        `sheet_name` picks an Excel sheet; the first sheet by default.
+        """
         self.file_path = file_path
         self.file_ext = os.path.splitext(file_path)[1].lower()
-        self._df = None
+        self.sheet_name = sheet_name
+        self._df = df
+        self._column_profiles: Optional[Dict[Any, Dict[str, Any]]] = None
 
     @property
     def df(self) -> pd.DataFrame:
@@ -70,8 +108,21 @@ class FileProcessor:
         return self._df
 
     def _read_file(self) -> pd.DataFrame:
+        if (
+            self.file_ext not in _CACHED_EXTENSIONS
+            or not settings.COLUMNAR_CACHE_ENABLED
+        ):
+            return self._parse_file()
+        df = read_columnar_cache(self.file_path, self.sheet_name)
+        if df is None:
+            df = write_columnar_cache(
+                self.file_path, self._parse_file(), self.sheet_name
+            )
+        return df
+
+    def _parse_file(self) -> pd.DataFrame:
         if self.file_ext == ".csv":
-            for encoding in ["utf-8", "latin-1", "iso-8859-1", "cp1252"]:
+            for encoding in _CSV_ENCODINGS:
                 try:
                     return pd.read_csv(self.file_path, encoding=encoding)
                 except UnicodeDecodeError:
@@ -81,7 +132,8 @@ class FileProcessor:
         elif self.file_ext in (".xls", ".xlsx"):
             return pd.read_excel(
                 self.file_path,
-                engine="openpyxl" if self.file_ext == ".xlsx" else None,
+                sheet_name=self.sheet_name if self.sheet_name is not None else 0,
+                engine=excel_engine(self.file_path),
             )
 
         elif self.file_ext == ".parquet":
@@ -93,8 +145,17 @@ class FileProcessor:
                 f"Allowed: {', '.join(ALLOWED_EXTENSIONS)}"
             )
 
+    def profile_columns(self) -> Dict[Any, Dict[str, Any]]:
+        """Stats for every column (see profile_column), computed once and kept."""
+        if self._column_profiles is None:
+            self._column_profiles = {
+                col: profile_column(self.df[col]) for col in self.df.columns
+            }
+        return self._column_profiles
+
     def get_file_metadata(self) -> Dict[str, Any]:
         df = self.df
+        profiles = self.profile_columns()
 
         # Derive a clean table name from the filename
         filename = os.path.basename(self.file_path)
@@ -103,110 +164,340 @@ class FileProcessor:
         table_name = base.split("_name")[-1] if "_name" in base else base
         table_name = table_name.replace(" ", "_").replace("-", "_").lower() or base
 
-        columns_info: Dict[str, Any] = {}
-        for col in df.columns:
-            col_data = df[col]
-            sample_values = col_data.dropna().head(5).tolist()
-            sample_values = [
-                v.item() if hasattr(v, "item") else v for v in sample_values
-            ]
-
-            columns_info[col] = {
-                "dtype": str(col_data.dtype),
-                "missing_count": int(col_data.isnull().sum()),
-                "unique_count": int(col_data.nunique()),
-                "sample_values": sample_values,
-                "suggested_type": self._suggest_data_type(col_data),
-                "is_numeric": bool(pd.api.types.is_numeric_dtype(col_data)),
-                "is_datetime": bool(pd.api.types.is_datetime64_dtype(col_data)),
-            }
+        columns_info: Dict[str, Any] = {
+            col: {key: stats[key] for key in _METADATA_KEYS}
+            for col, stats in profiles.items()
+        }
 
         preview = df.head(5).replace({np.nan: None}).to_dict(orient="records")
         preview = _make_json_safe(preview)
 
+        total_missing = sum(stats["missing_count"] for stats in profiles.values())
         return {
             "table_name": table_name,
             "row_count": len(df),
             "column_count": len(df.columns),
             "columns": columns_info,
             "preview": preview,
-            "has_missing_values": bool(df.isnull().any().any()),
-            "total_missing_values": int(df.isnull().sum().sum()),
+            "has_missing_values": total_missing > 0,
+            "total_missing_values": total_missing,
         }
 
-    def _suggest_data_type(self, series: pd.Series) -> str:
-        if series.isnull().all():
-            return "string"
+    def get_column_stats(self, column_name: str) -> Dict[str, Any]:
+        if column_name not in self.df.columns:
+            raise ValueError(f"Column '{column_name}' not found in file.")
+        if self._column_profiles is not None:
+            stats = self._column_profiles[column_name]
+        else:
+            stats = profile_column(self.df[column_name])
+        return {"column_name": column_name, **stats}
+
+
+# ── column profiling ──────────────────────────────────────────────────────────
+#
+# profile_column derives every per-column statistic from two vectorized
+# passes over the column: one null mask, and one hash pass (value_counts)
+# that yields the distinct count, the top values and the distinct strings
+# whose lengths are weighted by their counts. Numeric stats run on the
+# non-null values as a single float64 buffer.
+
+_METADATA_KEYS = (
+    "dtype",
+    "missing_count",
+    "unique_count",
+    "sample_values",
+    "suggested_type",
+    "is_numeric",
+    "is_datetime",
+)
+
+
+def profile_column(series: pd.Series) -> Dict[str, Any]:
+    """
+    Null count, distinct count, top values, samples, min/max (numeric and
+    datetime), numeric moments, string lengths and a suggested SQL type.
+    Above PROFILE_EXACT_DISTINCT_MAX_ROWS non-null values the distinct count
+    is a HyperLogLog estimate and top values come from the first that many.
+    """
+    nulls = series.isna()
+    missing = int(nulls.sum())
+    values = series[~nulls] if missing else series
+    n = len(values)
+
+    limit = settings.PROFILE_EXACT_DISTINCT_MAX_ROWS
+    exact = not limit or n <= limit
+    if exact:
+        counts = values.value_counts()
+        unique = len(counts)
+    else:
+        counts = values.iloc[:limit].value_counts()
+        unique = HyperLogLog.from_values(values.to_numpy()).estimate()
+
+    stats: Dict[str, Any] = {
+        "dtype": str(series.dtype),
+        "count": len(series),
+        "missing_count": missing,
+        "unique_count": unique,
+        "unique_count_exact": exact,
+        "sample_values": values.head(5).tolist(),
+        "is_numeric": bool(pd.api.types.is_numeric_dtype(series)),
+        "is_datetime": bool(pd.api.types.is_datetime64_dtype(series)),
+    }
+
+    if stats["is_numeric"]:
+        data = values.to_numpy(dtype=np.float64)
+        stats.update(
+            {
+                "min": float(data.min()) if n else None,
+                "max": float(data.max()) if n else None,
+                "mean": float(data.mean()) if n else None,
+                "median": float(np.median(data)) if n else None,
+                "std": float(data.std(ddof=1)) if n > 1 else None,
+            }
+        )
+    elif pd.api.types.is_datetime64_any_dtype(series):
+        stats.update(
+            {
+                "min": values.min().isoformat() if n else None,
+                "max": values.max().isoformat() if n else None,
+            }
+        )
+    elif _is_string_col(series):
+        if exact:
+            lengths = counts.index.astype(str).str.len().to_numpy()
+            weights = counts.to_numpy()
+        else:
+            lengths, weights = values.astype(str).str.len().to_numpy(), None
+        stats.update(
+            {
+                "max_length": int(lengths.max()) if n else 0,
+                "min_length": int(lengths.min()) if n else 0,
+                "avg_length": float(np.average(lengths, weights=weights)) if n else 0.0,
+            }
+        )
 
-        if pd.api.types.is_bool_dtype(series):
-            return "boolean"
+    stats["top_values"] = [
+        {"value": str(k), "count": int(v)} for k, v in counts.head(10).items()
+    ]
+    stats["suggested_type"] = _suggest_data_type(series, values, stats)
+    return _make_json_safe(stats)
 
-        if pd.api.types.is_integer_dtype(series):
-            return "integer" if series.dropna().max() <= 2_147_483_647 else "bigint"
 
-        if pd.api.types.is_float_dtype(series):
-            return "float"
+def _suggest_data_type(
+    series: pd.Series, values: pd.Series, stats: Dict[str, Any]
+) -> str:
+    """`values` is `series` without nulls; `stats` its profile so far."""
+    if not len(values):
+        return "string"
 
-        if pd.api.types.is_datetime64_dtype(series):
-            return "datetime"
+    if pd.api.types.is_bool_dtype(series):
+        return "boolean"
 
-        if _is_string_col(series):
-            sample = series.dropna().head(100)
-            if len(sample) > 0:
-                unique_vals = {str(v).lower().strip() for v in sample.unique()}
-                if unique_vals.issubset({"true", "false", "1", "0", "yes", "no"}):
-                    return "boolean"
+    if pd.api.types.is_integer_dtype(series):
+        return "integer" if stats["max"] <= 2_147_483_647 else "bigint"
 
-                try:
-                    _infer_date(sample)
-                    return "date"
-                except Exception:
-                    pass
+    if pd.api.types.is_float_dtype(series):
+        return "float"
 
-                max_len = series.dropna().astype(str).str.len().max()
-                return "text" if max_len > 255 else "string"
+    if pd.api.types.is_datetime64_dtype(series):
+        return "datetime"
 
-        return "string"
+    if _is_string_col(series):
+        sample = values.head(100)
+        unique_vals = {str(v).lower().strip() for v in sample.unique()}
+        if unique_vals.issubset({"true", "false", "1", "0", "yes", "no"}):
+            return "boolean"
 
-    def get_column_stats(self, column_name: str) -> Dict[str, Any]:
-        if column_name not in self.df.columns:
-            raise ValueError(f"Column '{column_name}' not found in file.")
+        try:
+            _infer_date(sample)
+            return "date"
+        except Exception:
+            pass
 
-        col = self.df[column_name]
-        stats: Dict[str, Any] = {
-            "column_name": column_name,
-            "dtype": str(col.dtype),
-            "count": len(col),
-            "missing_count": int(col.isnull().sum()),
-            "unique_count": int(col.nunique()),
+        return "text" if stats["max_length"] > 255 else "string"
+
+    return "string"
+
+
+# ── columnar cache ────────────────────────────────────────────────────────────
+#
+# Text and Excel uploads are parsed once, then kept as an uncompressed Arrow
+# IPC (Feather v2) file next to the upload:
+#
+#     uploaded_files/20260101_120000_ab12cd34.xlsx
+#     uploaded_files/.20260101_120000_ab12cd34.xlsx.arrow
+#     uploaded_files/.20260101_120000_ab12cd34.xlsx.Sheet%202.arrow
+#
+# The first is the default (first) sheet, the second a sheet picked by name.
+# Later reads memory-map the cache instead of re-parsing. The upload's size
+# and mtime are stored in the schema metadata; a mismatch means stale.
+
+_CACHED_EXTENSIONS = {".csv", ".xls", ".xlsx"}
+_CACHE_SOURCE_KEY = b"tinyteemo.source"
+
+
+def sidecar_path(file_path: str, suffix: str, sheet: Optional[str] = None) -> str:
+    """Hidden file next to an upload, e.g. `.<name>[.<sheet>]<suffix>`."""
+    directory, name = os.path.split(file_path)
+    if sheet is not None:
+        name = f"{name}.{quote(sheet, safe='')}"
+    return os.path.join(directory, f".{name}{suffix}")
+
+
+def remove_sidecars(file_path: str, suffix: str) -> None:
+    """Remove the sidecars with `suffix` for the file and all of its sheets."""
+    directory, name = os.path.split(file_path)
+    for entry in os.listdir(directory or "."):
+        if entry == f".{name}{suffix}" or (
+            entry.startswith(f".{name}.") and entry.endswith(suffix)
+        ):
+            with suppress(FileNotFoundError):
+                os.remove(os.path.join(directory, entry))
+
+
+def columnar_cache_path(file_path: str, sheet: Optional[str] = None) -> str:
+    return sidecar_path(file_path, ".arrow", sheet)
+
+
+def read_columnar_cache(
+    file_path: str, sheet: Optional[str] = None
+) -> Optional[pd.DataFrame]:
+    """The cached frame for `file_path`, or None if missing or stale."""
+    path = columnar_cache_path(file_path, sheet)
+    try:
+        with pa.memory_map(path) as source:
+            reader = pa.ipc.open_file(source)
+            metadata = reader.schema.metadata or {}
+            if metadata.get(_CACHE_SOURCE_KEY) != _source_fingerprint(file_path):
+                return None
+            return reader.read_all().to_pandas()
+    except (OSError, pa.ArrowInvalid):
+        return None
+
+
+def write_columnar_cache(
+    file_path: str, df: pd.DataFrame, sheet: Optional[str] = None
+) -> pd.DataFrame:
+    """
+    Cache `df` for `file_path` and return the frame as cached. Object columns
+    mixing types Arrow can't hold in one column (common in Excel) are stored
+    as strings, so callers get the same frame on first and later reads.
+    Caching is best effort; on failure `df` is returned unchanged.
+    """
+    path = columnar_cache_path(file_path, sheet)
+    tmp = f"{path}.tmp"
+    try:
+        df = _stringify_mixed_columns(df)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        metadata = {
+            **(table.schema.metadata or {}),
+            _CACHE_SOURCE_KEY: _source_fingerprint(file_path),
         }
+        feather.write_feather(
+            table.replace_schema_metadata(metadata), tmp, compression="uncompressed"
+        )
+        os.replace(tmp, path)
+    except (pa.ArrowException, TypeError, ValueError, OSError) as exc:
+        logger.warning("Columnar cache skipped for %s: %s", file_path, exc)
+        with suppress(FileNotFoundError):
+            os.remove(tmp)
+    return df
+
+
+def invalidate_columnar_cache(file_path: str) -> None:
+    remove_sidecars(file_path, ".arrow")
+
+
+def _stringify_mixed_columns(df: pd.DataFrame) -> pd.DataFrame:
+    mixed = []
+    for col in df.columns:
+        if df[col].dtype == object:
+            try:
+                pa.array(df[col], from_pandas=True)
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                mixed.append(col)
+    if not mixed:
+        return df
+    df = df.copy()
+    for col in mixed:
+        df[col] = df[col].map(lambda v: v if v is None or v != v else str(v))
+    return df
+
+
+def _source_fingerprint(file_path: str) -> bytes:
+    stat = os.stat(file_path)
+    return json.dumps({"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}).encode()
+
+
+# ── excel ─────────────────────────────────────────────────────────────────────
+#
+# pandas' openpyxl engine already opens workbooks read-only and streams rows,
+# but it is pure Python. When the optional python-calamine package is
+# installed (pip install python-calamine) and pandas is 2.2 or newer (the
+# first release with engine="calamine") its Rust reader is used instead,
+# for both .xlsx and .xls. Sheets of one workbook are independent, so
+# cache_excel_sheets parses them in separate processes, each writing its
+# own columnar cache; nothing but row counts travels between processes.
 
-        if pd.api.types.is_numeric_dtype(col):
-            clean = col.dropna()
-            stats.update(
-                {
-                    "min": float(clean.min()) if len(clean) else None,
-                    "max": float(clean.max()) if len(clean) else None,
-                    "mean": float(clean.mean()) if len(clean) else None,
-                    "median": float(clean.median()) if len(clean) else None,
-                    "std": float(clean.std()) if len(clean) else None,
-                }
-            )
-        elif _is_string_col(col):
-            lengths = col.dropna().astype(str).str.len()
-            stats.update(
-                {
-                    "max_length": int(lengths.max()) if len(lengths) else 0,
-                    "min_length": int(lengths.min()) if len(lengths) else 0,
-                    "avg_length": float(lengths.mean()) if len(lengths) else 0.0,
-                }
-            )
 
-        value_counts = col.value_counts().head(10)
-        stats["top_values"] = [
-            {"value": str(k), "count": int(v)} for k, v in value_counts.items()
-        ]
-        return stats
+def _calamine_supported() -> bool:
+    pandas_version = tuple(int(part) for part in pd.__version__.split(".")[:2])
+    return (
+        pandas_version >= (2, 2)
+        and importlib.util.find_spec("python_calamine") is not None
+    )
+
+
+_HAS_CALAMINE = _calamine_supported()
+
+
+def excel_engine(file_path: str) -> Optional[str]:
+    if _HAS_CALAMINE:
+        return "calamine"
+    return "openpyxl" if file_path.lower().endswith(".xlsx") else None
+
+
+def excel_sheet_names(file_path: str) -> List[str]:
+    with pd.ExcelFile(file_path, engine=excel_engine(file_path)) as workbook:
+        return [str(name) for name in workbook.sheet_names]
+
+
+def cache_excel_sheets(
+    file_path: str, sheets: Optional[List[str]] = None
+) -> Dict[str, int]:
+    """
+    Parse `sheets` (default: all) into their columnar caches, up to
+    EXCEL_MAX_WORKERS at a time. Returns the row count of each sheet.
+    """
+    names = excel_sheet_names(file_path)
+    for sheet in sheets or []:
+        if sheet not in names:
+            raise ValueError(f"Sheet '{sheet}' not found in file.")
+    sheets = sheets or names
+
+    firsts = [sheet == names[0] for sheet in sheets]
+
+    workers = min(settings.EXCEL_MAX_WORKERS, len(sheets))
+    if workers <= 1:
+        return {
+            sheet: _cache_sheet(file_path, sheet, first)
+            for sheet, first in zip(sheets, firsts)
+        }
+    # spawn, not fork: the API process has threads (and the event loop)
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        counts = pool.map(_cache_sheet, [file_path] * len(sheets), sheets, firsts)
+        return dict(zip(sheets, counts))
+
+
+def _cache_sheet(file_path: str, sheet: str, first: bool = False) -> int:
+    if first and settings.COLUMNAR_CACHE_ENABLED:
+        # Reading without a sheet name (the upload's metadata read) already
+        # cached the first sheet; copy that rather than parse it again
+        df = read_columnar_cache(file_path)
+        if df is not None:
+            return len(write_columnar_cache(file_path, df, sheet))
+    return len(FileProcessor(file_path, sheet_name=sheet).df)
 
 
 # ── helpers ───────────────────────────────────────────────────────────────────
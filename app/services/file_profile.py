@@ -0,0 +1,222 @@
+"""
+Cached profiles of uploaded files.
+
+A profile is a file's metadata (FileProcessor.get_file_metadata) plus the
+column stats of every column, computed from a single parse of the file and
+one profiling pass per column, and stored as a hidden JSON sidecar next to
+the upload:
+
+    uploaded_files/20260101_120000_ab12cd34.csv
+    uploaded_files/.20260101_120000_ab12cd34.csv.profile.json
+
+Excel sheets other than the default one get their own sidecar, named like
+their columnar cache (`.<name>.<sheet>.profile.json`).
+
+The sidecar records the upload's size and mtime; when either changes the
+profile is rebuilt on the next read. Deleting an upload must also call
+invalidate_profile().
+
+Large uploads first get a fast profile ("complete": false) built from the
+head of the file plus a random sample of rows; the profile_file_task worker
+task later replaces it with the exact one.
+"""
+
+import json
+import os
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from app.core.config import settings
+from app.services.file_processor import (
+    FileProcessor,
+    excel_engine,
+    read_csv_bytes,
+    remove_sidecars,
+    sidecar_path,
+)
+
+# Bump when the profile layout changes so stale sidecars are rebuilt
+PROFILE_VERSION = 3
+
+
+def profile_path(file_path: str, sheet: Optional[str] = None) -> str:
+    return sidecar_path(file_path, ".profile.json", sheet)
+
+
+def build_profile(file_path: str, sheet: Optional[str] = None) -> Dict[str, Any]:
+    """Parse the file once and compute metadata plus stats for every column."""
+    processor = FileProcessor(file_path, sheet_name=sheet)
+    fingerprint = _fingerprint(file_path)
+    return _profile(processor, fingerprint, complete=True)
+
+
+def build_fast_profile(file_path: str) -> Dict[str, Any]:
+    """
+    Profile the first PROFILE_HEAD_ROWS rows plus a random sample of about
+    PROFILE_SAMPLE_ROWS more without parsing the whole file. Counts and
+    stats describe the sample; `row_count` is an estimate unless the format
+    records it (see `row_count_exact`).
+    """
+    fingerprint = _fingerprint(file_path)
+    sample, row_count, exact = _sample_rows(file_path)
+    profile = _profile(FileProcessor(file_path, df=sample), fingerprint, complete=exact)
+    profile["metadata"].update(row_count=row_count, row_count_exact=exact)
+    return profile
+
+
+def load_profile(
+    file_path: str, sheet: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    """The cached profile, or None if missing or out of date."""
+    try:
+        with open(profile_path(file_path, sheet), encoding="utf-8") as fh:
+            profile = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    if profile.get("version") != PROFILE_VERSION:
+        return None
+    if profile.get("source") != _fingerprint(file_path):
+        return None
+    return profile
+
+
+def save_profile(
+    file_path: str, profile: Dict[str, Any], sheet: Optional[str] = None
+) -> None:
+    path = profile_path(file_path, sheet)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(profile, fh, default=str)
+    os.replace(tmp, path)  # readers never see a half-written sidecar
+
+
+def get_profile(file_path: str, sheet: Optional[str] = None) -> Dict[str, Any]:
+    """Serve the cached profile, building and caching it on a miss."""
+    profile = load_profile(file_path, sheet)
+    if profile is None:
+        profile = build_profile(file_path, sheet)
+        save_profile(file_path, profile, sheet)
+    return profile
+
+
+def get_cached_column_stats(
+    file_path: str, column_name: str, sheet: Optional[str] = None
+) -> Dict[str, Any]:
+    stats = get_profile(file_path, sheet)["column_stats"].get(column_name)
+    if stats is None:
+        raise ValueError(f"Column '{column_name}' not found in file.")
+    return stats
+
+
+def invalidate_profile(file_path: str) -> None:
+    remove_sidecars(file_path, ".profile.json")
+
+
+# ── helpers ───────────────────────────────────────────────────────────────────
+
+
+def _profile(
+    processor: FileProcessor, fingerprint: Dict[str, int], complete: bool
+) -> Dict[str, Any]:
+    metadata = processor.get_file_metadata()
+    metadata["row_count_exact"] = True
+    return {
+        "version": PROFILE_VERSION,
+        "source": fingerprint,
+        "complete": complete,
+        "metadata": metadata,
+        "column_stats": {
+            str(col): {"column_name": str(col), **stats}
+            for col, stats in processor.profile_columns().items()
+        },
+    }
+
+
+def _sample_rows(file_path: str) -> Tuple[pd.DataFrame, int, bool]:
+    """(sample frame, row count, whether the count is exact)."""
+    head_rows = settings.PROFILE_HEAD_ROWS
+    ext = os.path.splitext(file_path)[1].lower()
+
+    if ext == ".csv":
+        return _sample_csv(file_path, head_rows, settings.PROFILE_SAMPLE_ROWS)
+
+    if ext == ".parquet":
+        pf = pq.ParquetFile(file_path)
+        batch = next(pf.iter_batches(batch_size=head_rows), None)
+        table = batch if batch is not None else pf.schema_arrow.empty_table()
+        # The row count is in the footer; exact stats still need a full read
+        return table.to_pandas(), pf.metadata.num_rows, False
+
+    # Excel has no random access into a sheet: profile the head rows and
+    # take the row count from the sheet's recorded dimensions.
+    df = pd.read_excel(
+        file_path,
+        nrows=head_rows,
+        engine=excel_engine(file_path),
+    )
+    rows = _excel_row_count(file_path) if ext == ".xlsx" else None
+    return df, rows if rows is not None else len(df), False
+
+
+def _sample_csv(
+    file_path: str, head_rows: int, sample_rows: int
+) -> Tuple[pd.DataFrame, int, bool]:
+    """
+    Head rows plus lines picked at random byte offsets: seek, skip the
+    partial line, take the next one. Like the partitioner, this assumes no
+    quoted field spans a newline.
+    """
+    size = os.path.getsize(file_path)
+    with open(file_path, "rb") as fh:
+        header = fh.readline()
+        head = []
+        for _ in range(head_rows):
+            line = fh.readline()
+            if not line:
+                break
+            head.append(line)
+        head_end = fh.tell()
+        if head_end >= size:  # the whole file fit in the head
+            return read_csv_bytes(header + b"".join(head)), len(head), True
+
+        sampled = []
+        taken_to = head_end
+        rng = np.random.default_rng(0)  # same file → same profile
+        for offset in np.sort(rng.integers(head_end, size, sample_rows)):
+            if offset < taken_to:
+                continue  # inside a line already taken
+            fh.seek(offset)
+            fh.readline()
+            line = fh.readline()
+            if not line:
+                break
+            if not line.endswith(b"\n"):
+                line += b"\n"
+            sampled.append(line)
+            taken_to = fh.tell()
+
+    lines = head + sampled
+    df = read_csv_bytes(header + b"".join(lines))
+    # Sampled lines make the estimate robust to rows growing along the file
+    avg_line = sum(map(len, lines)) / max(len(lines), 1) or 1
+    return df, int(round((size - len(header)) / avg_line)), False
+
+
+def _excel_row_count(file_path: str) -> Optional[int]:
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file_path, read_only=True)
+    try:
+        # The first sheet, as sampled — not the sheet that was active on save
+        max_row = workbook.worksheets[0].max_row
+    finally:
+        workbook.close()
+    return max_row - 1 if max_row else None
+
+
+def _fingerprint(file_path: str) -> Dict[str, int]:
+    stat = os.stat(file_path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
@@ -0,0 +1,231 @@
+"""
+Split one ETL source into independent partitions so a single job can fan out
+across several Celery workers.
+
+A partition is a small JSON-safe dict (it travels through the broker):
+
+    {"index": 0, "count": 4, "kind": "csv_bytes", "start": 31, "end": 1048607,
+     "dtypes": {"id": "Int64", "name": "str"}}
+    {"index": 1, "count": 4, "kind": "parquet_row_groups", "row_groups": [2, 3]}
+    {"index": 2, "count": 4, "kind": "db_key_range", "lower": 500, "upper": 750}
+    {"index": 0, "count": 1, "kind": "whole"}
+
+Sources that cannot be split (REST APIs, Excel, DB sources without a
+partition_column) always produce a single "whole" partition, as do CSVs with
+quoted fields that span lines.
+"""
+
+import numbers
+import os
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from app.core.config import settings
+from app.models.schemas import ColumnMapping, DatabaseSource, ETLJobRequest
+from app.services.db_reader import (
+    base_select_sql,
+    key_bounds,
+    quote_identifier,
+    read_from_db,
+)
+from app.services.file_processor import FileProcessor, read_csv_bytes
+
+
+def plan_partitions(request: ETLJobRequest) -> List[Dict[str, Any]]:
+    """Describe up to `request.partitions` slices of the request's source."""
+    n = request.partitions
+    ranges: List[Dict[str, Any]] = []
+
+    if request.file_id and n > 1:
+        path = os.path.join(settings.UPLOAD_DIR, request.file_id)
+        ext = os.path.splitext(path)[1].lower()
+        if ext == ".csv" and not _csv_has_multiline_fields(path):
+            byte_ranges = _csv_byte_ranges(path, n)
+            dtypes = _csv_dtypes(path, byte_ranges)
+            ranges = [
+                {"kind": "csv_bytes", "start": start, "end": end, "dtypes": dtypes}
+                for start, end in byte_ranges
+            ]
+        elif ext == ".parquet":
+            groups = list(range(pq.ParquetFile(path).num_row_groups))
+            ranges = [
+                {"kind": "parquet_row_groups", "row_groups": groups[i::n]}
+                for i in range(min(n, len(groups)))
+            ]
+
+    elif request.db_source and request.db_source.partition_column and n > 1:
+        ranges = [
+            {"kind": "db_key_range", "lower": lower, "upper": upper}
+            for lower, upper in _db_key_ranges(request.db_source, n)
+        ]
+
+    if not ranges:
+        ranges = [{"kind": "whole"}]
+    return [{"index": i, "count": len(ranges), **spec} for i, spec in enumerate(ranges)]
+
+
+def read_partition(
+    request: ETLJobRequest, partition: Dict[str, Any]
+) -> Tuple[pd.DataFrame, Optional[List[ColumnMapping]]]:
+    """
+    Extract one partition. Returns the frame plus auto-generated column
+    mappings for DB sources (None for files).
+    """
+    kind = partition["kind"]
+
+    if kind == "db_key_range":
+        src = request.db_source
+        column = quote_identifier(src.connection.db_type, src.partition_column)
+        op = "<=" if partition["index"] == partition["count"] - 1 else "<"
+        where = (
+            f"{column} >= {partition['lower']} AND {column} {op} {partition['upper']}"
+        )
+        if partition["index"] == 0:
+            # NULL keys fall in no range; the first partition takes them
+            where = f"({where}) OR {column} IS NULL"
+        query = f"SELECT * FROM ({base_select_sql(src)}) AS _p WHERE {where}"
+        sliced = src.model_copy(
+            update={"table_name": None, "query": query, "columns": None}
+        )
+        return read_from_db(sliced)
+
+    if kind == "whole":
+        if request.db_source:
+            return read_from_db(request.db_source)
+        path = os.path.join(settings.UPLOAD_DIR, request.file_id)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Source file not found: {request.file_id}")
+        return FileProcessor(path, sheet_name=request.sheet_name).df, None
+
+    path = os.path.join(settings.UPLOAD_DIR, request.file_id)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Source file not found: {request.file_id}")
+
+    if kind == "csv_bytes":
+        with open(path, "rb") as fh:
+            header = fh.readline()
+            fh.seek(partition["start"])
+            body = fh.read(partition["end"] - partition["start"])
+        try:
+            return read_csv_bytes(header + body, dtype=partition.get("dtypes")), None
+        except (TypeError, ValueError) as exc:
+            raise ValueError(
+                f"CSV partition {partition['index']} does not match the column "
+                f"types sampled from the file ({exc}); run it with partitions=1."
+            ) from exc
+
+    if kind == "parquet_row_groups":
+        table = pq.ParquetFile(path).read_row_groups(partition["row_groups"])
+        return table.to_pandas(), None
+
+    raise ValueError(f"Unknown partition kind: {kind}")
+
+
+# ── helpers ───────────────────────────────────────────────────────────────────
+
+# Rows sampled from the start of every CSV byte range to fix the column types
+CSV_SAMPLE_ROWS = 1_000
+
+
+def _csv_byte_ranges(path: str, n: int) -> List[Tuple[int, int]]:
+    """
+    Split the CSV body into ~n byte ranges aligned to line starts. Only valid
+    when no quoted field spans a newline; see _csv_has_multiline_fields.
+    """
+    size = os.path.getsize(path)
+    with open(path, "rb") as fh:
+        bounds = [len(fh.readline())]
+        body = size - bounds[0]
+        for i in range(1, n):
+            target = bounds[0] + body * i // n
+            if target <= bounds[-1]:
+                continue
+            fh.seek(target)
+            fh.readline()  # finish the line we landed in
+            pos = fh.tell()
+            if pos >= size:
+                break
+            if pos > bounds[-1]:
+                bounds.append(pos)
+    bounds.append(size)
+    return [(s, e) for s, e in zip(bounds[:-1], bounds[1:]) if e > s]
+
+
+def _csv_has_multiline_fields(path: str, chunk_size: int = 1 << 20) -> bool:
+    """
+    True if a quoted field contains a line break, i.e. a newline sits after
+    an odd number of quotes. Escaped quotes ("") come in pairs, so counting
+    is enough; a file with such fields cannot be split at line starts.
+    """
+    quoted = False
+    with open(path, "rb") as fh:
+        while chunk := fh.read(chunk_size):
+            pieces = chunk.split(b'"')
+            # pieces[k] follows k quotes of this chunk
+            if b"\n" in b"".join(pieces[1 - quoted :: 2]):
+                return True
+            quoted ^= (len(pieces) - 1) % 2 == 1
+    return False
+
+
+def _csv_dtypes(path: str, ranges: List[Tuple[int, int]]) -> Dict[str, str]:
+    """
+    Column types for every slice, inferred once from the header plus the
+    first CSV_SAMPLE_ROWS lines of each range. Left to itself pandas infers
+    per slice, so a blank turns one slice's int64 column into float64.
+    """
+    with open(path, "rb") as fh:
+        lines = [fh.readline()]
+        for start, _ in ranges:
+            fh.seek(start)
+            for _, line in zip(range(CSV_SAMPLE_ROWS), fh):
+                lines.append(line if line.endswith(b"\n") else line + b"\n")
+    sample = read_csv_bytes(b"".join(lines))
+    return {str(col): _csv_dtype(sample[col]) for col in sample.columns}
+
+
+def _csv_dtype(col: pd.Series) -> str:
+    # Nullable types, so a blank further down the file still fits
+    if col.isnull().all():
+        return "str"
+    if pd.api.types.is_bool_dtype(col):
+        return "boolean"
+    if pd.api.types.is_integer_dtype(col):
+        return "Int64"
+    if pd.api.types.is_float_dtype(col):
+        return "float64"
+    return "str"
+
+
+def _db_key_ranges(source: DatabaseSource, n: int) -> List[Tuple[Any, Any]]:
+    """Equal-width [lower, upper) ranges over a numeric partition column."""
+    lo, hi = key_bounds(source, source.partition_column)
+    if lo is None:
+        return []
+    try:
+        lo, hi = _key_number(lo), _key_number(hi)
+    except (TypeError, ValueError) as exc:
+        raise ValueError(
+            f"partition_column '{source.partition_column}' must be numeric."
+        ) from exc
+
+    if isinstance(lo, int) and isinstance(hi, int):
+        # Integer arithmetic: float bounds lose keys above 2**53
+        edges = sorted({lo + (hi - lo) * i // n for i in range(n)} | {hi})
+    else:
+        step = (hi - lo) / n
+        edges = [lo + step * i for i in range(n)] + [hi]
+    return list(zip(edges[:-1], edges[1:])) or [(edges[0], edges[0])]
+
+
+def _key_number(value: Any) -> Any:
+    """A key bound as an exact int when integral, else a float."""
+    if isinstance(value, numbers.Integral):
+        return int(value)
+    if isinstance(value, Decimal) and value == value.to_integral_value():
+        return int(value)
+    number = float(value)
+    return int(number) if number.is_integer() else number
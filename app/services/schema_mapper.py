@@ -1,25 +1,233 @@
+import os
+import pickle
 import re
-from typing import Any, Dict, List, Optional, Tuple
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 
-from app.core.constants import DataType, ValidationRuleType
+from app.core.config import settings
+from app.core.constants import DataType, FilterOperator, ValidationRuleType
 from app.models.schemas import (
     AggregationRule,
     ColumnMapping,
     FilterRule,
     ValidationRule,
 )
+from app.services.sketches import HyperLogLog, TDigest
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  Shared rule helpers
+# ─────────────────────────────────────────────────────────────────────────────
+
+_EMAIL_PATTERN = r"^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$"
+
+FO = FilterOperator
+VR = ValidationRuleType
+
+# Which derived view of a column each rule kind reads. Rules not listed here
+# work directly on the raw column.
+_STRING_VIEW_RULES = {
+    FO.CONTAINS,
+    FO.NOT_CONTAINS,
+    VR.MIN_LENGTH,
+    VR.MAX_LENGTH,
+    VR.REGEX,
+    VR.EMAIL,
+}
+_NUMERIC_VIEW_RULES = {VR.MIN_VALUE, VR.MAX_VALUE, VR.NUMERIC}
+
+
+@lru_cache(maxsize=256)
+def _compile_pattern(pattern: str) -> "re.Pattern[str]":
+    return re.compile(pattern)
+
+
+@lru_cache(maxsize=256)
+def _arrow_accepts(pattern: str) -> bool:
+    """
+    Arrow's regex kernels use RE2, which rejects some Python-only syntax
+    (lookarounds, backreferences). Those patterns fall back to `re`.
+    """
+    try:
+        pc.match_substring_regex(pa.array([""], type=pa.string()), pattern)
+        return True
+    except pa.ArrowInvalid:
+        return False
+
+
+def _regex_mask(strings: pa.Array, pattern: str, anchored: bool) -> np.ndarray:
+    """
+    Boolean mask of values matching `pattern`; nulls never match.
+    anchored=True mirrors str.match, anchored=False mirrors str.contains.
+    """
+    compiled = _compile_pattern(pattern)  # surfaces re.error for bad patterns
+    arrow_pattern = f"^(?:{pattern})" if anchored else pattern
+    if _arrow_accepts(arrow_pattern):
+        hits = pc.match_substring_regex(strings, arrow_pattern).fill_null(False)
+        return hits.to_numpy(zero_copy_only=False)
+
+    fn = compiled.match if anchored else compiled.search
+    return np.fromiter(
+        (v is not None and fn(v) is not None for v in strings.to_pylist()),
+        dtype=bool,
+        count=len(strings),
+    )
+
+
+def _length_mask(strings: pa.Array, op, bound: int) -> np.ndarray:
+    """Compare each string's character length against `bound`; nulls pass."""
+    hits = op(pc.utf8_length(strings), bound).fill_null(False)
+    return hits.to_numpy(zero_copy_only=False)
+
+
+def _as_mask(result) -> np.ndarray:
+    """Flatten a pandas boolean result (possibly nullable) to a numpy mask."""
+    if isinstance(result, np.ndarray):
+        return result.astype(bool, copy=False)
+    return result.to_numpy(dtype=bool, na_value=False)
+
+
+def _rule_kind(rule: Union[FilterRule, ValidationRule]) -> str:
+    return rule.operator if isinstance(rule, FilterRule) else rule.rule_type
+
+
+def _view_for(kind: str) -> str:
+    if kind in _STRING_VIEW_RULES:
+        return "string"
+    if kind in _NUMERIC_VIEW_RULES:
+        return "numeric"
+    return "raw"
+
+
+_NUMERIC_SAMPLE_SIZE = 1_000
+
+
+@lru_cache(maxsize=4)
+def _numeric_noise(decimal: str) -> "re.Pattern[str]":
+    """Currency symbols, whitespace and the thousands separator for a locale."""
+    thousands = "," if decimal == "." else "."
+    return re.compile(rf"[\s$€£¥{re.escape(thousands)}]")
+
+
+def _sample_is_numeric(col: pd.Series) -> bool:
+    sample = col.dropna().head(_NUMERIC_SAMPLE_SIZE)
+    return bool(pd.to_numeric(sample, errors="coerce").notnull().all())
+
+
+def _fast_path_safe(col: pd.Series) -> bool:
+    """
+    False when the column may hold bools: pd.to_numeric turns True into 1,
+    while the text route ("True") leaves them unparsed as it always has.
+    """
+    inferred = pd.api.types.infer_dtype(col, skipna=True)
+    return inferred not in ("boolean", "mixed", "mixed-integer")
+
+
+def _clean_numeric(values: pd.Series, decimal: str) -> pd.Series:
+    text = values.astype(str).str.replace(_numeric_noise(decimal), "", regex=True)
+    if decimal != ".":
+        text = text.str.replace(decimal, ".", regex=False)
+    return pd.to_numeric(text, errors="coerce")
+
+
+class _ColumnViews:
+    """
+    Per-stage cache of derived column views, so each column is cast to
+    string (Arrow) or numeric (float64) at most once however many rules
+    read it.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self._df = df
+        self._strings: Dict[str, pa.Array] = {}
+        self._numbers: Dict[str, np.ndarray] = {}
+
+    def raw(self, col: str) -> pd.Series:
+        return self._df[col]
+
+    def string(self, col: str) -> pa.Array:
+        if col not in self._strings:
+            self._strings[col] = pa.array(
+                self._df[col].astype(str), type=pa.string(), from_pandas=True
+            )
+        return self._strings[col]
+
+    def numeric(self, col: str) -> np.ndarray:
+        if col not in self._numbers:
+            self._numbers[col] = pd.to_numeric(self._df[col], errors="coerce").to_numpy(
+                dtype="float64", na_value=np.nan
+            )
+        return self._numbers[col]
+
+
+class RulePlan:
+    """
+    Filter or validation rules compiled into per-column groups.
+
+    Rules on the same column are evaluated together against shared views and
+    folded into one mask with a single NumPy reduction. Each entry keeps the
+    rule's position in the request so results can be reported in that order.
+    """
+
+    def __init__(
+        self,
+        groups: Dict[str, List[Tuple[int, Union[FilterRule, ValidationRule]]]],
+        skipped: List[str],
+    ):
+        self.groups = groups
+        self.skipped = skipped
+
+    @classmethod
+    def compile(
+        cls,
+        rules: List[Union[FilterRule, ValidationRule]],
+        columns: pd.Index,
+    ) -> "RulePlan":
+        groups: Dict[str, List[Tuple[int, Any]]] = {}
+        skipped: List[str] = []
+        for pos, rule in enumerate(rules):
+            if rule.column not in columns:
+                skipped.append(rule.column)
+                continue
+            groups.setdefault(rule.column, []).append((pos, rule))
+        return cls(groups, skipped)
+
+    def describe(self) -> Dict[str, Any]:
+        """JSON-safe summary of the plan, for logs and debugging."""
+        columns = []
+        for col, entries in self.groups.items():
+            kinds = [_rule_kind(rule) for _, rule in entries]
+            views = sorted({_view_for(k) for k in kinds})
+            columns.append(
+                {
+                    "column": col,
+                    "views": views,
+                    "rules": [
+                        {"position": pos, "rule": kind.value}
+                        for (pos, _), kind in zip(entries, kinds)
+                    ],
+                }
+            )
+        return {"columns": columns, "skipped_columns": self.skipped}
 
 
 class SchemaMapper:
     """Applies column mappings, renames, prefix/suffix, type casts."""
 
-    def __init__(self, df: pd.DataFrame):
+    def __init__(self, df: pd.DataFrame, max_workers: Optional[int] = None):
         self.df = df.copy()
         self.transformed_df: Optional[pd.DataFrame] = None
         self.transformation_errors: List[Dict[str, str]] = []
+        # >1 converts columns on a thread pool; pandas/Arrow string and
+        # datetime kernels release the GIL for much of their work.
+        self.max_workers = max_workers or settings.TRANSFORM_MAX_WORKERS
 
     def apply_column_mapping(
         self, column_mappings: List[ColumnMapping]
@@ -27,16 +235,15 @@ class SchemaMapper:
         self.transformed_df = self.df.copy()
         self.transformation_errors = []
 
-        for mapping in column_mappings:
-            try:
-                self._transform_column(mapping)
-            except Exception as exc:
-                self.transformation_errors.append(
-                    {
-                        "column": mapping.column_name,
-                        "error": str(exc),
-                    }
-                )
+        if self._can_parallelise(column_mappings):
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                outcomes = list(pool.map(self._try_convert, column_mappings))
+            # Assemble on the calling thread, in mapping order
+            for mapping, outcome in zip(column_mappings, outcomes):
+                self._record(mapping, outcome)
+        else:
+            for mapping in column_mappings:
+                self._record(mapping, self._try_convert(mapping))
 
         # Apply renames after all type casts so we don't confuse references
         rename_map: Dict[str, str] = {}
@@ -56,7 +263,39 @@ class SchemaMapper:
 
         return self.transformed_df
 
-    def _transform_column(self, mapping: ColumnMapping) -> None:
+    def _can_parallelise(self, column_mappings: List[ColumnMapping]) -> bool:
+        # Repeated mappings of one column must see each other's output, so
+        # they keep the sequential path.
+        names = [m.column_name for m in column_mappings]
+        return self.max_workers > 1 and len(names) > 1 and len(set(names)) == len(names)
+
+    def _try_convert(
+        self, mapping: ColumnMapping
+    ) -> Union[Optional[pd.Series], Exception]:
+        try:
+            return self._convert_column(mapping)
+        except Exception as exc:
+            return exc
+
+    def _record(
+        self,
+        mapping: ColumnMapping,
+        outcome: Union[Optional[pd.Series], Exception],
+    ) -> None:
+        try:
+            if isinstance(outcome, Exception):
+                raise outcome
+            self._transform_column(mapping, outcome)
+        except Exception as exc:
+            self.transformation_errors.append(
+                {
+                    "column": mapping.column_name,
+                    "error": str(exc),
+                }
+            )
+
+    def _convert_column(self, mapping: ColumnMapping) -> Optional[pd.Series]:
+        """Type-cast one column without touching the frame (thread-safe)."""
         col_name = mapping.column_name
         if col_name not in self.transformed_df.columns:
             raise ValueError(f"Column '{col_name}' not found in dataframe.")
@@ -78,8 +317,14 @@ class SchemaMapper:
         }
 
         handler = dispatch.get(mapping.target_dtype)
-        if handler:
-            self.transformed_df[col_name] = handler(col, mapping)
+        return handler(col, mapping) if handler else None
+
+    def _transform_column(
+        self, mapping: ColumnMapping, converted: Optional[pd.Series]
+    ) -> None:
+        col_name = mapping.column_name
+        if converted is not None:
+            self.transformed_df[col_name] = converted
 
         # Nullability enforcement
         if not mapping.is_nullable:
@@ -99,27 +344,13 @@ class SchemaMapper:
 
     def _to_integer(self, col: pd.Series, mapping: ColumnMapping) -> pd.Series:
         try:
-            if pd.api.types.is_string_dtype(col) or col.dtype == object:
-                col = (
-                    col.astype(str)
-                    .str.replace(",", "", regex=False)
-                    .str.replace("$", "", regex=False)
-                    .str.strip()
-                )
-            return pd.to_numeric(col, errors="coerce").astype("Int64")
+            return self._parse_numeric(col, mapping).astype("Int64")
         except Exception as exc:
             raise ValueError(f"Cannot convert to integer: {exc}") from exc
 
     def _to_float(self, col: pd.Series, mapping: ColumnMapping) -> pd.Series:
         try:
-            if pd.api.types.is_string_dtype(col) or col.dtype == object:
-                col = (
-                    col.astype(str)
-                    .str.replace(",", "", regex=False)
-                    .str.replace("$", "", regex=False)
-                    .str.strip()
-                )
-            return pd.to_numeric(col, errors="coerce")
+            return self._parse_numeric(col, mapping)
         except Exception as exc:
             raise ValueError(f"Cannot convert to float: {exc}") from exc
 
@@ -177,6 +408,29 @@ class SchemaMapper:
         except Exception:
             return pd.to_datetime(col, errors="coerce")
 
+    def _parse_numeric(self, col: pd.Series, mapping: ColumnMapping) -> pd.Series:
+        """
+        Parse text like "$1,234.50" to numbers.
+
+        When a sample of the column already parses cleanly (and the decimal
+        separator is "."), the whole column goes straight to pd.to_numeric and
+        only the rows that fail are cleaned afterwards. Otherwise the column
+        is cleaned with one compiled-regex pass before parsing.
+        """
+        if not (pd.api.types.is_string_dtype(col) or col.dtype == object):
+            return pd.to_numeric(col, errors="coerce")
+
+        decimal = mapping.decimal_separator
+        if decimal == "." and _fast_path_safe(col) and _sample_is_numeric(col):
+            parsed = pd.to_numeric(col, errors="coerce")
+            dirty = parsed.isnull() & col.notnull()
+            if dirty.any():
+                parsed = parsed.astype("float64")
+                parsed[dirty] = _clean_numeric(col[dirty], decimal)
+            return parsed
+
+        return _clean_numeric(col, decimal)
+
     # ── format converters ───────────────────────────────────────────────────
 
     def _convert_date_format(self, fmt: str) -> str:
@@ -211,81 +465,365 @@ class SchemaMapper:
 class RowFilter:
     """Apply filter rules to a DataFrame, returning (kept_df, filtered_df)."""
 
+    def __init__(self):
+        # Compiled plan of the last apply() call, kept for debugging.
+        self.plan: Optional[RulePlan] = None
+
     def apply(
         self, df: pd.DataFrame, rules: List[FilterRule]
     ) -> Tuple[pd.DataFrame, pd.DataFrame]:
         if not rules:
             return df, pd.DataFrame(columns=df.columns)
 
-        mask = pd.Series([True] * len(df), index=df.index)
+        self.plan = RulePlan.compile(rules, df.columns)
+        views = _ColumnViews(df)
+        mask = np.ones(len(df), dtype=bool)
 
-        for rule in rules:
-            col = rule.column
-            if col not in df.columns:
-                continue
-            series = df[col]
-
-            from app.core.constants import FilterOperator as FO
-
-            op = rule.operator
-
-            if op == FO.EQUALS:
-                mask &= series == rule.value
-            elif op == FO.NOT_EQUALS:
-                mask &= series != rule.value
-            elif op == FO.GREATER_THAN:
-                mask &= series > rule.value
-            elif op == FO.LESS_THAN:
-                mask &= series < rule.value
-            elif op == FO.GREATER_THAN_OR_EQUAL:
-                mask &= series >= rule.value
-            elif op == FO.LESS_THAN_OR_EQUAL:
-                mask &= series <= rule.value
-            elif op == FO.CONTAINS:
-                mask &= series.astype(str).str.contains(str(rule.value), na=False)
-            elif op == FO.NOT_CONTAINS:
-                mask &= ~series.astype(str).str.contains(str(rule.value), na=False)
-            elif op == FO.IS_NULL:
-                mask &= series.isnull()
-            elif op == FO.IS_NOT_NULL:
-                mask &= series.notnull()
-            elif op == FO.IN:
-                mask &= series.isin(rule.values or [])
-            elif op == FO.NOT_IN:
-                mask &= ~series.isin(rule.values or [])
+        for col, entries in self.plan.groups.items():
+            keep = [self._keep(views, col, rule) for _, rule in entries]
+            mask &= np.logical_and.reduce(keep)
 
         kept = df[mask].reset_index(drop=True)
         filtered_out = df[~mask].reset_index(drop=True)
         return kept, filtered_out
 
+    @staticmethod
+    def _keep(views: _ColumnViews, col: str, rule: FilterRule) -> np.ndarray:
+        op = rule.operator
+
+        if op == FO.CONTAINS:
+            return _regex_mask(views.string(col), str(rule.value), anchored=False)
+        if op == FO.NOT_CONTAINS:
+            return ~_regex_mask(views.string(col), str(rule.value), anchored=False)
+
+        series = views.raw(col)
+        if op == FO.EQUALS:
+            return _as_mask(series == rule.value)
+        if op == FO.NOT_EQUALS:
+            return _as_mask(series != rule.value)
+        if op == FO.GREATER_THAN:
+            return _as_mask(series > rule.value)
+        if op == FO.LESS_THAN:
+            return _as_mask(series < rule.value)
+        if op == FO.GREATER_THAN_OR_EQUAL:
+            return _as_mask(series >= rule.value)
+        if op == FO.LESS_THAN_OR_EQUAL:
+            return _as_mask(series <= rule.value)
+        if op == FO.IS_NULL:
+            return _as_mask(series.isnull())
+        if op == FO.IS_NOT_NULL:
+            return _as_mask(series.notnull())
+        if op == FO.IN:
+            return _as_mask(series.isin(rule.values or []))
+        if op == FO.NOT_IN:
+            return ~_as_mask(series.isin(rule.values or []))
+        return np.ones(len(series), dtype=bool)
+
 
 # ─────────────────────────────────────────────────────────────────────────────
 #  Aggregation
 # ─────────────────────────────────────────────────────────────────────────────
 
 
+def _distinct_set(values: np.ndarray) -> set:
+    return set(values.tolist())
+
+
+def _union_sets(sets: np.ndarray) -> set:
+    return sets[0] if len(sets) == 1 else set().union(*sets)
+
+
+def _merge_sketches(sketches: np.ndarray):
+    merged = sketches[0]
+    for sketch in sketches[1:]:
+        merged = merged.merge(sketch)
+    return merged
+
+
+def _per_group(grouped, values: pd.Series, build) -> List[Any]:
+    """
+    Run `build` on each group's non-null values as a plain ndarray, in
+    group order. One sort + split instead of groupby's per-group Series
+    path, which dominates when there are many small groups.
+    """
+    if not grouped.ngroups:
+        return []
+    ids = grouped.ngroup().to_numpy()
+    keep = (ids >= 0) & values.notna().to_numpy()
+    ids, data = ids[keep], values.to_numpy()[keep]
+    order = np.argsort(ids, kind="stable")
+    ids, data = ids[order], data[order]
+    bounds = np.searchsorted(ids, np.arange(grouped.ngroups + 1)).tolist()
+    return [build(data[lo:hi]) for lo, hi in zip(bounds[:-1], bounds[1:])]
+
+
+# Partial states per decomposable function, as
+# (state, first-phase aggfunc, combine aggfunc). AVG travels as sum + count
+# and is divided in finalize(); count_distinct keeps exact value sets, the
+# approx_* functions keep fixed-size sketches (see app.services.sketches).
+# Object states are built per group by _per_group() from ndarrays.
+_PARTIAL_STATES: Dict[str, Tuple[Tuple[str, Any, Any], ...]] = {
+    "sum": (("sum", "sum", "sum"),),
+    "count": (("count", "count", "sum"),),
+    "avg": (("sum", "sum", "sum"), ("count", "count", "sum")),
+    "min": (("min", "min", "min"),),
+    "max": (("max", "max", "max"),),
+    "count_distinct": (("set", _distinct_set, _union_sets),),
+    "approx_count_distinct": (("hll", HyperLogLog.from_values, _merge_sketches),),
+    "approx_percentile": (("tdigest", TDigest.from_values, _merge_sketches),),
+}
+_PARTIAL_STATES["mean"] = _PARTIAL_STATES["avg"]
+
+# States held as Python objects; pickled when spilled to Parquet
+_OBJECT_STATES = {"set", "hll", "tdigest"}
+
+
+def _frame_bytes(df: pd.DataFrame) -> int:
+    return int(df.memory_usage(index=False, deep=True).sum())
+
+
+class _SpillBuckets:
+    """
+    Hash-partition frames by group key into on-disk Parquet buckets, so that
+    every group lands in exactly one bucket and buckets aggregate
+    independently. Object columns listed in `pickled` are stored as bytes.
+    """
+
+    def __init__(self, group_by: List[str], buckets: int, pickled=()):
+        self.group_by = group_by
+        self.buckets = buckets
+        self.pickled = list(pickled)
+        spill_root = settings.SPILL_DIR or None
+        if spill_root:
+            os.makedirs(spill_root, exist_ok=True)
+        self.path = tempfile.mkdtemp(prefix="agg-spill-", dir=spill_root)
+        self._files: Dict[int, List[str]] = {}
+        self._seq = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def add(self, df: pd.DataFrame) -> None:
+        if df.empty:
+            return
+        df = df.copy() if self.pickled else df
+        for col in self.pickled:
+            df[col] = df[col].map(pickle.dumps)
+        hashes = pd.util.hash_pandas_object(df[self.group_by], index=False)
+        bucket_of = hashes.to_numpy() % np.uint64(self.buckets)
+        for bucket in np.unique(bucket_of):
+            out = os.path.join(self.path, f"b{bucket:04d}-{self._seq:06d}.parquet")
+            df[bucket_of == bucket].to_parquet(out, index=False)
+            self._files.setdefault(int(bucket), []).append(out)
+        self._seq += 1
+
+    def frames(self) -> Iterator[pd.DataFrame]:
+        """Yield each non-empty bucket as one frame, deleting it once read."""
+        for bucket in sorted(self._files):
+            paths = self._files.pop(bucket)
+            df = pd.concat([pd.read_parquet(p) for p in paths], ignore_index=True)
+            for p in paths:
+                os.remove(p)
+            for col in self.pickled:
+                df[col] = df[col].map(pickle.loads)
+            yield df
+
+
 class Aggregator:
-    """Apply group-by aggregations."""
+    """
+    Apply group-by aggregations.
+
+    Decomposable functions (sum, count, avg/mean, min, max, count_distinct,
+    approx_count_distinct, approx_percentile) run in two phases: partial()
+    reduces a chunk to one state row per group, combine() merges states from
+    any number of chunks or workers, and finalize() turns states into the
+    output columns. Any other pandas function name falls back to a single
+    groupby over the whole frame.
+
+    When the input frame or the per-group state outgrows the memory budget,
+    rows (or states) are hash-partitioned by group key into Parquet buckets
+    on disk and aggregated one bucket at a time.
+    """
+
+    def __init__(
+        self,
+        memory_budget_mb: Optional[int] = None,
+        spill_buckets: Optional[int] = None,
+    ):
+        budget = memory_budget_mb or settings.AGGREGATION_MEMORY_BUDGET_MB
+        self.memory_budget = budget * 1024 * 1024
+        self.spill_buckets = spill_buckets or settings.AGGREGATION_SPILL_BUCKETS
+        # Whether the last apply()/apply_chunks() call spilled to disk
+        self.spilled = False
 
     def apply(self, df: pd.DataFrame, rule: AggregationRule) -> pd.DataFrame:
-        agg_spec: Dict[str, Any] = {}
-        rename_map: Dict[str, str] = {}
+        self.spilled = False
+        size = _frame_bytes(df)
+        if size <= self.memory_budget:
+            if not self.is_decomposable(rule):
+                return self._apply_direct(df, rule)
+            return self.finalize(self.partial(df, rule), rule)
+
+        # Over budget: feed the frame through in budget-sized slices
+        rows = max(1, len(df) * self.memory_budget // size)
+        slices = (df.iloc[i : i + rows] for i in range(0, len(df), rows))
+        if self.is_decomposable(rule):
+            return self.apply_chunks(slices, rule)
+
+        buckets = max(self.spill_buckets, -(-size // self.memory_budget))
+        self.spilled = True
+        with _SpillBuckets(rule.group_by, buckets) as spill:
+            for part in slices:
+                spill.add(part)
+            results = [self._apply_direct(b, rule) for b in spill.frames()]
+        return self._concat_sorted(results, rule)
+
+    def apply_chunks(
+        self, chunks: Iterable[pd.DataFrame], rule: AggregationRule
+    ) -> pd.DataFrame:
+        """
+        Aggregate an iterable of frames holding only per-group state. Once
+        the state exceeds the memory budget, it and every later chunk's
+        partial state are spilled to disk and combined bucket by bucket.
+        """
+        self.spilled = False
+        state: Optional[pd.DataFrame] = None
+        spill: Optional[_SpillBuckets] = None
+        try:
+            for chunk in chunks:
+                part = self.partial(chunk, rule)
+                if spill is not None:
+                    spill.add(part)
+                    continue
+                state = part if state is None else self.combine([state, part], rule)
+                if _frame_bytes(state) > self.memory_budget:
+                    spill = _SpillBuckets(
+                        rule.group_by,
+                        self.spill_buckets,
+                        pickled=[
+                            name
+                            for name, *_ in self._states(rule)
+                            if name.rsplit("_", 1)[1] in _OBJECT_STATES
+                        ],
+                    )
+                    spill.add(state)
+                    state = None
+
+            if spill is None:
+                if state is None:
+                    empty = pd.DataFrame(columns=self._input_columns(rule))
+                    state = self.partial(empty, rule)
+                return self.finalize(state, rule)
+
+            self.spilled = True
+            results = [
+                self.finalize(self.combine([bucket], rule), rule)
+                for bucket in spill.frames()
+            ]
+            return self._concat_sorted(results, rule)
+        finally:
+            if spill is not None:
+                spill.__exit__(None, None, None)
+
+    @staticmethod
+    def is_decomposable(rule: AggregationRule) -> bool:
+        return all(agg["function"] in _PARTIAL_STATES for agg in rule.aggregations)
+
+    def partial(self, df: pd.DataFrame, rule: AggregationRule) -> pd.DataFrame:
+        return self._grouped_states(
+            df, rule, [(name, col, first) for name, col, first, _ in self._states(rule)]
+        )
 
-        for agg in rule.aggregations:
-            col = agg["column"]
+    def combine(
+        self, partials: List[pd.DataFrame], rule: AggregationRule
+    ) -> pd.DataFrame:
+        merged = pd.concat(partials, ignore_index=True)
+        return self._grouped_states(
+            merged,
+            rule,
+            [(name, name, merge) for name, _, _, merge in self._states(rule)],
+        )
+
+    def finalize(self, state: pd.DataFrame, rule: AggregationRule) -> pd.DataFrame:
+        result = state[list(rule.group_by)].copy()
+        for i, agg in enumerate(rule.aggregations):
             func = agg["function"]
-            alias = agg.get("alias", f"{func}_{col}")
+            alias = agg.get("alias", f"{func}_{agg['column']}")
+            if func in ("avg", "mean"):
+                count = state[f"__{i}_count"]
+                result[alias] = state[f"__{i}_sum"] / count.where(count > 0)
+            elif func == "count_distinct":
+                result[alias] = state[f"__{i}_set"].map(len)
+            elif func == "approx_count_distinct":
+                result[alias] = state[f"__{i}_hll"].map(HyperLogLog.estimate)
+            elif func == "approx_percentile":
+                q = float(agg.get("percentile", 0.5))
+                result[alias] = state[f"__{i}_tdigest"].map(
+                    lambda digest: digest.quantile(q)
+                )
+            else:
+                result[alias] = state[f"__{i}_{_PARTIAL_STATES[func][0][0]}"]
+        return result
 
-            if func == "count_distinct":
-                agg_spec[col] = pd.NamedAgg(column=col, aggfunc="nunique")
+    # ── internals ───────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _states(rule: AggregationRule) -> List[Tuple[str, str, Any, Any]]:
+        """(state column, source column, first-phase func, combine func) list."""
+        func_names = [agg["function"] for agg in rule.aggregations]
+        unknown = [f for f in func_names if f not in _PARTIAL_STATES]
+        if unknown:
+            raise ValueError(
+                f"Aggregation function(s) {unknown} cannot be computed in chunks."
+            )
+        return [
+            (f"__{i}_{state}", agg["column"], first, merge)
+            for i, agg in enumerate(rule.aggregations)
+            for state, first, merge in _PARTIAL_STATES[agg["function"]]
+        ]
+
+    @staticmethod
+    def _grouped_states(
+        df: pd.DataFrame, rule: AggregationRule, spec: List[Tuple[str, str, Any]]
+    ) -> pd.DataFrame:
+        """Group once and compute each (state column, source column, func)."""
+        grouped = df.groupby(rule.group_by)
+        out = grouped.size().to_frame("__rows")
+        for name, col, func in spec:
+            if name.rsplit("_", 1)[1] in _OBJECT_STATES:
+                out[name] = _per_group(grouped, df[col], func)
             else:
-                agg_spec[col] = pd.NamedAgg(column=col, aggfunc=func)
+                out[name] = grouped[col].agg(func)
+        return out.drop(columns="__rows").reset_index()
 
-            rename_map[col] = alias
+    @staticmethod
+    def _input_columns(rule: AggregationRule) -> List[str]:
+        columns = list(rule.group_by)
+        for agg in rule.aggregations:
+            if agg["column"] not in columns:
+                columns.append(agg["column"])
+        return columns
 
-        result = df.groupby(rule.group_by).agg(**agg_spec).reset_index()
-        result.rename(columns=rename_map, inplace=True)
-        return result
+    @staticmethod
+    def _concat_sorted(
+        results: List[pd.DataFrame], rule: AggregationRule
+    ) -> pd.DataFrame:
+        """Stitch per-bucket results back into groupby's sorted key order."""
+        result = pd.concat(results, ignore_index=True)
+        return result.sort_values(rule.group_by, ignore_index=True)
+
+    @staticmethod
+    def _apply_direct(df: pd.DataFrame, rule: AggregationRule) -> pd.DataFrame:
+        agg_spec = {
+            agg.get("alias", f"{agg['function']}_{agg['column']}"): pd.NamedAgg(
+                column=agg["column"], aggfunc=agg["function"]
+            )
+            for agg in rule.aggregations
+        }
+        return df.groupby(rule.group_by).agg(**agg_spec).reset_index()
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -300,88 +838,95 @@ class DataValidator:
     errors_list: list of dicts {row_index, column, rule, message}.
     """
 
+    def __init__(self):
+        # Compiled plan of the last validate() call, kept for debugging.
+        self.plan: Optional[RulePlan] = None
+
     def validate(
         self, df: pd.DataFrame, rules: List[ValidationRule]
     ) -> Tuple[pd.DataFrame, pd.DataFrame, List[Dict[str, Any]]]:
         if not rules:
             return df, pd.DataFrame(columns=df.columns), []
 
-        invalid_mask = pd.Series([False] * len(df), index=df.index)
+        self.plan = RulePlan.compile(rules, df.columns)
+        views = _ColumnViews(df)
+        invalid_mask = np.zeros(len(df), dtype=bool)
+        failures: Dict[int, np.ndarray] = {}
+
+        for col, entries in self.plan.groups.items():
+            column_bad = []
+            for pos, rule in entries:
+                bad = self._bad(views, col, rule)
+                if bad is not None:
+                    failures[pos] = bad
+                    column_bad.append(bad)
+            if column_bad:
+                invalid_mask |= np.logical_or.reduce(column_bad)
+
+        # Report errors in request order, as before rules were grouped.
         errors: List[Dict[str, Any]] = []
-
-        for rule in rules:
-            col = rule.column
-            if col not in df.columns:
-                continue
-            series = df[col]
-            params = rule.params or {}
-
-            VR = ValidationRuleType
-            bad: pd.Series
-
-            if rule.rule_type == VR.NOT_NULL:
-                bad = series.isnull()
-
-            elif rule.rule_type == VR.UNIQUE:
-                bad = series.duplicated(keep="first")
-
-            elif rule.rule_type == VR.MIN_VALUE:
-                bad = pd.to_numeric(series, errors="coerce") < params.get("min", 0)
-
-            elif rule.rule_type == VR.MAX_VALUE:
-                bad = pd.to_numeric(series, errors="coerce") > params.get("max", 0)
-
-            elif rule.rule_type == VR.MIN_LENGTH:
-                bad = series.astype(str).str.len() < params.get("min_length", 0)
-
-            elif rule.rule_type == VR.MAX_LENGTH:
-                bad = series.astype(str).str.len() > params.get("max_length", 255)
-
-            elif rule.rule_type == VR.REGEX:
-                pattern = params.get("pattern", "")
-                bad = ~series.astype(str).str.match(pattern, na=False)
-
-            elif rule.rule_type == VR.ALLOWED_VALUES:
-                allowed = params.get("values", [])
-                bad = ~series.isin(allowed)
-
-            elif rule.rule_type == VR.DATE_FORMAT:
-                fmt = params.get("format", "%Y-%m-%d")
-
-                def _bad_date(v):
-                    if pd.isna(v):
-                        return False
-                    try:
-                        pd.to_datetime(v, format=fmt)
-                        return False
-                    except Exception:
-                        return True
-
-                bad = series.apply(_bad_date)
-
-            elif rule.rule_type == VR.NUMERIC:
-                bad = pd.to_numeric(series, errors="coerce").isnull() & series.notnull()
-
-            elif rule.rule_type == VR.EMAIL:
-                email_re = r"^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$"
-                bad = ~series.astype(str).str.match(email_re, na=False)
-
-            else:
+        for pos in sorted(failures):
+            rule, bad = rules[pos], failures[pos]
+            if not bad.any():
                 continue
-
-            for idx in df.index[bad]:
+            col = rule.column
+            message = (
+                rule.error_message
+                or f"Failed rule '{rule.rule_type.value}' on column '{col}'"
+            )
+            for idx, value in zip(df.index[bad], df[col][bad].tolist()):
                 errors.append(
                     {
                         "row_index": int(idx),
                         "column": col,
                         "rule": rule.rule_type.value,
-                        "value": str(df.at[idx, col]),
-                        "message": rule.error_message
-                        or f"Failed rule '{rule.rule_type.value}' on column '{col}'",
+                        "value": str(value),
+                        "message": message,
                     }
                 )
-            invalid_mask |= bad
 
         valid_df = df[~invalid_mask].reset_index(drop=True)
         invalid_df = df[invalid_mask].reset_index(drop=True)
         return valid_df, invalid_df, errors
+
+    @staticmethod
+    def _bad(
+        views: _ColumnViews, col: str, rule: ValidationRule
+    ) -> Optional[np.ndarray]:
+        params = rule.params or {}
+        kind = rule.rule_type
+
+        if kind == VR.MIN_VALUE:
+            return views.numeric(col) < params.get("min", 0)
+        if kind == VR.MAX_VALUE:
+            return views.numeric(col) > params.get("max", 0)
+        if kind == VR.NUMERIC:
+            return np.isnan(views.numeric(col)) & _as_mask(views.raw(col).notnull())
+
+        if kind == VR.MIN_LENGTH:
+            return _length_mask(views.string(col), pc.less, params.get("min_length", 0))
+        if kind == VR.MAX_LENGTH:
+            return _length_mask(
+                views.string(col), pc.greater, params.get("max_length", 255)
+            )
+        if kind == VR.REGEX:
+            pattern = params.get("pattern", "")
+            return ~_regex_mask(views.string(col), pattern, anchored=True)
+        if kind == VR.EMAIL:
+            return ~_regex_mask(views.string(col), _EMAIL_PATTERN, anchored=True)
+
+        series = views.raw(col)
+        if kind == VR.NOT_NULL:
+            return _as_mask(series.isnull())
+        if kind == VR.UNIQUE:
+            return _as_mask(series.duplicated(keep="first"))
+        if kind == VR.ALLOWED_VALUES:
+            return ~_as_mask(series.isin(params.get("values", [])))
+        if kind == VR.DATE_FORMAT:
+            fmt = params.get("format", "%Y-%m-%d")
+            # One vectorised parse: a value is bad if it was present
+            # before parsing and NaT after. Blank cells count as missing.
+            parsed = pd.to_datetime(series, format=fmt, errors="coerce")
+            present = series.replace(r"^\s*$", None, regex=True).notnull()
+            return _as_mask(parsed.isnull() & present)
+        return None
@@ -0,0 +1,146 @@
+"""
+Fixed-memory, mergeable sketches used by the approximate aggregations.
+
+HyperLogLog (approx_count_distinct)
+    2**precision one-byte registers (4 KiB at the default precision 12).
+    Relative standard error is 1.04 / sqrt(2**precision): ~1.6% at 12,
+    ~0.8% at 14. Below ~2.5 × 2**precision distinct values the estimate
+    switches to linear counting, which is more accurate in that range.
+
+t-digest (approx_percentile)
+    At most ~compression / 2 centroids (about 100 at the default 200),
+    built with the k1 scale function so centroids get smaller toward the
+    tails. Rank error is typically well under 0.1% at the median and
+    smaller still at p01/p99; results always fall within the observed
+    [min, max].
+
+Merging two sketches gives the same error bounds as building one over the
+combined data, so per-chunk or per-worker sketches combine in any order.
+"""
+
+import numpy as np
+import pandas as pd
+
+HLL_PRECISION = 12
+TDIGEST_COMPRESSION = 200
+
+
+class HyperLogLog:
+    """Approximate distinct counter."""
+
+    __slots__ = ("precision", "registers")
+
+    def __init__(self, precision: int = HLL_PRECISION):
+        if not 4 <= precision <= 16:
+            raise ValueError("HyperLogLog precision must be between 4 and 16.")
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    @classmethod
+    def from_values(cls, values, precision: int = HLL_PRECISION):
+        sketch = cls(precision)
+        data = np.asarray(values)
+        data = data[~pd.isna(data)]
+        if data.dtype.kind in "biu":
+            # Hash 3 and 3.0 alike: chunks of one column may differ in dtype
+            data = data.astype(np.float64)
+        if len(data):
+            sketch._add_hashes(pd.util.hash_array(data))
+        return sketch
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        if other.precision != self.precision:
+            raise ValueError(
+                "Cannot merge HyperLogLog sketches of different precision."
+            )
+        merged = HyperLogLog(self.precision)
+        np.maximum(self.registers, other.registers, out=merged.registers)
+        return merged
+
+    def estimate(self) -> int:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            # Linear counting is far more accurate for small cardinalities
+            return int(round(m * np.log(m / zeros)))
+        return int(round(raw))
+
+    def _add_hashes(self, hashes: np.ndarray) -> None:
+        p = self.precision
+        tail_bits = 64 - p
+        index = (hashes >> np.uint64(tail_bits)).astype(np.int64)
+        tail = hashes & np.uint64((1 << tail_bits) - 1)
+
+        # Exact bit length of the tail, by binary search on shifts
+        bit_length = np.zeros(len(tail), dtype=np.int64)
+        rest = tail.copy()
+        for shift in (32, 16, 8, 4, 2, 1):
+            high = rest >= np.uint64(1 << shift)
+            bit_length[high] += shift
+            rest[high] >>= np.uint64(shift)
+        bit_length += rest > 0
+
+        rank = (tail_bits - bit_length + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+
+class TDigest:
+    """Approximate quantile sketch (merging t-digest)."""
+
+    __slots__ = ("compression", "means", "weights", "min", "max")
+
+    def __init__(self, compression: int = TDIGEST_COMPRESSION):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min = np.nan
+        self.max = np.nan
+
+    @classmethod
+    def from_values(cls, values, compression: int = TDIGEST_COMPRESSION):
+        data = pd.to_numeric(np.asarray(values), errors="coerce").astype(np.float64)
+        data = data[~np.isnan(data)]
+        digest = cls(compression)
+        if len(data):
+            digest.min, digest.max = data.min(), data.max()
+            digest._compress(data, np.ones(len(data)))
+        return digest
+
+    def merge(self, other: "TDigest") -> "TDigest":
+        merged = TDigest(self.compression)
+        merged.min = np.fmin(self.min, other.min)
+        merged.max = np.fmax(self.max, other.max)
+        merged._compress(
+            np.concatenate([self.means, other.means]),
+            np.concatenate([self.weights, other.weights]),
+        )
+        return merged
+
+    def quantile(self, q: float) -> float:
+        if not 0 <= q <= 1:
+            raise ValueError("Percentile must be between 0 and 1.")
+        if not len(self.means):
+            return np.nan
+        centres = np.cumsum(self.weights) - self.weights / 2
+        target = q * self.weights.sum()
+        xs = np.concatenate([[0.0], centres, [self.weights.sum()]])
+        ys = np.concatenate([[self.min], self.means, [self.max]])
+        return float(np.interp(target, xs, ys))
+
+    def _compress(self, means: np.ndarray, weights: np.ndarray) -> None:
+        if not len(means):
+            return
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+
+        # k1 scale: a centroid may span at most one unit of k, so bucketing
+        # points by floor(k(q)) of their midpoint bounds the digest size.
+        q = (np.cumsum(weights) - weights / 2) / total
+        k = self.compression / (2 * np.pi) * np.arcsin(2 * q - 1)
+        _, bucket = np.unique(np.floor(k).astype(np.int64), return_inverse=True)
+
+        self.weights = np.bincount(bucket, weights=weights)
+        self.means = np.bincount(bucket, weights=means * weights) / self.weights
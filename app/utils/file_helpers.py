@@ -1,6 +1,10 @@
+import fcntl
+import hashlib
 import os
 import uuid
+from contextlib import contextmanager, suppress
 from datetime import datetime
+from typing import Iterator, Optional, Tuple
 
 from fastapi import UploadFile
 
@@ -18,15 +22,140 @@ def generate_unique_filename(original_filename: str) -> str:
     return f"{timestamp}_{unique_id}{ext}"
 
 
-async def save_upload_file(file: UploadFile, file_path: str) -> None:
-    """Save an uploaded file to disk in chunks to avoid memory spikes."""
+async def save_upload_file(file: UploadFile, file_path: str) -> str:
+    """
+    Save an uploaded file to disk in chunks to avoid memory spikes.
+    Returns the SHA-256 of the content, computed as the chunks stream by.
+    """
+    digest = hashlib.sha256()
     with open(file_path, "wb") as buffer:
         while True:
             chunk = await file.read(CHUNK_SIZE)
             if not chunk:
                 break
+            digest.update(chunk)
             buffer.write(chunk)
+    return digest.hexdigest()
 
 
 def get_file_size(file_path: str) -> int:
     return os.path.getsize(file_path)
+
+
+# ── content-addressed index ───────────────────────────────────────────────────
+#
+#   .<file_id>.sha256         the upload's SHA-256 (hex)
+#   .by-hash/<sha256><ext>    file_id of the stored upload with that content,
+#                             then the number of uploads sharing it
+#
+# Lets identical re-uploads reuse the stored file together with its cached
+# profile and columnar copy. The extension is part of the key because it
+# decides how the bytes are parsed. The file is deleted with its last
+# reference; entries change only under the .by-hash/.lock file lock.
+
+
+def _hash_sidecar_path(file_path: str) -> str:
+    directory, name = os.path.split(file_path)
+    return os.path.join(directory, f".{name}.sha256")
+
+
+def _hash_index_path(upload_dir: str, sha256: str, ext: str) -> str:
+    return os.path.join(upload_dir, ".by-hash", f"{sha256}{ext.lower()}")
+
+
+@contextmanager
+def _index_lock(upload_dir: str) -> Iterator[None]:
+    """Serialise index updates across threads and server processes."""
+    lock_dir = os.path.join(upload_dir, ".by-hash")
+    os.makedirs(lock_dir, exist_ok=True)
+    with open(os.path.join(lock_dir, ".lock"), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        yield
+
+
+def _read_entry(index_path: str) -> Tuple[Optional[str], int]:
+    try:
+        with open(index_path) as fh:
+            file_id, _, refs = fh.read().strip().partition("\n")
+    except OSError:
+        return None, 0
+    return file_id or None, int(refs or 1)
+
+
+def _write_entry(index_path: str, file_id: str, refs: int) -> None:
+    with open(index_path, "w") as fh:
+        fh.write(f"{file_id}\n{refs}\n")
+
+
+def register_upload(file_path: str, sha256: str) -> None:
+    directory, file_id = os.path.split(file_path)
+    index_path = _hash_index_path(directory, sha256, os.path.splitext(file_id)[1])
+    with open(_hash_sidecar_path(file_path), "w") as fh:
+        fh.write(sha256)
+    with _index_lock(directory):
+        _write_entry(index_path, file_id, 1)
+
+
+def find_upload_by_hash(upload_dir: str, sha256: str, ext: str) -> Optional[str]:
+    """file_id of a stored upload with this content and extension, if any."""
+    file_id, _ = _read_entry(_hash_index_path(upload_dir, sha256, ext))
+    if file_id and os.path.exists(os.path.join(upload_dir, file_id)):
+        return file_id
+    return None
+
+
+def reuse_upload(upload_dir: str, sha256: str, ext: str) -> Optional[str]:
+    """
+    Like find_upload_by_hash, but also takes a reference to the stored
+    upload, so it outlives deletes by the uploads that shared it before.
+    """
+    index_path = _hash_index_path(upload_dir, sha256, ext)
+    with _index_lock(upload_dir):
+        file_id, refs = _read_entry(index_path)
+        if not file_id or not os.path.exists(os.path.join(upload_dir, file_id)):
+            return None
+        _write_entry(index_path, file_id, refs + 1)
+    return file_id
+
+
+def read_upload_hash(file_path: str) -> Optional[str]:
+    try:
+        with open(_hash_sidecar_path(file_path)) as fh:
+            return fh.read().strip() or None
+    except OSError:
+        return None
+
+
+def release_upload(file_path: str) -> bool:
+    """
+    Drop one reference to a stored upload. True when it was the last one:
+    the index entry and sidecar are gone and the caller deletes the file.
+    """
+    sha256 = read_upload_hash(file_path)
+    if sha256 is not None:
+        directory, file_id = os.path.split(file_path)
+        index_path = _hash_index_path(directory, sha256, os.path.splitext(file_id)[1])
+        with _index_lock(directory):
+            indexed_id, refs = _read_entry(index_path)
+            if indexed_id == file_id:
+                if refs > 1:
+                    _write_entry(index_path, file_id, refs - 1)
+                    return False
+                os.remove(index_path)
+    with suppress(FileNotFoundError):
+        os.remove(_hash_sidecar_path(file_path))
+    return True
+
+
+def forget_upload(file_path: str) -> None:
+    """Drop a deleted upload from the index (only if the index points at it)."""
+    sha256 = read_upload_hash(file_path)
+    with suppress(FileNotFoundError):
+        os.remove(_hash_sidecar_path(file_path))
+    if sha256 is None:
+        return
+    directory, file_id = os.path.split(file_path)
+    index_path = _hash_index_path(directory, sha256, os.path.splitext(file_id)[1])
+    with _index_lock(directory):
+        if _read_entry(index_path)[0] == file_id:
+            os.remove(index_path)
@@ -14,6 +14,11 @@ celery_app.conf.update(
     # ── task routing ─────────────────────────────────────────────────────────
     task_routes={
         "app.worker.tasks.run_etl_task": {"queue": "etl.default"},
+        "app.worker.tasks.run_partitioned_etl_task": {"queue": "etl.default"},
+        "app.worker.tasks.run_etl_partition_task": {"queue": "etl.default"},
+        "app.worker.tasks.finalize_partitioned_etl": {"queue": "etl.default"},
+        "app.worker.tasks.etl_partitions_failed": {"queue": "etl.default"},
+        "app.worker.tasks.profile_file_task": {"queue": "etl.default"},
         "app.worker.tasks.etl_dead_letter": {"queue": "etl.dlq"},
     },
     task_queues={
@@ -1,30 +1,120 @@
+import asyncio
 import hashlib
 import json
+import logging
+import threading
+import time
+from contextlib import suppress
 from datetime import timedelta
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 import redis
+import redis.asyncio as aioredis
 
 from app.core.config import settings
+from app.core.constants import JobStatus
 from app.models.schemas import ETLJobResult
 
+logger = logging.getLogger(__name__)
+
 _TTL = timedelta(hours=24)
 
 # ── low-level client (sync, used from Celery tasks & regular code) ───────────
 
+# One pool per process. redis-py resets it automatically after a fork, so
+# prefork Celery workers each get their own connections.
+_pool: Optional[redis.ConnectionPool] = None
+
 
 def _client() -> redis.Redis:
-    return redis.Redis.from_url(settings.CELERY_BROKER_URL, decode_responses=True)
+    global _pool
+    if _pool is None:
+        _pool = redis.ConnectionPool.from_url(
+            settings.CELERY_BROKER_URL, decode_responses=True
+        )
+    return redis.Redis(connection_pool=_pool)
+
+
+# ── low-level client (async, used from API handlers) ─────────────────────────
+
+# One client, and so one pool, per process. A redis.asyncio connection is
+# bound to the event loop it was opened on, hence the loop check.
+_async_redis: Optional[Tuple[asyncio.AbstractEventLoop, aioredis.Redis]] = None
+
+
+def _async_client() -> aioredis.Redis:
+    global _async_redis
+    loop = asyncio.get_running_loop()
+    if _async_redis is None or _async_redis[0] is not loop:
+        _async_redis = (
+            loop,
+            aioredis.Redis.from_url(settings.CELERY_BROKER_URL, decode_responses=True),
+        )
+    return _async_redis[1]
+
+
+async def close_async_client() -> None:
+    """Stop the progress stream reader and close the async client."""
+    global _async_redis
+    await stream_hub.close()
+    if _async_redis is not None:
+        _, client = _async_redis
+        _async_redis = None
+        await client.aclose()
+
+
+def _ttl() -> int:
+    return int(_TTL.total_seconds())
+
+
+# ── job index ────────────────────────────────────────────────────────────────
+#
+#   jobs:index             ZSET  job_id → submission time (listing order)
+#   jobs:status:<status>   ZSET  job_id → time the job entered that status
+#
+# Maintained on every job write, so listing never has to scan the keyspace.
+
+_INDEX_KEY = "jobs:index"
+
+
+def _status_key(status: JobStatus) -> str:
+    return f"jobs:status:{status.value}"
+
+
+def job_status(result: ETLJobResult) -> JobStatus:
+    if result.message in (JobStatus.QUEUED.value, JobStatus.RUNNING.value):
+        return JobStatus(result.message)
+    return JobStatus.SUCCESS if result.success else JobStatus.FAILED
+
+
+def _version_key(job_id: str) -> str:
+    return f"job:ver:{job_id}"
+
+
+def _write_job(pipe, result: ETLJobResult) -> None:
+    """Queue SET job + version bump + index updates on a pipeline."""
+    now = time.time()
+    expired = now - _ttl()
+    status = job_status(result)
+    pipe.set(f"job:{result.job_id}", result.model_dump_json(), ex=_ttl())
+    pipe.incr(_version_key(result.job_id))
+    pipe.expire(_version_key(result.job_id), _ttl())
+    pipe.zadd(_INDEX_KEY, {result.job_id: now}, nx=True)
+    pipe.zremrangebyscore(_INDEX_KEY, "-inf", expired)
+    for other in JobStatus:
+        if other is not status:
+            pipe.zrem(_status_key(other), result.job_id)
+    pipe.zadd(_status_key(status), {result.job_id: now}, nx=True)
+    pipe.zremrangebyscore(_status_key(status), "-inf", expired)
 
 
 # ── job CRUD ─────────────────────────────────────────────────────────────────
 
 
 def save_job(result: ETLJobResult) -> None:
-    r = _client()
-    r.set(
-        f"job:{result.job_id}", result.model_dump_json(), ex=int(_TTL.total_seconds())
-    )
+    with _client().pipeline() as pipe:
+        _write_job(pipe, result)
+        pipe.execute()
 
 
 def get_job(job_id: str) -> Optional[ETLJobResult]:
@@ -35,22 +125,123 @@ def get_job(job_id: str) -> Optional[ETLJobResult]:
     return ETLJobResult.model_validate_json(raw)
 
 
-def list_jobs() -> List[ETLJobResult]:
+async def get_job_async(job_id: str) -> Optional[ETLJobResult]:
+    """get_job for async handlers."""
+    raw = await _async_client().get(f"job:{job_id}")
+    if not raw:
+        return None
+    return ETLJobResult.model_validate_json(raw)
+
+
+async def get_job_versioned_async(
+    job_id: str,
+) -> Tuple[Optional[ETLJobResult], int]:
+    """The job record together with its version (see job_version_async)."""
+    async with _async_client().pipeline() as pipe:
+        pipe.get(f"job:{job_id}")
+        pipe.get(_version_key(job_id))
+        raw, version = await pipe.execute()
+    if not raw:
+        return None, 0
+    return ETLJobResult.model_validate_json(raw), int(version or 0)
+
+
+async def job_version_async(job_id: str) -> Optional[int]:
+    """
+    Counter bumped on every write of the job record; None if the job does
+    not exist. Much cheaper than get_job when checking for changes.
+    """
+    async with _async_client().pipeline(transaction=False) as pipe:
+        pipe.exists(f"job:{job_id}")
+        pipe.get(_version_key(job_id))
+        exists, version = await pipe.execute()
+    return int(version or 0) if exists else None
+
+
+def list_jobs(
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    status: Optional[JobStatus] = None,
+) -> Tuple[List[ETLJobResult], Optional[str], int]:
+    """
+    One page of jobs, newest first. `cursor` is the `next_cursor` returned
+    by the previous page. Returns (jobs, next_cursor, total); next_cursor is
+    None on the last page. Raises ValueError for a malformed cursor.
+    """
     r = _client()
-    keys = r.keys("job:*")
-    # Exclude idempotency keys
-    job_keys = [k for k in keys if not k.startswith("job:idem:")]
-    if not job_keys:
-        return []
-    raws = r.mget(job_keys)
-    results = []
-    for raw in raws:
-        if raw:
-            try:
-                results.append(ETLJobResult.model_validate_json(raw))
-            except Exception:
-                pass
-    return results
+    key = _status_key(status) if status else _INDEX_KEY
+
+    entries = _entries_after(r, key, _parse_cursor(cursor), limit + 1)
+    total = r.zcard(key)
+
+    page = entries[:limit]
+    next_cursor = _format_cursor(*page[-1]) if len(entries) > limit else None
+    if not page:
+        return [], None, total
+
+    results, stale = [], []
+    raws = r.mget([f"job:{job_id}" for job_id, _ in page])
+    for (job_id, _), raw in zip(page, raws):
+        if not raw:
+            stale.append(job_id)
+            continue
+        try:
+            results.append(ETLJobResult.model_validate_json(raw))
+        except Exception:
+            pass
+    if stale:
+        # Job keys expired ahead of the periodic index trim
+        with r.pipeline(transaction=False) as pipe:
+            pipe.zrem(_INDEX_KEY, *stale)
+            for other in JobStatus:
+                pipe.zrem(_status_key(other), *stale)
+            pipe.execute()
+    return results, next_cursor, total
+
+
+# A cursor is the last entry of the previous page, "<score>:<job_id>". Jobs
+# written in the same instant share a score, and Redis orders those by
+# member, so the job_id breaks the tie and nothing at a page boundary is
+# skipped or repeated.
+
+
+def _format_cursor(job_id: str, score: float) -> str:
+    return f"{score!r}:{job_id}"
+
+
+def _parse_cursor(cursor: Optional[str]) -> Optional[Tuple[float, str]]:
+    if cursor is None:
+        return None
+    score, _, job_id = cursor.partition(":")
+    try:
+        return float(score), job_id
+    except ValueError:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from None
+
+
+def _entries_after(
+    r, key: str, cursor: Optional[Tuple[float, str]], count: int
+) -> List[Tuple[str, float]]:
+    """Up to `count` (job_id, score) entries that follow `cursor`, newest first."""
+    if cursor is None:
+        return r.zrevrangebyscore(
+            key, "+inf", "-inf", start=0, num=count, withscores=True
+        )
+
+    # Members tied with the cursor's score come first, in descending id
+    # order; skip past the ones at or before the cursor
+    score, last_id = cursor
+    entries: List[Tuple[str, float]] = []
+    offset = 0
+    while len(entries) < count:
+        batch = r.zrevrangebyscore(
+            key, repr(score), "-inf", start=offset, num=count, withscores=True
+        )
+        entries += [(m, s) for m, s in batch if s < score or m < last_id]
+        if len(batch) < count:
+            break
+        offset += len(batch)
+    return entries[:count]
 
 
 # ── idempotency ───────────────────────────────────────────────────────────────
@@ -70,28 +261,451 @@ def get_idempotent_job_id(request_hash: str) -> Optional[str]:
 
 def set_idempotent_job_id(request_hash: str, job_id: str) -> None:
     r = _client()
-    r.set(f"job:idem:{request_hash}", job_id, ex=int(_TTL.total_seconds()))
+    r.set(f"job:idem:{request_hash}", job_id, ex=_ttl())
 
 
-# ── progress pub/sub ──────────────────────────────────────────────────────────
+def claim_job(request_hash: str, job_id: str) -> Tuple[str, ETLJobResult]:
+    """
+    Atomically register `job_id` as the job for `request_hash` and save it
+    as queued. Returns (owner_job_id, owner_result): when the owner is
+    `job_id` this call won the claim, otherwise the request was already
+    submitted and the existing job's record is returned.
 
+    SET NX makes concurrent duplicate submissions race safely: exactly one
+    caller gets to create the job. Taking over a key whose job record has
+    expired is guarded by WATCH, so only one caller wins that race too.
+    """
+    r = _client()
+    idem_key = f"job:idem:{request_hash}"
+    pending = ETLJobResult(
+        job_id=job_id,
+        success=False,
+        message="queued",
+        total_rows=0,
+        processed_rows=0,
+        failed_rows=0,
+    )
 
-def _channel(job_id: str) -> str:
-    return f"etl:{job_id}"
+    while True:
+        with r.pipeline() as pipe:
+            pipe.set(idem_key, job_id, nx=True, ex=_ttl())
+            pipe.get(idem_key)
+            created, owner = pipe.execute()
 
+        if created:
+            with r.pipeline() as pipe:
+                _write_job(pipe, pending)
+                pipe.execute()
+            return job_id, pending
 
-def publish_progress(job_id: str, event: Dict[str, Any]) -> None:
-    """Push a progress event to the job's Redis pub/sub channel."""
-    r = _client()
-    r.publish(_channel(job_id), json.dumps(event))
+        existing = r.get(f"job:{owner}")
+        if existing:
+            return owner, ETLJobResult.model_validate_json(existing)
 
+        # The job record expired before its idempotency key — take over,
+        # provided nobody else has claimed the key or revived the job since
+        with r.pipeline() as pipe:
+            try:
+                pipe.watch(idem_key, f"job:{owner}")
+                if pipe.get(idem_key) == owner and not pipe.exists(f"job:{owner}"):
+                    pipe.multi()
+                    pipe.set(idem_key, job_id, ex=_ttl())
+                    _write_job(pipe, pending)
+                    pipe.execute()
+                    return job_id, pending
+            except redis.WatchError:
+                pass
+        # Lost the race: start over and return whoever won
+
+
+# ── partitioned jobs ──────────────────────────────────────────────────────────
 
-def subscribe_to_job(job_id: str):
+
+def incr_partitions_done(job_id: str, rows: int = 0) -> int:
     """
-    Return a pubsub object already subscribed to the job channel.
-    Caller is responsible for unsubscribing / closing.
+    Count one more finished partition of a fan-out job, and the rows it
+    loaded; returns the number of partitions done so far.
     """
-    r = _client()
-    ps = r.pubsub(ignore_subscribe_messages=True)
-    ps.subscribe(_channel(job_id))
-    return ps
+    key = _parts_key(job_id)
+    with _client().pipeline() as pipe:
+        pipe.hincrby(key, "done", 1)
+        pipe.hincrby(key, "rows", rows)
+        pipe.expire(key, _ttl())
+        done, _, _ = pipe.execute()
+    return done
+
+
+def pop_partitions_done(job_id: str) -> Tuple[int, int]:
+    """Read and delete a fan-out job's counters: (partitions done, rows loaded)."""
+    key = _parts_key(job_id)
+    with _client().pipeline() as pipe:
+        pipe.hmget(key, "done", "rows")
+        pipe.delete(key)
+        (done, rows), _ = pipe.execute()
+    return int(done or 0), int(rows or 0)
+
+
+def _parts_key(job_id: str) -> str:
+    return f"job:parts:{job_id}"
+
+
+# ── progress stream ───────────────────────────────────────────────────────────
+#
+#   job:events:<job_id>   STREAM  progress events, capped at PROGRESS_STREAM_MAXLEN
+#
+# Unlike pub/sub, a stream keeps history: readers start from any event id, so
+# late joiners see the stages they missed and reconnecting clients resume
+# where they left off. Each entry holds one JSON-encoded event.
+
+
+def _events_key(job_id: str) -> str:
+    return f"job:events:{job_id}"
+
+
+def _publish(pipe, job_id: str, event: Dict[str, Any]) -> None:
+    key = _events_key(job_id)
+    pipe.xadd(
+        key,
+        {"event": json.dumps(event)},
+        maxlen=settings.PROGRESS_STREAM_MAXLEN,
+        approximate=True,
+    )
+    pipe.expire(key, _ttl())
+
+
+def _decode_entries(entries) -> List[Dict[str, Any]]:
+    return [{**json.loads(fields["event"]), "event_id": eid} for eid, fields in entries]
+
+
+def get_progress(job_id: str) -> Optional[Dict[str, Any]]:
+    """The job's most recently published progress event, if any."""
+    entries = _client().xrevrange(_events_key(job_id), count=1)
+    return _decode_entries(entries)[0] if entries else None
+
+
+class StreamHub:
+    """
+    In-process fan-out of progress streams for async consumers.
+
+    One reader task runs XREAD BLOCK over every stream that somebody is
+    watching and hands new entries to the subscribers' queues, so the
+    connections a process holds don't grow with the number of WebSocket,
+    SSE and long-poll clients. The reader starts on first use, stops when
+    nobody is watching, and retries with backoff if Redis goes away.
+    """
+
+    QUEUE_SIZE = 256
+    # Also how long a newly watched stream can wait to join the read
+    BLOCK_MS = 1_000
+
+    def __init__(self):
+        self._queues: Dict[str, Set[asyncio.Queue]] = {}
+        self._positions: Dict[str, str] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def subscribe(self, key: str, last_event_id: str) -> asyncio.Queue:
+        """
+        Register a queue for the stream's entries. If nobody watches the
+        stream yet, reading starts after `last_event_id`. Otherwise it
+        carries on from where it is, which may be past that point: callers
+        read up to the present themselves after subscribing.
+
+        A queue gets a list of events per read, or None if it fell so far
+        behind that entries were dropped.
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Subscribers from another event loop can't be served from this one
+            self._queues, self._positions, self._task = {}, {}, None
+            self._loop = loop
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.QUEUE_SIZE)
+        self._queues.setdefault(key, set()).add(queue)
+        self._positions.setdefault(key, last_event_id)
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._listen())
+        return queue
+
+    def unsubscribe(self, key: str, queue: asyncio.Queue) -> None:
+        queues = self._queues.get(key)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self._queues[key]
+                del self._positions[key]
+
+    async def close(self) -> None:
+        task, self._task = self._task, None
+        self._queues, self._positions = {}, {}
+        if task is not None and not task.done():
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+
+    async def _listen(self) -> None:
+        delay = 0.5
+        while self._positions:
+            try:
+                reply = await _async_client().xread(
+                    dict(self._positions),
+                    count=ProgressStream.BATCH,
+                    block=self.BLOCK_MS,
+                )
+                delay = 0.5
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("Progress stream read failed (%s); retrying", exc)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 10.0)
+                continue
+            for key, entries in reply or []:
+                self._dispatch(key, entries)
+
+    def _dispatch(self, key: str, entries) -> None:
+        if key not in self._positions or not entries:
+            return  # nobody is watching any more
+        self._positions[key] = entries[-1][0]
+        events = _decode_entries(entries)
+        for queue in self._queues[key]:
+            if queue.full():
+                # Tell the subscriber to catch up from the stream itself
+                # rather than stall every other client
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+            else:
+                queue.put_nowait(events)
+
+
+stream_hub = StreamHub()
+
+
+def _stream_position(event_id: str) -> Tuple[int, int]:
+    ms, _, seq = event_id.partition("-")
+    return int(ms), int(seq or 0)
+
+
+class ProgressStream:
+    """
+    Async reader over one job's progress stream, for WebSocket/SSE handlers.
+
+    Replays the backlog with plain reads on the shared client, then
+    follows the stream through stream_hub, so no connection is tied up
+    per reader. Every returned event carries its `event_id`; pass the last
+    one back as `last_event_id` to resume after a reconnect.
+    """
+
+    BLOCK_MS = 5_000
+    BATCH = 100
+
+    def __init__(self, job_id: str, last_event_id: Optional[str] = None):
+        self.key = _events_key(job_id)
+        self.last_event_id = last_event_id or "0-0"
+        self._queue: Optional[asyncio.Queue] = None
+        self._replaying = True
+
+    async def read(self, block_ms: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Events after `last_event_id`. Without `block_ms` returns at once;
+        otherwise waits up to that long for the first new event.
+        """
+        if self._replaying:
+            events = await self._fetch()
+            if len(events) == self.BATCH:
+                return events
+            if self._queue is None:
+                self._queue = stream_hub.subscribe(self.key, self.last_event_id)
+                # The hub may already be past last_event_id for this stream
+                events += await self._fetch()
+            self._replaying = False
+            if events or block_ms is None:
+                return events
+
+        batches = []
+        if block_ms is not None and self._queue.empty():
+            try:
+                batches.append(
+                    await asyncio.wait_for(self._queue.get(), block_ms / 1000)
+                )
+            except asyncio.TimeoutError:
+                pass
+        while not self._queue.empty():
+            batches.append(self._queue.get_nowait())
+        if any(batch is None for batch in batches):
+            self._replaying = True
+            return await self.read()
+
+        after = _stream_position(self.last_event_id)
+        events = [
+            event
+            for batch in batches
+            for event in batch
+            if _stream_position(event["event_id"]) > after
+        ]
+        if events:
+            self.last_event_id = events[-1]["event_id"]
+        return events
+
+    async def _fetch(self) -> List[Dict[str, Any]]:
+        reply = await _async_client().xread(
+            {self.key: self.last_event_id}, count=self.BATCH
+        )
+        events = _decode_entries(reply[0][1]) if reply else []
+        if events:
+            self.last_event_id = events[-1]["event_id"]
+        return events
+
+    async def aclose(self) -> None:
+        if self._queue is not None:
+            stream_hub.unsubscribe(self.key, self._queue)
+            self._queue = None
+
+    async def __aenter__(self) -> "ProgressStream":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.aclose()
+
+
+async def wait_for_job_change(
+    job_id: str, version: int, timeout: float
+) -> Optional[int]:
+    """
+    Long-poll helper: wait up to `timeout` seconds for the job's version to
+    move past `version` and return the current one (None if the job is
+    gone). Sleeps on the progress stream, which gets an event alongside
+    every job write, instead of polling the record.
+    """
+    async with _async_client().pipeline() as pipe:
+        pipe.exists(f"job:{job_id}")
+        pipe.get(_version_key(job_id))
+        pipe.xrevrange(_events_key(job_id), count=1)
+        exists, current, tail = await pipe.execute()
+    current = int(current or 0) if exists else None
+    if current != version:
+        return current
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    async with ProgressStream(job_id, tail[0][0] if tail else None) as stream:
+        while (remaining := deadline - loop.time()) > 0:
+            await stream.read(block_ms=max(1, int(remaining * 1000)))
+            current = await job_version_async(job_id)
+            if current != version:
+                break
+    return current
+
+
+class ProgressEmitter:
+    """
+    Rate-limited progress publisher for worker processes.
+
+    Each job publishes at most `max_rate` events per second. Events arriving
+    faster are coalesced: only the latest is kept, and it goes out with the
+    next publish if that publish starts a new stage (so every stage's last
+    message is delivered). Stage transitions, terminal events and events
+    carrying a job result are never held back.
+
+    Per-job state is dropped on a terminal stage, by flush(), or once the
+    job has been quiet for IDLE_AFTER seconds — whichever comes first. An
+    event still held back at that point is published then.
+
+    Thread-safe: the sync /run path runs several jobs on executor threads
+    through one emitter. Redis writes happen outside the lock.
+    """
+
+    TERMINAL_STAGES = ("done", "failed")
+    IDLE_AFTER = 60.0
+
+    def __init__(self, max_rate: float):
+        self.interval = 1.0 / max_rate if max_rate > 0 else 0.0
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._swept_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def emit(
+        self,
+        job_id: str,
+        event: Dict[str, Any],
+        result: Optional[ETLJobResult] = None,
+    ) -> bool:
+        """Publish `event` now or hold it back; returns whether it was sent."""
+        now = time.monotonic()
+        stage = event.get("stage")
+        with self._lock:
+            held = self._sweep(now, keep=job_id)
+            state = self._jobs.setdefault(
+                job_id, {"stage": None, "sent_at": float("-inf"), "pending": None}
+            )
+            urgent = (
+                result is not None
+                or stage != state["stage"]
+                or stage in self.TERMINAL_STAGES
+            )
+            if not urgent and now - state["sent_at"] < self.interval:
+                state["pending"] = event
+                send = False
+            else:
+                pending = state["pending"]
+                if pending is not None and pending.get("stage") != stage:
+                    held.append((job_id, pending))
+                if stage in self.TERMINAL_STAGES:
+                    del self._jobs[job_id]
+                else:
+                    state.update(stage=stage, sent_at=now, pending=None)
+                send = True
+
+        if send:
+            self._send(held, job_id, event, result)
+        else:
+            self._send(held)
+        return send
+
+    def flush(self, job_id: str) -> None:
+        """
+        Publish the job's held-back event, if any, and forget the job. For
+        callers that won't emit for it again, such as a partition task.
+        """
+        with self._lock:
+            state = self._jobs.pop(job_id, None)
+        if state is not None and state["pending"] is not None:
+            self._send([(job_id, state["pending"])])
+
+    def _sweep(self, now: float, keep: str) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Drop jobs quiet for IDLE_AFTER; returns their held-back events.
+        Call with self._lock held.
+        """
+        if now - self._swept_at < self.IDLE_AFTER:
+            return []
+        self._swept_at = now
+        idle = [
+            job_id
+            for job_id, state in self._jobs.items()
+            if job_id != keep and now - state["sent_at"] >= self.IDLE_AFTER
+        ]
+        held = []
+        for job_id in idle:
+            pending = self._jobs.pop(job_id)["pending"]
+            if pending is not None:
+                held.append((job_id, pending))
+        return held
+
+    def _send(
+        self,
+        held: List[Tuple[str, Dict[str, Any]]],
+        job_id: Optional[str] = None,
+        event: Optional[Dict[str, Any]] = None,
+        result: Optional[ETLJobResult] = None,
+    ) -> None:
+        if not held and event is None:
+            return
+        with _client().pipeline(transaction=False) as pipe:
+            if result is not None:
+                _write_job(pipe, result)
+            for held_job_id, held_event in held:
+                _publish(pipe, held_job_id, held_event)
+            if event is not None:
+                _publish(pipe, job_id, event)
+            pipe.execute()
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+import functools
+import os
+import shutil
 import time
-import uuid
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 from celery import Task
 from celery.exceptions import MaxRetriesExceededError
@@ -12,19 +14,71 @@ from app.core.config import settings
 from app.models.schemas import ETLJobRequest, ETLJobResult
 from app.worker.celery_app import celery_app
 from app.worker.job_store import (
-    get_idempotent_job_id,
-    publish_progress,
-    save_job,
-    set_idempotent_job_id,
+    ProgressEmitter,
+    incr_partitions_done,
+    pop_partitions_done,
 )
 
 logger = get_task_logger(__name__)
+_emitter = ProgressEmitter(settings.PROGRESS_MAX_EVENTS_PER_SECOND)
 
 # ── helpers ───────────────────────────────────────────────────────────────────
 
 
-def _progress(job_id: str, stage: str, pct: int, message: str, **extra) -> None:
-    """Publish a progress event and log it."""
+def enqueue_etl_job(request_dict: Dict[str, Any], job_id: str) -> None:
+    """Send a job to the worker queue, fanning out when partitions > 1."""
+    task = (
+        run_partitioned_etl_task
+        if request_dict.get("partitions", 1) > 1
+        else run_etl_task
+    )
+    task.apply_async(
+        kwargs={"request_dict": request_dict, "job_id": job_id},
+        queue="etl.default",
+        task_id=job_id,
+    )
+
+
+def _connector_for(connection):
+    from app.core.constants import DatabaseType
+    from app.database.connectors.mysql import MySQLConnector
+    from app.database.connectors.postgres import PostgresConnector
+    from app.database.connectors.sqlite import SQLiteConnector
+
+    mapping = {
+        DatabaseType.POSTGRESQL: PostgresConnector,
+        DatabaseType.MYSQL: MySQLConnector,
+        DatabaseType.SQLITE: SQLiteConnector,
+    }
+    cls = mapping.get(connection.db_type)
+    if not cls:
+        raise ValueError(f"Unsupported database type: {connection.db_type}")
+    return cls(connection)
+
+
+def _merge_auto_mappings(request: ETLJobRequest, auto_mappings) -> ETLJobRequest:
+    """Fill in DB auto-mappings; user mappings win column-by-column."""
+    if not request.column_mappings:
+        return request.model_copy(update={"column_mappings": auto_mappings})
+    user_cols = {m.column_name for m in request.column_mappings}
+    merged = list(request.column_mappings) + [
+        m for m in auto_mappings if m.column_name not in user_cols
+    ]
+    return request.model_copy(update={"column_mappings": merged})
+
+
+def _progress(
+    job_id: str,
+    stage: str,
+    pct: int,
+    message: str,
+    result: Optional[ETLJobResult] = None,
+    **extra,
+) -> None:
+    """
+    Publish a progress event (saving `result` alongside it) and log it.
+    Bursts of same-stage events are coalesced; see ProgressEmitter.
+    """
     event = {
         "job_id": job_id,
         "stage": stage,
@@ -32,11 +86,13 @@ def _progress(job_id: str, stage: str, pct: int, message: str, **extra) -> None:
         "message": message,
         **extra,
     }
-    publish_progress(job_id, event)
-    logger.info("[%s] %s — %d%% — %s", job_id, stage, pct, message)
+    if _emitter.emit(job_id, event, result=result):
+        logger.info("[%s] %s — %d%% — %s", job_id, stage, pct, message)
 
 
-def _fail_job(job_id: str, message: str) -> ETLJobResult:
+def _fail_job(
+    job_id: str, message: str, details: Optional[Dict[str, Any]] = None
+) -> ETLJobResult:
     result = ETLJobResult(
         job_id=job_id,
         success=False,
@@ -44,15 +100,34 @@ def _fail_job(job_id: str, message: str) -> ETLJobResult:
         total_rows=0,
         processed_rows=0,
         failed_rows=0,
+        details=details,
     )
-    save_job(result)
-    publish_progress(
-        job_id,
-        {"job_id": job_id, "stage": "failed", "progress": 100, "message": message},
-    )
+    _progress(job_id, "failed", 100, message, result=result)
     return result
 
 
+# Data/config errors: retrying won't help, so these fail the job at once
+_PERMANENT_ERRORS = (ValueError, FileNotFoundError, KeyError)
+
+
+def _fail_or_retry(task: Task, job_id: str, exc: Exception) -> None:
+    """
+    Report a task error: "retrying" when Celery will retry it, otherwise
+    fail the job so the UI stops spinning. Call before re-raising `exc`.
+    """
+    attempt = task.request.retries + 1
+    max_r = task.max_retries or 0
+    if attempt <= max_r and not isinstance(exc, _PERMANENT_ERRORS):
+        _progress(
+            job_id,
+            "retrying",
+            0,
+            f"Transient error — retry {attempt}/{max_r}: {exc}",
+        )
+    else:
+        _fail_job(job_id, str(exc))
+
+
 # ── dead-letter task ──────────────────────────────────────────────────────────
 
 
@@ -67,6 +142,30 @@ def etl_dead_letter(job_id: str, request_dict: Dict[str, Any], reason: str) -> N
     _fail_job(job_id, f"[DLQ] Permanently failed after all retries: {reason}")
 
 
+# ── file profiling ────────────────────────────────────────────────────────────
+
+
+@celery_app.task(name="app.worker.tasks.profile_file_task", queue="etl.default")
+def profile_file_task(file_id: str) -> Dict[str, Any]:
+    """Replace an upload's sampled profile with the exact, full-file one."""
+    from app.services.file_profile import (
+        build_profile,
+        invalidate_profile,
+        save_profile,
+    )
+
+    file_path = os.path.join(settings.UPLOAD_DIR, file_id)
+    if not os.path.exists(file_path):
+        return {"file_id": file_id, "skipped": "file no longer exists"}
+
+    profile = build_profile(file_path)
+    save_profile(file_path, profile)
+    if not os.path.exists(file_path):
+        invalidate_profile(file_path)  # deleted while we were profiling
+    logger.info("[profile] %s — %d rows", file_id, profile["metadata"]["row_count"])
+    return {"file_id": file_id, "row_count": profile["metadata"]["row_count"]}
+
+
 # ── main ETL task ─────────────────────────────────────────────────────────────
 
 
@@ -99,11 +198,7 @@ class ETLTask(Task):
     retry_backoff_max=60,  # cap at 60 s
     retry_jitter=True,  # add randomness to avoid thundering herd
     # Don't retry on these — they are data/config errors, not transient failures
-    dont_autoretry_for=(
-        ValueError,
-        FileNotFoundError,
-        KeyError,
-    ),
+    dont_autoretry_for=_PERMANENT_ERRORS,
     # Acknowledge AFTER execution so the task is re-queued on worker crash
     acks_late=True,
 )
@@ -122,39 +217,12 @@ def run_etl_task(
     job_id : str
         Pre-assigned job ID (set by the API endpoint for idempotency).
     """
-    import os
-    import pandas as pd
-
-    from app.core.constants import DatabaseType
-    from app.database.connectors.mysql import MySQLConnector
-    from app.database.connectors.postgres import PostgresConnector
-    from app.database.connectors.sqlite import SQLiteConnector
-    from app.core.config import settings as cfg
-    from app.services.api_writer import APIWriter
     from app.services.db_reader import read_from_db
     from app.services.etl_logger import ETLLogger
     from app.services.file_processor import FileProcessor
-    from app.services.file_writer import FileWriter
-    from app.services.schema_mapper import (
-        Aggregator,
-        DataValidator,
-        RowFilter,
-        SchemaMapper,
-    )
 
     request = ETLJobRequest.model_validate(request_dict)
 
-    def connector_for(connection):
-        mapping = {
-            DatabaseType.POSTGRESQL: PostgresConnector,
-            DatabaseType.MYSQL: MySQLConnector,
-            DatabaseType.SQLITE: SQLiteConnector,
-        }
-        cls = mapping.get(connection.db_type)
-        if not cls:
-            raise ValueError(f"Unsupported database type: {connection.db_type}")
-        return cls(connection)
-
     # Mark job as running
     running_result = ETLJobResult(
         job_id=job_id,
@@ -164,8 +232,7 @@ def run_etl_task(
         processed_rows=0,
         failed_rows=0,
     )
-    save_job(running_result)
-    _progress(job_id, "started", 0, "ETL job started")
+    _progress(job_id, "started", 0, "ETL job started", result=running_result)
 
     with ETLLogger(job_id=job_id) as etl_log:
         try:
@@ -183,25 +250,16 @@ def run_etl_task(
                     f"Extracting from DB: {src.connection.db_type.value} / {label}"
                 )
                 df, auto_mappings = read_from_db(src)
-                if not request.column_mappings:
-                    request = request.model_copy(
-                        update={"column_mappings": auto_mappings}
-                    )
-                else:
-                    user_cols = {m.column_name for m in request.column_mappings}
-                    merged = list(request.column_mappings) + [
-                        m for m in auto_mappings if m.column_name not in user_cols
-                    ]
-                    request = request.model_copy(update={"column_mappings": merged})
+                request = _merge_auto_mappings(request, auto_mappings)
 
             else:
                 if not request.file_id:
                     raise ValueError("No source specified.")
-                file_path = os.path.join(cfg.UPLOAD_DIR, request.file_id)
+                file_path = os.path.join(settings.UPLOAD_DIR, request.file_id)
                 if not os.path.exists(file_path):
                     raise FileNotFoundError(f"Source file not found: {request.file_id}")
                 etl_log.info("Extracting file", {"file_id": request.file_id})
-                df = FileProcessor(file_path).df
+                df = FileProcessor(file_path, sheet_name=request.sheet_name).df
 
             total_rows = len(df)
             _progress(
@@ -212,118 +270,10 @@ def run_etl_task(
                 total_rows=total_rows,
             )
 
-            # ── 2. FILTER ─────────────────────────────────────────────────────
-            if request.filters:
-                _progress(
-                    job_id,
-                    "filter",
-                    30,
-                    f"Applying {len(request.filters)} filter rule(s)",
-                )
-                df, filtered_out = RowFilter().apply(df, request.filters)
-                _progress(
-                    job_id,
-                    "filter",
-                    35,
-                    f"{len(df)} kept, {len(filtered_out)} discarded",
-                )
-
-            # ── 3. TRANSFORM ──────────────────────────────────────────────────
-            _progress(job_id, "transform", 40, "Applying schema mappings")
-            mapper = SchemaMapper(df)
-            df = mapper.apply_column_mapping(request.column_mappings)
-
-            if mapper.transformation_errors:
-                for err in mapper.transformation_errors:
-                    etl_log.warning(
-                        f"Transform warning on '{err['column']}': {err['error']}"
-                    )
-                _progress(
-                    job_id,
-                    "transform",
-                    55,
-                    f"Schema mapping complete ({len(mapper.transformation_errors)} column warning(s))",
-                    warnings=len(mapper.transformation_errors),
-                )
-            else:
-                _progress(job_id, "transform", 55, "Schema mapping complete")
-
-            # ── 4. VALIDATE ───────────────────────────────────────────────────
-            invalid_rows_file: Optional[str] = None
-            failed_rows = 0
-
-            if request.validation_rules:
-                _progress(
-                    job_id,
-                    "validate",
-                    60,
-                    f"Running {len(request.validation_rules)} validation rule(s)",
-                )
-                df, invalid_df, validation_errors = DataValidator().validate(
-                    df, request.validation_rules
-                )
-                failed_rows = len(invalid_df)
-                if failed_rows > 0:
-                    invalid_rows_file = etl_log.save_invalid_rows(
-                        invalid_df, validation_errors
-                    )
-                _progress(
-                    job_id,
-                    "validate",
-                    70,
-                    f"{len(df)} valid, {failed_rows} invalid",
-                    failed_rows=failed_rows,
-                )
-
-            # ── 5. AGGREGATE ──────────────────────────────────────────────────
-            if request.aggregations:
-                _progress(job_id, "aggregate", 75, "Applying aggregations")
-                df = Aggregator().apply(df, request.aggregations)
-                _progress(job_id, "aggregate", 78, f"After aggregation: {len(df)} rows")
-
-            # ── 6. LOAD ───────────────────────────────────────────────────────
-            _progress(job_id, "load", 80, "Loading data to destination(s)")
-            load_details: Dict[str, Any] = {}
-
-            if request.db_destination:
-                dest = request.db_destination
-                _progress(
-                    job_id, "load", 82, f"Writing to DB table '{dest.table_name}'"
-                )
-                conn = connector_for(dest.connection)
-                db_result = _db_upload_with_retry(
-                    connector=conn,
-                    df=df,
-                    table_name=dest.table_name,
-                    column_mappings=request.column_mappings,
-                    if_exists=dest.if_exists.value,
-                    batch_size=request.batch_size,
-                    max_retries=request.max_retries,
-                    logger=etl_log,
-                )
-                if dest.create_index and dest.index_columns:
-                    try:
-                        with connector_for(dest.connection) as c:
-                            c.create_index(dest.table_name, dest.index_columns)
-                    except Exception as idx_exc:
-                        etl_log.warning(f"Index creation failed (non-fatal): {idx_exc}")
-                load_details["database"] = db_result
-
-            if request.file_destination:
-                dest = request.file_destination
-                _progress(job_id, "load", 90, f"Writing to file: {dest.output_path}")
-                file_result = FileWriter().write(df, dest.output_path, dest.format)
-                load_details["file"] = file_result
-
-            if request.api_destination:
-                dest = request.api_destination
-                _progress(job_id, "load", 93, f"Sending to API: {dest.url}")
-                api_result = APIWriter(
-                    dest,
-                    max_retries=request.max_retries,
-                    retry_delay=cfg.RETRY_DELAY_SECONDS,
-                ).write(df)
-                load_details["api"] = api_result
+            # ── 2–6. FILTER → LOAD ────────────────────────────────────────────
+            outcome = _transform_and_load(
+                request, df, etl_log, report=functools.partial(_progress, job_id)
+            )
 
             # ── DONE ──────────────────────────────────────────────────────────
             final = ETLJobResult(
@@ -331,43 +281,405 @@ def run_etl_task(
                 success=True,
                 message="ETL job completed successfully.",
                 total_rows=total_rows,
-                processed_rows=len(df),
-                failed_rows=failed_rows,
-                invalid_rows_file=invalid_rows_file,
+                processed_rows=outcome["processed_rows"],
+                failed_rows=outcome["failed_rows"],
+                invalid_rows_file=outcome["invalid_rows_file"],
                 log_file=etl_log.log_file,
-                details=load_details,
+                details=outcome["details"],
             )
-            save_job(final)
             _progress(
                 job_id,
                 "done",
                 100,
                 "ETL job completed successfully",
-                processed_rows=len(df),
-                failed_rows=failed_rows,
+                result=final,
+                processed_rows=final.processed_rows,
+                failed_rows=final.failed_rows,
             )
             return final.model_dump()
 
         except Exception as exc:
             etl_log.error(f"ETL job failed: {exc}", {"error_type": type(exc).__name__})
-            attempt = self.request.retries + 1
-            max_r = self.max_retries or 0
-            if attempt <= max_r and not isinstance(
-                exc, (ValueError, FileNotFoundError, KeyError)
-            ):
-                # Transient failure — will be retried; tell the UI
-                _progress(
-                    job_id,
-                    "retrying",
-                    0,
-                    f"Transient error — retry {attempt}/{max_r}: {exc}",
-                )
-            else:
-                # Permanent failure or data error — mark done so UI stops spinning
-                _fail_job(job_id, str(exc))
+            _fail_or_retry(self, job_id, exc)
             raise
 
 
+# ── partitioned (fan-out / fan-in) execution ─────────────────────────────────
+
+
+@celery_app.task(
+    name="app.worker.tasks.run_partitioned_etl_task",
+    base=ETLTask,
+    bind=True,
+    queue="etl.default",
+    autoretry_for=(Exception,),
+    max_retries=settings.MAX_RETRIES,
+    retry_backoff=True,
+    retry_backoff_max=60,
+    retry_jitter=True,
+    dont_autoretry_for=_PERMANENT_ERRORS,
+    acks_late=True,
+)
+def run_partitioned_etl_task(
+    self: Task,
+    request_dict: Dict[str, Any],
+    job_id: str,
+) -> Dict[str, Any]:
+    """
+    Coordinator for a job with partitions > 1.
+
+    Splits the source (CSV byte ranges, Parquet row groups or DB key ranges),
+    prepares the destination table once, then fans out one
+    run_etl_partition_task per slice. A chord callback merges the results
+    into the parent job_id. Sources that can't be split run as a normal
+    run_etl_task instead.
+    """
+    from celery import chord
+
+    from app.services.etl_logger import ETLLogger
+    from app.services.partitioner import plan_partitions
+
+    request = ETLJobRequest.model_validate(request_dict)
+
+    with ETLLogger(job_id=job_id) as etl_log:
+        try:
+            partitions = plan_partitions(request)
+        except Exception as exc:
+            etl_log.error(f"Partition planning failed: {exc}")
+            _fail_or_retry(self, job_id, exc)
+            raise
+
+        if len(partitions) == 1:
+            etl_log.info("Source cannot be split — running as a single task")
+            raise self.replace(run_etl_task.s(request_dict=request_dict, job_id=job_id))
+
+        count = len(partitions)
+        running_result = ETLJobResult(
+            job_id=job_id,
+            success=False,
+            message="running",
+            total_rows=0,
+            processed_rows=0,
+            failed_rows=0,
+        )
+        _progress(job_id, "started", 0, "ETL job started", result=running_result)
+        etl_log.info(f"Split source into {count} partitions", {"partitions": count})
+
+        try:
+            if request.db_destination:
+                _prepare_db_destination(request, etl_log)
+            if request.file_destination:
+                _prepare_file_destination(request, etl_log)
+        except Exception as exc:
+            etl_log.error(f"Destination setup failed: {exc}")
+            _fail_or_retry(self, job_id, exc)
+            raise
+
+        # Partitions append into the table / directory prepared above; the
+        # index is built once by the callback.
+        part_dict = dict(request_dict)
+        if request.db_destination:
+            part_dict["db_destination"] = {
+                **request_dict["db_destination"],
+                "if_exists": "append",
+                "create_index": False,
+            }
+        if request.file_destination:
+            part_dict["file_destination"] = {
+                **request_dict["file_destination"],
+                "existing_data": "append",
+            }
+
+        _progress(
+            job_id,
+            "extract",
+            10,
+            f"Dispatching {count} partitions",
+            partitions=count,
+        )
+        chord(
+            run_etl_partition_task.s(
+                request_dict=part_dict, job_id=job_id, partition=partition
+            )
+            for partition in partitions
+        )(
+            finalize_partitioned_etl.s(
+                job_id=job_id, request_dict=request_dict
+            ).on_error(etl_partitions_failed.s(job_id=job_id, partitions=count))
+        )
+
+    return {"job_id": job_id, "partitions": count}
+
+
+@celery_app.task(
+    name="app.worker.tasks.run_etl_partition_task",
+    bind=True,
+    queue="etl.default",
+    # No autoretry: a partition may have appended rows before failing, and
+    # re-running it would duplicate them. A failure fails the whole job.
+    acks_late=True,
+)
+def run_etl_partition_task(
+    self: Task,
+    request_dict: Dict[str, Any],
+    job_id: str,
+    partition: Dict[str, Any],
+) -> Dict[str, Any]:
+    """Extract one partition and run filter → transform → validate → load on it."""
+    from app.services.etl_logger import ETLLogger
+    from app.services.partitioner import read_partition
+
+    request = ETLJobRequest.model_validate(request_dict)
+    index, count = partition["index"], partition["count"]
+
+    with ETLLogger(job_id=f"{job_id}.p{index}") as etl_log:
+        try:
+            etl_log.info(f"Extracting partition {index + 1}/{count}", partition)
+            df, auto_mappings = read_partition(request, partition)
+            if auto_mappings is not None:
+                request = _merge_auto_mappings(request, auto_mappings)
+            total_rows = len(df)
+
+            def report(stage: str, pct: int, message: str, **extra) -> None:
+                etl_log.info(f"{stage}: {message}")
+
+            outcome = _transform_and_load(request, df, etl_log, report=report)
+        except Exception as exc:
+            etl_log.error(
+                f"Partition {index} failed: {exc}",
+                {"error_type": type(exc).__name__},
+            )
+            raise
+
+    done = incr_partitions_done(job_id, outcome["processed_rows"])
+    _progress(
+        job_id,
+        "load",
+        10 + 85 * done // count,
+        f"Partition {index + 1}/{count} loaded ({done}/{count} done)",
+        partition=index,
+        processed_rows=outcome["processed_rows"],
+    )
+    # Partitions never reach a terminal stage; the chord callback does that,
+    # possibly in another process, so don't keep this job's state around
+    _emitter.flush(job_id)
+    return {"index": index, "total_rows": total_rows, **outcome}
+
+
+@celery_app.task(name="app.worker.tasks.finalize_partitioned_etl", queue="etl.default")
+def finalize_partitioned_etl(
+    results: List[Dict[str, Any]],
+    job_id: str,
+    request_dict: Dict[str, Any],
+) -> Dict[str, Any]:
+    """Chord callback: merge partition results into the parent job."""
+    from app.services.etl_logger import ETLLogger
+
+    request = ETLJobRequest.model_validate(request_dict)
+    results = sorted(results, key=lambda r: r["index"])
+    pop_partitions_done(job_id)
+
+    with ETLLogger(job_id=job_id, append=True) as etl_log:
+        invalid_rows_file = _merge_invalid_rows(
+            job_id, [r["invalid_rows_file"] for r in results if r["invalid_rows_file"]]
+        )
+        details = _merge_details([r["details"] for r in results])
+        details["partitions"] = len(results)
+
+        dest = request.db_destination
+        if dest and dest.create_index and dest.index_columns:
+            try:
+                with _connector_for(dest.connection) as c:
+                    c.create_index(dest.table_name, dest.index_columns)
+            except Exception as idx_exc:
+                etl_log.warning(f"Index creation failed (non-fatal): {idx_exc}")
+
+        final = ETLJobResult(
+            job_id=job_id,
+            success=True,
+            message="ETL job completed successfully.",
+            total_rows=sum(r["total_rows"] for r in results),
+            processed_rows=sum(r["processed_rows"] for r in results),
+            failed_rows=sum(r["failed_rows"] for r in results),
+            invalid_rows_file=invalid_rows_file,
+            log_file=etl_log.log_file,
+            details=details,
+        )
+        etl_log.info(
+            f"Merged {len(results)} partitions",
+            {"processed_rows": final.processed_rows, "failed_rows": final.failed_rows},
+        )
+
+    _progress(
+        job_id,
+        "done",
+        100,
+        "ETL job completed successfully",
+        result=final,
+        processed_rows=final.processed_rows,
+        failed_rows=final.failed_rows,
+    )
+    return final.model_dump()
+
+
+@celery_app.task(name="app.worker.tasks.etl_partitions_failed", queue="etl.default")
+def etl_partitions_failed(
+    request, exc, traceback, job_id: str, partitions: Optional[int] = None
+) -> None:
+    """
+    Chord error callback: a partition failed, so the whole job fails. Rows
+    that partitions which finished already loaded stay in the destination —
+    they are not rolled back — so the failure reports how many there are.
+    """
+    logger.error("[%s] partition %s failed: %s", job_id, request.id, exc)
+    done, rows = pop_partitions_done(job_id)
+    message = f"Partition failed: {exc}"
+    if done:
+        of = f"/{partitions}" if partitions else ""
+        message += (
+            f" — {done}{of} partitions already loaded {rows} rows into the "
+            "destination; they were not rolled back"
+        )
+    _fail_job(
+        job_id,
+        message,
+        details={
+            "partial_load": bool(done),
+            "partitions": partitions,
+            "partitions_loaded": done,
+            "rows_loaded": rows,
+        },
+    )
+
+
+# ── shared pipeline ───────────────────────────────────────────────────────────
+
+
+def _transform_and_load(
+    request: ETLJobRequest,
+    df: "pd.DataFrame",
+    etl_log,
+    report: Callable[..., None],
+) -> Dict[str, Any]:
+    """
+    Stages 2–6 (filter → transform → validate → aggregate → load) on an
+    extracted frame. `report(stage, pct, message, **extra)` receives progress.
+    """
+    from app.services.api_writer import APIWriter
+    from app.services.file_writer import FileWriter
+    from app.services.schema_mapper import (
+        Aggregator,
+        DataValidator,
+        RowFilter,
+        SchemaMapper,
+    )
+
+    # ── 2. FILTER ─────────────────────────────────────────────────────────────
+    if request.filters:
+        report("filter", 30, f"Applying {len(request.filters)} filter rule(s)")
+        row_filter = RowFilter()
+        df, filtered_out = row_filter.apply(df, request.filters)
+        etl_log.debug("Filter plan", {"plan": row_filter.plan.describe()})
+        report("filter", 35, f"{len(df)} kept, {len(filtered_out)} discarded")
+
+    # ── 3. TRANSFORM ──────────────────────────────────────────────────────────
+    report("transform", 40, "Applying schema mappings")
+    mapper = SchemaMapper(df)
+    df = mapper.apply_column_mapping(request.column_mappings)
+
+    if mapper.transformation_errors:
+        for err in mapper.transformation_errors:
+            etl_log.warning(f"Transform warning on '{err['column']}': {err['error']}")
+        report(
+            "transform",
+            55,
+            f"Schema mapping complete ({len(mapper.transformation_errors)} column warning(s))",
+            warnings=len(mapper.transformation_errors),
+        )
+    else:
+        report("transform", 55, "Schema mapping complete")
+
+    # ── 4. VALIDATE ───────────────────────────────────────────────────────────
+    invalid_rows_file: Optional[str] = None
+    failed_rows = 0
+
+    if request.validation_rules:
+        report(
+            "validate",
+            60,
+            f"Running {len(request.validation_rules)} validation rule(s)",
+        )
+        validator = DataValidator()
+        df, invalid_df, validation_errors = validator.validate(
+            df, request.validation_rules
+        )
+        etl_log.debug("Validation plan", {"plan": validator.plan.describe()})
+        failed_rows = len(invalid_df)
+        if failed_rows > 0:
+            invalid_rows_file = etl_log.save_invalid_rows(invalid_df, validation_errors)
+        report(
+            "validate",
+            70,
+            f"{len(df)} valid, {failed_rows} invalid",
+            failed_rows=failed_rows,
+        )
+
+    # ── 5. AGGREGATE ──────────────────────────────────────────────────────────
+    if request.aggregations:
+        report("aggregate", 75, "Applying aggregations")
+        df = Aggregator().apply(df, request.aggregations)
+        report("aggregate", 78, f"After aggregation: {len(df)} rows")
+
+    # ── 6. LOAD ───────────────────────────────────────────────────────────────
+    report("load", 80, "Loading data to destination(s)")
+    load_details: Dict[str, Any] = {}
+
+    if request.db_destination:
+        dest = request.db_destination
+        report("load", 82, f"Writing to DB table '{dest.table_name}'")
+        conn = _connector_for(dest.connection)
+        db_result = _db_upload_with_retry(
+            connector=conn,
+            df=df,
+            table_name=dest.table_name,
+            column_mappings=request.column_mappings,
+            if_exists=dest.if_exists.value,
+            batch_size=request.batch_size,
+            max_retries=request.max_retries,
+            logger=etl_log,
+        )
+        if dest.create_index and dest.index_columns:
+            try:
+                with _connector_for(dest.connection) as c:
+                    c.create_index(dest.table_name, dest.index_columns)
+            except Exception as idx_exc:
+                etl_log.warning(f"Index creation failed (non-fatal): {idx_exc}")
+        load_details["database"] = db_result
+
+    if request.file_destination:
+        dest = request.file_destination
+        report("load", 90, f"Writing to file: {dest.output_path}")
+        file_result = FileWriter().write_destination(df, dest)
+        load_details["file"] = file_result
+
+    if request.api_destination:
+        dest = request.api_destination
+        report("load", 93, f"Sending to API: {dest.url}")
+        api_result = APIWriter(
+            dest,
+            max_retries=request.max_retries,
+            retry_delay=settings.RETRY_DELAY_SECONDS,
+        ).write(df)
+        load_details["api"] = api_result
+
+    return {
+        "processed_rows": len(df),
+        "failed_rows": failed_rows,
+        "invalid_rows_file": invalid_rows_file,
+        "details": load_details,
+    }
+
+
 # ── internal helpers (kept local to avoid import cycles) ─────────────────────
 
 
@@ -455,3 +767,84 @@ def _db_upload_with_retry(
     raise RuntimeError(
         f"DB upload failed after {max_retries} attempt(s): {last_exc}"
     ) from last_exc
+
+
+def _prepare_db_destination(request: ETLJobRequest, etl_log) -> None:
+    """
+    Apply if_exists once, before partitions start appending in parallel, and
+    create the table so partitions never race on CREATE TABLE.
+    """
+    from app.core.constants import IfExists
+    from app.services.db_reader import sample_column_mappings
+
+    dest = request.db_destination
+    if request.db_source:
+        request = _merge_auto_mappings(
+            request, sample_column_mappings(request.db_source)
+        )
+
+    with _connector_for(dest.connection) as conn:
+        exists = conn.table_exists(dest.table_name)
+        if exists and dest.if_exists == IfExists.FAIL:
+            raise ValueError(
+                f"Table '{dest.table_name}' already exists and if_exists='fail'."
+            )
+        if exists and dest.if_exists == IfExists.REPLACE:
+            conn.drop_table(dest.table_name)
+            exists = False
+        if not exists:
+            conn.create_table(dest.table_name, request.column_mappings)
+    etl_log.info(f"Prepared destination table '{dest.table_name}'")
+
+
+def _prepare_file_destination(request: ETLJobRequest, etl_log) -> None:
+    """
+    Partitions write into one Hive-partitioned directory, each under its own
+    file names, so they must append. Apply existing_data='replace' once, up
+    front, by clearing the tree's top-level `<column>=<value>` directories;
+    anything else in the directory is left alone.
+    """
+    dest = request.file_destination
+    if dest.existing_data != "replace" or not os.path.isdir(dest.output_path):
+        return
+    prefix = f"{dest.partition_by[0]}="
+    for entry in os.listdir(dest.output_path):
+        path = os.path.join(dest.output_path, entry)
+        if entry.startswith(prefix) and os.path.isdir(path):
+            shutil.rmtree(path)
+    etl_log.info(f"Cleared partitioned output '{dest.output_path}'")
+
+
+def _merge_invalid_rows(job_id: str, paths: List[str]) -> Optional[str]:
+    """Concatenate partition invalid-row CSVs into the job's own file."""
+    if not paths:
+        return None
+    out_path = os.path.join(settings.INVALID_ROWS_DIR, f"{job_id}_invalid.csv")
+    with open(out_path, "wb") as out:
+        for i, path in enumerate(paths):
+            with open(path, "rb") as part:
+                header = part.readline()
+                if i == 0:
+                    out.write(header)
+                shutil.copyfileobj(part, out)
+            os.remove(path)
+    return out_path
+
+
+def _merge_details(parts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Sum counters and concatenate lists across partition load details."""
+    merged: Dict[str, Any] = {}
+    for details in parts:
+        for dest, result in details.items():
+            into = merged.setdefault(dest, {})
+            for key, value in result.items():
+                prev = into.get(key)
+                if prev is None:
+                    into[key] = value
+                elif isinstance(value, bool):
+                    into[key] = prev and value
+                elif isinstance(value, (int, float)):
+                    into[key] = prev + value
+                elif isinstance(value, list):
+                    into[key] = prev + value
+    return merged
@@ -0,0 +1,93 @@
+"""
+Parquet write throughput and file size per codec.
+
+    python -m benchmarks.parquet_write                      # synthetic, 1M rows
+    python -m benchmarks.parquet_write --rows 5000000
+    python -m benchmarks.parquet_write --input uploaded_files/data.csv
+
+Writes each configuration through FileWriter (the ETL file destination
+path) into a temp directory and prints rows/s, MB/s of in-memory data and
+the resulting file size.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.models.schemas import ParquetOptions
+from app.services.file_processor import FileProcessor
+from app.services.file_writer import FileWriter
+
+CONFIGS: List[Tuple[str, ParquetOptions]] = [
+    ("none", ParquetOptions(compression="none")),
+    ("snappy", ParquetOptions(compression="snappy")),
+    ("lz4", ParquetOptions(compression="lz4")),
+    ("zstd-1", ParquetOptions(compression="zstd", compression_level=1)),
+    ("zstd-3", ParquetOptions(compression="zstd", compression_level=3)),
+    ("zstd-9", ParquetOptions(compression="zstd", compression_level=9)),
+    ("gzip-6", ParquetOptions(compression="gzip", compression_level=6)),
+    ("brotli-4", ParquetOptions(compression="brotli", compression_level=4)),
+    ("snappy-no-dict", ParquetOptions(compression="snappy", use_dictionary=False)),
+    ("snappy-whole", ParquetOptions(compression="snappy", incremental=False)),
+]
+
+
+def synthetic_frame(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            "id": np.arange(rows),
+            "amount": rng.normal(100, 25, rows).round(2),
+            "quantity": rng.integers(1, 50, rows),
+            "category": rng.choice(["books", "games", "music", "tools"], rows),
+            "country": rng.choice(["BD", "DE", "IN", "US", "JP", "BR"], rows),
+            "created_at": pd.Timestamp("2024-01-01")
+            + pd.to_timedelta(rng.integers(0, 365 * 86_400, rows), unit="s"),
+            "comment": pd.Series(rng.integers(0, 10**9, rows)).map("note {}".format),
+        }
+    )
+
+
+def run(df: pd.DataFrame, row_group_size: int) -> None:
+    in_memory_mb = df.memory_usage(deep=True).sum() / 1024**2
+    print(f"{len(df):,} rows, {in_memory_mb:,.1f} MB in memory\n")
+    print(
+        f"{'config':<16}{'seconds':>9}{'rows/s':>14}{'MB/s':>9}{'size MB':>10}{'ratio':>8}"
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, options in CONFIGS:
+            options = options.model_copy(update={"row_group_size": row_group_size})
+            path = os.path.join(tmp, f"{name}.parquet")
+            start = time.perf_counter()
+            FileWriter().write(df, path, "parquet", parquet=options)
+            elapsed = time.perf_counter() - start
+            size_mb = os.path.getsize(path) / 1024**2
+            print(
+                f"{name:<16}{elapsed:>9.2f}{len(df) / elapsed:>14,.0f}"
+                f"{in_memory_mb / elapsed:>9.1f}{size_mb:>10.1f}"
+                f"{in_memory_mb / size_mb:>8.1f}"
+            )
+            os.remove(path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument(
+        "--input", help="CSV/Excel/Parquet file instead of synthetic data"
+    )
+    parser.add_argument("--row-group-size", type=int, default=128 * 1024)
+    args = parser.parse_args()
+
+    df = FileProcessor(args.input).df if args.input else synthetic_frame(args.rows)
+    run(df, args.row_group_size)
+
+
+if __name__ == "__main__":
+    main()
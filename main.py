@@ -16,6 +16,7 @@ from starlette.exceptions import HTTPException as StarletteHTTPException
 
 from app.api.v1 import router
 from app.core.config import settings
+from app.worker.job_store import close_async_client
 
 # ── logging setup ────────────────────────────────────────────────────────────
 logging.basicConfig(
@@ -35,6 +36,7 @@ async def lifespan(app: FastAPI):
         os.makedirs(directory, exist_ok=True)
         logging.getLogger("startup").info(f"Directory ready: {directory}")
     yield  # server runs here
+    await close_async_client()
 
 
 # ── app ───────────────────────────────────────────────────────────────────────
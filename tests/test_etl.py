@@ -1,6 +1,9 @@
+import io
 import os
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import pytest
 
 from app.core.constants import (
@@ -17,9 +20,11 @@ from app.models.schemas import (
     FileDestination,
     FilterRule,
     IfExists,
+    ParquetOptions,
     ValidationRule,
 )
 from app.services.etl_runner import JOB_STORE, run_etl_job
+from app.services.file_writer import CSVBatchWriter, FileWriter, ParquetBatchWriter
 
 
 def _base_mappings():
@@ -223,6 +228,220 @@ class TestETLRunner:
         assert len(events) > 0
 
 
+# ── Parquet output ──────────────────────────────────────────────────────────
+
+
+class TestParquetWriter:
+    @pytest.fixture
+    def df(self):
+        return pd.DataFrame(
+            {
+                "id": range(1_000),
+                "cat": [f"c{i % 3}" for i in range(1_000)],
+                "note": [None] * 500 + ["x"] * 500,
+            }
+        )
+
+    def test_incremental_writes_one_row_group_per_slice(self, df, tmp_path):
+        out = str(tmp_path / "o.parquet")
+        opts = ParquetOptions(
+            compression="zstd", compression_level=3, row_group_size=300
+        )
+        result = FileWriter().write(df, out, "parquet", parquet=opts)
+        assert result["row_groups"] == 4
+        meta = pq.read_metadata(out)
+        assert meta.row_group(0).column(0).compression == "ZSTD"
+        pd.testing.assert_frame_equal(pd.read_parquet(out), df)
+
+    def test_dictionary_and_statistics_per_column(self, df, tmp_path):
+        out = str(tmp_path / "o.parquet")
+        opts = ParquetOptions(
+            use_dictionary=["cat"], write_statistics=["id"], incremental=False
+        )
+        FileWriter().write(df, out, "parquet", parquet=opts)
+        group = pq.read_metadata(out).row_group(0)
+        assert "RLE_DICTIONARY" in group.column(1).encodings
+        assert "RLE_DICTIONARY" not in group.column(0).encodings
+        assert group.column(0).is_stats_set
+        assert not group.column(1).is_stats_set
+
+    def test_batch_writer_appends_batches(self, df, tmp_path):
+        out = str(tmp_path / "b.parquet")
+        with ParquetBatchWriter(out) as writer:
+            writer.write_batch(df.iloc[:400])
+            writer.write_batch(df.iloc[400:])
+        assert writer.rows_written == 1_000
+        assert pq.read_metadata(out).num_row_groups == 2
+
+    def test_options_require_parquet_format(self):
+        with pytest.raises(ValueError):
+            FileDestination(format="csv", output_path="x.csv", parquet=ParquetOptions())
+
+    @pytest.mark.parametrize(
+        "codec, level",
+        [("snappy", 1), ("lz4", 3), ("none", 1), ("zstd", 0), ("zstd", 23)]
+        + [("gzip", 10), ("brotli", 12), ("brotli", -1)],
+    )
+    def test_compression_level_checked_per_codec(self, codec, level):
+        with pytest.raises(ValueError, match="compression_level"):
+            ParquetOptions(compression=codec, compression_level=level)
+
+    @pytest.mark.parametrize(
+        "codec, level", [("zstd", 1), ("zstd", 22), ("gzip", 9), ("brotli", 0)]
+    )
+    def test_valid_compression_levels(self, df, tmp_path, codec, level):
+        options = ParquetOptions(compression=codec, compression_level=level)
+        out = str(tmp_path / "l.parquet")
+        FileWriter().write(df, out, "parquet", parquet=options)
+        assert pq.read_table(out).num_rows == len(df)
+
+
+class TestCSVWriter:
+    @pytest.fixture
+    def df(self):
+        return pd.DataFrame(
+            {"id": range(250), "score": [1.5, None] * 125, "name": ["a,b", "c"] * 125}
+        )
+
+    def test_matches_to_csv_across_chunks(self, df, tmp_path, monkeypatch):
+        monkeypatch.setattr("app.services.file_writer.CSV_CHUNK_ROWS", 100)
+        out = str(tmp_path / "o.csv")
+        result = FileWriter().write(df, out, "csv")
+        with open(out) as fh:
+            assert fh.read() == df.to_csv(index=False)
+        assert result["compression"] == "none"
+        assert result["uncompressed_bytes"] == result["file_size_bytes"]
+        assert result["rows_per_second"] > 0
+
+    @pytest.mark.parametrize("ext,codec", [("gz", "gzip"), ("zst", "zstd")])
+    def test_compression_from_extension(self, df, tmp_path, ext, codec):
+        out = str(tmp_path / f"o.csv.{ext}")
+        result = FileWriter().write(df, out, "csv")
+        assert result["compression"] == codec
+        assert result["file_size_bytes"] < result["uncompressed_bytes"]
+        with pa.CompressedInputStream(out, codec) as fh:
+            assert fh.read().decode() == df.to_csv(index=False)
+
+    def test_arrow_engine(self, df, tmp_path):
+        out = str(tmp_path / "o.csv")
+        FileWriter().write(df, out, "csv", csv_engine="arrow")
+        pd.testing.assert_frame_equal(
+            pd.read_csv(out), pd.read_csv(io.StringIO(df.to_csv(index=False)))
+        )
+
+    def test_batch_writer_writes_header_once(self, df, tmp_path):
+        out = str(tmp_path / "b.csv")
+        with CSVBatchWriter(out) as writer:
+            writer.write_batch(df.iloc[:10])
+            writer.write_batch(df.iloc[10:])
+        assert writer.rows_written == 250
+        assert len(pd.read_csv(out)) == 250
+
+
+class TestPartitionedOutput:
+    @pytest.fixture
+    def df(self):
+        return pd.DataFrame(
+            {"year": [2025, 2026, 2026, 2026], "month": [1, 10, 10, 11], "v": range(4)}
+        )
+
+    def _files(self, root):
+        return sorted(
+            os.path.relpath(os.path.join(d, f), root)
+            for d, _, names in os.walk(root)
+            for f in names
+        )
+
+    def test_hive_tree_with_bounded_file_size(self, df, tmp_path):
+        out = str(tmp_path / "out")
+        result = FileWriter().write_partitioned(
+            df, out, "parquet", ["year", "month"], max_rows_per_file=1
+        )
+        assert result["files_written"] == 4
+        assert result["partitions"] == [
+            "year=2025/month=1",
+            "year=2026/month=10",
+            "year=2026/month=11",
+        ]
+        assert all(f.endswith(".parquet") for f in self._files(out))
+        back = pd.read_parquet(out)
+        assert sorted(back["v"].tolist()) == [0, 1, 2, 3]
+
+    def test_replace_rewrites_partitions_append_adds(self, df, tmp_path):
+        out = str(tmp_path / "out")
+        writer = FileWriter()
+        writer.write_partitioned(df, out, "csv", ["year"])
+        writer.write_partitioned(df, out, "csv", ["year"])
+        assert len(self._files(out)) == 2
+        writer.write_partitioned(df, out, "csv", ["year"], append=True)
+        assert len(self._files(out)) == 4
+
+    def test_file_size_without_written_file_size(self, df, tmp_path, monkeypatch):
+        from types import SimpleNamespace
+
+        from app.services import file_writer
+
+        write_dataset = file_writer.ds.write_dataset
+
+        def pyarrow_14(*args, file_visitor, **kwargs):
+            # pyarrow < 15: WrittenFile has path and metadata, no size
+            visit = lambda f: file_visitor(SimpleNamespace(path=f.path))
+            return write_dataset(*args, file_visitor=visit, **kwargs)
+
+        monkeypatch.setattr(file_writer.ds, "write_dataset", pyarrow_14)
+        out = str(tmp_path / "out")
+        result = FileWriter().write_partitioned(df, out, "parquet", ["year"])
+        on_disk = sum(os.path.getsize(os.path.join(out, f)) for f in self._files(out))
+        assert result["file_size_bytes"] == on_disk > 0
+
+    def test_unknown_partition_column_raises(self, df, tmp_path):
+        with pytest.raises(ValueError, match="not found"):
+            FileWriter().write_partitioned(df, str(tmp_path), "parquet", ["day"])
+
+    def test_excel_cannot_be_partitioned(self):
+        with pytest.raises(ValueError, match="partition_by"):
+            FileDestination(format="excel", output_path="x", partition_by=["a"])
+
+    def test_partitioned_jobs_need_partition_by(self):
+        dest = FileDestination(format="parquet", output_path="out")
+        with pytest.raises(ValueError, match="partition_by"):
+            ETLJobRequest(
+                file_id="a.csv",
+                column_mappings=[],
+                partitions=2,
+                file_destination=dest,
+            )
+        ETLJobRequest(
+            file_id="a.csv",
+            column_mappings=[],
+            partitions=2,
+            file_destination=dest.model_copy(update={"partition_by": ["name"]}),
+        )
+
+    def test_etl_job_writes_partitioned_destination(self, tmp_path, monkeypatch):
+        from app.core import config
+
+        monkeypatch.setattr(config.settings, "UPLOAD_DIR", str(tmp_path))
+        monkeypatch.setattr(config.settings, "LOG_DIR", str(tmp_path))
+        monkeypatch.setattr(config.settings, "INVALID_ROWS_DIR", str(tmp_path))
+        pd.DataFrame(
+            {"id": [1, 2, 3], "name": ["A", "B", "A"], "score": [1.0, 2.0, 3.0]}
+        ).to_csv(tmp_path / "data.csv", index=False)
+
+        out = str(tmp_path / "out")
+        result = run_etl_job(
+            ETLJobRequest(
+                file_id="data.csv",
+                column_mappings=_base_mappings(),
+                file_destination=FileDestination(
+                    format="parquet", output_path=out, partition_by=["name"]
+                ),
+            )
+        )
+        assert result.success is True
+        assert sorted(os.listdir(out)) == ["name=A", "name=B"]
+
+
 # ── API endpoints ─────────────────────────────────────────────────────────────
 
 
@@ -1,9 +1,40 @@
+import asyncio
 import os
+import time
 
 import pandas as pd
 import pytest
 
-from app.services.file_processor import FileProcessor
+from app.services.file_processor import (
+    FileProcessor,
+    cache_excel_sheets,
+    columnar_cache_path,
+    excel_sheet_names,
+    invalidate_columnar_cache,
+    profile_column,
+)
+from app.core.config import settings
+from app.services.chunked_upload import (
+    complete_upload,
+    create_upload,
+    upload_state,
+    write_part,
+)
+from app.services.file_profile import (
+    build_fast_profile,
+    get_cached_column_stats,
+    get_profile,
+    invalidate_profile,
+    profile_path,
+)
+from app.utils.file_helpers import (
+    find_upload_by_hash,
+    forget_upload,
+    read_upload_hash,
+    register_upload,
+    release_upload,
+    reuse_upload,
+)
 
 
 class TestFileReading:
@@ -40,6 +71,116 @@ class TestFileReading:
         assert len(fp.df) == 1
 
 
+class TestColumnarCache:
+    @pytest.fixture
+    def csv_path(self, tmp_path):
+        p = tmp_path / "c.csv"
+        pd.DataFrame(
+            {"id": [1, 2, 3], "score": [1.5, None, 3.0], "name": ["a", "b", "c"]}
+        ).to_csv(p, index=False)
+        return str(p)
+
+    def test_first_read_writes_cache(self, csv_path):
+        FileProcessor(csv_path).df
+        assert os.path.exists(columnar_cache_path(csv_path))
+
+    def test_later_reads_skip_parsing(self, csv_path, monkeypatch):
+        expected = FileProcessor(csv_path).df
+
+        def fail(self):
+            raise AssertionError("file was re-parsed")
+
+        monkeypatch.setattr(FileProcessor, "_parse_file", fail)
+        pd.testing.assert_frame_equal(FileProcessor(csv_path).df, expected)
+
+    def test_stale_cache_is_ignored(self, csv_path):
+        FileProcessor(csv_path).df
+        pd.DataFrame({"id": [9]}).to_csv(csv_path, index=False)
+        os.utime(csv_path, ns=(0, 0))
+        assert FileProcessor(csv_path).df["id"].tolist() == [9]
+
+    def test_mixed_excel_column_cached_as_strings(self, tmp_path):
+        p = str(tmp_path / "m.xlsx")
+        pd.DataFrame({"a": [1, "x", None]}).to_excel(p, index=False)
+        first = FileProcessor(p).df
+        assert os.path.exists(columnar_cache_path(p))
+        assert first["a"].tolist()[:2] == ["1", "x"]
+        pd.testing.assert_frame_equal(FileProcessor(p).df, first)
+
+    def test_parquet_is_not_cached(self, tmp_path):
+        p = tmp_path / "p.parquet"
+        pd.DataFrame({"a": [1]}).to_parquet(p)
+        FileProcessor(str(p)).df
+        assert not os.path.exists(columnar_cache_path(str(p)))
+
+
+class TestExcelSheets:
+    @pytest.fixture
+    def workbook(self, tmp_path):
+        p = str(tmp_path / "w.xlsx")
+        with pd.ExcelWriter(p) as writer:
+            pd.DataFrame({"a": [1, 2]}).to_excel(
+                writer, sheet_name="First", index=False
+            )
+            pd.DataFrame({"b": ["x", "y", "z"]}).to_excel(
+                writer, sheet_name="Second Sheet", index=False
+            )
+        return p
+
+    def test_sheet_names(self, workbook):
+        assert excel_sheet_names(workbook) == ["First", "Second Sheet"]
+
+    def test_reads_selected_sheet(self, workbook):
+        assert FileProcessor(workbook).df.columns.tolist() == ["a"]
+        df = FileProcessor(workbook, sheet_name="Second Sheet").df
+        assert df["b"].tolist() == ["x", "y", "z"]
+        assert os.path.exists(columnar_cache_path(workbook, "Second Sheet"))
+
+    def test_parallel_cache_of_all_sheets(self, workbook, monkeypatch):
+        monkeypatch.setattr(settings, "EXCEL_MAX_WORKERS", 2)
+        assert cache_excel_sheets(workbook) == {"First": 2, "Second Sheet": 3}
+        assert os.path.exists(columnar_cache_path(workbook, "First"))
+
+    def test_first_sheet_reuses_default_cache(self, workbook, monkeypatch):
+        FileProcessor(workbook).df  # e.g. the upload's metadata read
+        monkeypatch.setattr(settings, "EXCEL_MAX_WORKERS", 1)
+        parsed = []
+        parse = FileProcessor._parse_file
+
+        def recording_parse(self):
+            parsed.append(self.sheet_name)
+            return parse(self)
+
+        monkeypatch.setattr(FileProcessor, "_parse_file", recording_parse)
+        assert cache_excel_sheets(workbook) == {"First": 2, "Second Sheet": 3}
+        assert parsed == ["Second Sheet"]
+        assert FileProcessor(workbook, sheet_name="First").df["a"].tolist() == [1, 2]
+        assert parsed == ["Second Sheet"]
+
+    def test_calamine_needs_pandas_2_2(self, monkeypatch):
+        import importlib.util
+
+        from app.services.file_processor import _calamine_supported
+
+        monkeypatch.setattr(importlib.util, "find_spec", lambda name: object())
+        monkeypatch.setattr(pd, "__version__", "2.1.4")
+        assert not _calamine_supported()
+        monkeypatch.setattr(pd, "__version__", "2.2.0")
+        assert _calamine_supported()
+
+    def test_unknown_sheet_raises(self, workbook):
+        with pytest.raises(ValueError, match="not found"):
+            cache_excel_sheets(workbook, ["Missing"])
+
+    def test_invalidate_removes_every_sheet_cache(self, workbook):
+        FileProcessor(workbook).df
+        FileProcessor(workbook, sheet_name="Second Sheet").df
+        invalidate_columnar_cache(workbook)
+        assert not [
+            n for n in os.listdir(os.path.dirname(workbook)) if n.startswith(".")
+        ]
+
+
 class TestGetMetadata:
     def test_returns_expected_keys(self, sample_csv):
         meta = FileProcessor(sample_csv).get_file_metadata()
@@ -136,3 +277,288 @@ class TestColumnStats:
     def test_missing_column_raises(self, sample_csv):
         with pytest.raises(ValueError, match="not found"):
             FileProcessor(sample_csv).get_column_stats("nonexistent")
+
+
+class TestFileProfile:
+    @pytest.fixture
+    def csv_path(self, tmp_path):
+        p = tmp_path / "p.csv"
+        pd.DataFrame({"id": [1, 2, 3], "name": ["a", "b", None]}).to_csv(p, index=False)
+        return str(p)
+
+    def test_builds_and_writes_sidecar(self, csv_path):
+        profile = get_profile(csv_path)
+        assert profile["metadata"]["row_count"] == 3
+        assert set(profile["column_stats"]) == {"id", "name"}
+        assert os.path.exists(profile_path(csv_path))
+
+    def test_served_from_cache_without_parsing(self, csv_path, monkeypatch):
+        get_profile(csv_path)
+
+        def fail(self):
+            raise AssertionError("file was re-parsed")
+
+        monkeypatch.setattr(FileProcessor, "_read_file", fail)
+        assert get_cached_column_stats(csv_path, "name")["missing_count"] == 1
+
+    def test_rebuilt_when_file_changes(self, csv_path):
+        get_profile(csv_path)
+        pd.DataFrame({"id": [1, 2, 3, 4]}).to_csv(csv_path, index=False)
+        os.utime(csv_path, ns=(0, 0))
+        assert get_profile(csv_path)["metadata"]["row_count"] == 4
+
+    def test_unknown_column_raises(self, csv_path):
+        with pytest.raises(ValueError, match="not found"):
+            get_cached_column_stats(csv_path, "nonexistent")
+
+    def test_invalidate_removes_sidecar(self, csv_path):
+        get_profile(csv_path)
+        invalidate_profile(csv_path)
+        assert not os.path.exists(profile_path(csv_path))
+        invalidate_profile(csv_path)  # no error when already gone
+
+
+class TestFastProfile:
+    @pytest.fixture
+    def big_csv(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(settings, "PROFILE_HEAD_ROWS", 100)
+        monkeypatch.setattr(settings, "PROFILE_SAMPLE_ROWS", 500)
+        p = tmp_path / "big.csv"
+        pd.DataFrame(
+            {"id": range(20_000), "cat": [f"c{i % 7}" for i in range(20_000)]}
+        ).to_csv(p, index=False)
+        return str(p)
+
+    def test_samples_instead_of_reading_everything(self, big_csv):
+        profile = build_fast_profile(big_csv)
+        meta = profile["metadata"]
+        assert profile["complete"] is False
+        assert meta["row_count_exact"] is False
+        assert 100 < profile["column_stats"]["id"]["count"] <= 600
+        assert abs(meta["row_count"] - 20_000) < 2_000
+        assert meta["preview"][0]["id"] == 0
+
+    def test_small_csv_is_exact(self, tmp_path):
+        p = tmp_path / "s.csv"
+        pd.DataFrame({"a": [1, 2, 3]}).to_csv(p, index=False)
+        profile = build_fast_profile(str(p))
+        assert profile["complete"] is True
+        assert profile["metadata"]["row_count"] == 3
+
+    def test_parquet_row_count_from_footer(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(settings, "PROFILE_HEAD_ROWS", 10)
+        p = tmp_path / "p.parquet"
+        pd.DataFrame({"a": range(1_000)}).to_parquet(p)
+        meta = build_fast_profile(str(p))["metadata"]
+        assert meta["row_count"] == 1_000
+        assert len(meta["preview"]) == 5
+
+    def test_excel_row_count_from_first_sheet(self, tmp_path, monkeypatch):
+        from openpyxl import load_workbook
+
+        monkeypatch.setattr(settings, "PROFILE_HEAD_ROWS", 10)
+        p = str(tmp_path / "w.xlsx")
+        with pd.ExcelWriter(p) as writer:
+            pd.DataFrame({"a": range(300)}).to_excel(writer, sheet_name="big")
+            pd.DataFrame({"b": range(3)}).to_excel(writer, sheet_name="small")
+        workbook = load_workbook(p)
+        workbook.active = 1  # saved with the second sheet selected
+        workbook.save(p)
+
+        profile = build_fast_profile(p)
+        assert profile["metadata"]["row_count"] == 300
+        assert "a" in profile["column_stats"]
+
+
+class TestUploadHashIndex:
+    def test_finds_registered_upload_by_content(self, tmp_path):
+        path = tmp_path / "20260101_a.csv"
+        path.write_text("a\n1\n")
+        register_upload(str(path), "abc123")
+        assert read_upload_hash(str(path)) == "abc123"
+        assert find_upload_by_hash(str(tmp_path), "abc123", ".csv") == path.name
+        assert find_upload_by_hash(str(tmp_path), "abc123", ".xlsx") is None
+
+    def test_forget_drops_index_entry(self, tmp_path):
+        path = tmp_path / "20260101_a.csv"
+        path.write_text("a\n1\n")
+        register_upload(str(path), "abc123")
+        path.unlink()
+        forget_upload(str(path))
+        assert read_upload_hash(str(path)) is None
+        assert find_upload_by_hash(str(tmp_path), "abc123", ".csv") is None
+
+    def test_shared_upload_survives_until_last_release(self, tmp_path):
+        path = tmp_path / "20260101_a.csv"
+        path.write_text("a\n1\n")
+        register_upload(str(path), "abc123")
+        assert reuse_upload(str(tmp_path), "abc123", ".csv") == path.name
+        assert reuse_upload(str(tmp_path), "abc123", ".csv") == path.name
+
+        assert release_upload(str(path)) is False
+        assert release_upload(str(path)) is False
+        assert find_upload_by_hash(str(tmp_path), "abc123", ".csv") == path.name
+        assert release_upload(str(path)) is True
+        assert find_upload_by_hash(str(tmp_path), "abc123", ".csv") is None
+        assert read_upload_hash(str(path)) is None
+
+    def test_delete_keeps_file_for_other_uploaders(self, tmp_path, monkeypatch):
+        from app.api.v1.endpoints.files import _delete_upload
+
+        monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+        path = tmp_path / "20260101_a.csv"
+        path.write_text("a\n1\n")
+        register_upload(str(path), "abc123")
+        reuse_upload(str(tmp_path), "abc123", ".csv")
+
+        assert _delete_upload(str(path)) is False
+        assert path.exists()
+        assert _delete_upload(str(path)) is True
+        assert not path.exists()
+
+
+class TestChunkedUpload:
+    @pytest.fixture(autouse=True)
+    def upload_dir(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+        return tmp_path
+
+    @staticmethod
+    def put(upload_id, offset, data, piece=7):
+        async def chunks():
+            for i in range(0, len(data), piece):
+                yield data[i : i + piece]
+
+        return asyncio.run(write_part(upload_id, offset, chunks()))
+
+    def test_out_of_order_parts_reassemble(self, upload_dir):
+        body = b"a,b\n" + b"".join(b"%d,%d\n" % (i, i) for i in range(50))
+        upload_id = create_upload("x.csv", len(body))["upload_id"]
+        self.put(upload_id, 100, body[100:])
+        state = self.put(upload_id, 0, body[:60])
+        assert state["missing"] == [[60, 100]]
+
+        self.put(upload_id, 60, body[60:100])
+        target = upload_dir / "x.csv"
+        sha256, size = complete_upload(upload_id, str(target))
+        assert target.read_bytes() == body
+        assert size == len(body) and len(sha256) == 64
+
+    def test_incomplete_upload_cannot_complete(self, upload_dir):
+        upload_id = create_upload("x.csv", 10)["upload_id"]
+        self.put(upload_id, 0, b"abc")
+        with pytest.raises(ValueError, match="missing"):
+            complete_upload(upload_id, str(upload_dir / "x.csv"))
+
+    def test_part_past_declared_size_rejected(self):
+        upload_id = create_upload("x.csv", 5)["upload_id"]
+        with pytest.raises(ValueError, match="declared size"):
+            self.put(upload_id, 3, b"abcdef", piece=1)
+        # Bytes that fit before the overflow are kept
+        assert upload_state(upload_id)["received"] == [[3, 5]]
+
+    def test_csv_head_profiled_before_completion(self):
+        body = b"id,name\n1,a\n2,b\n"
+        upload_id = create_upload("x.csv", len(body))["upload_id"]
+        state = self.put(upload_id, 0, body)
+        assert list(state["head_profile"]["columns"]) == ["id", "name"]
+
+    def test_failed_head_profile_does_not_fail_part(self, monkeypatch):
+        from app.services import chunked_upload
+
+        def replace(src, dst):
+            raise FileNotFoundError(src)  # another part renamed it first
+
+        monkeypatch.setattr(chunked_upload.os, "replace", replace)
+        body = b"id,name\n1,a\n2,b\n"
+        upload_id = create_upload("x.csv", len(body))["upload_id"]
+        state = self.put(upload_id, 0, body)
+        assert state["missing"] == [] and "head_profile" not in state
+        directory = chunked_upload._upload_dir(upload_id)
+        assert not [n for n in os.listdir(directory) if n.endswith(".tmp")]
+
+    def test_unknown_upload_id(self):
+        with pytest.raises(FileNotFoundError):
+            upload_state("../../etc")
+
+    def test_writes_happen_off_the_event_loop(self, monkeypatch):
+        import threading
+
+        from app.services import chunked_upload
+
+        monkeypatch.setattr(chunked_upload, "_WRITE_BYTES", 16)
+        threads = []
+        pwrite = os.pwrite
+
+        def recording_pwrite(fd, data, offset):
+            threads.append(threading.get_ident())
+            return pwrite(fd, data, offset)
+
+        monkeypatch.setattr(chunked_upload.os, "pwrite", recording_pwrite)
+        body = bytes(range(100))
+        upload_id = create_upload("x.bin", len(body))["upload_id"]
+        self.put(upload_id, 0, body)
+
+        assert len(threads) > 1
+        assert threading.get_ident() not in threads
+        target = os.path.join(settings.UPLOAD_DIR, "x.bin")
+        complete_upload(upload_id, target)
+        with open(target, "rb") as fh:
+            assert fh.read() == body
+
+    def test_abandoned_uploads_are_swept(self, upload_dir, monkeypatch):
+        monkeypatch.setattr(settings, "CHUNKED_UPLOAD_TTL_HOURS", 1)
+        stale = create_upload("old.csv", 1_000)["upload_id"]
+        self.put(stale, 0, b"abc")
+        old = time.time() - 2 * 3600
+        directory = upload_dir / ".uploads" / stale
+        for path in (directory, directory / "data", directory / "ranges"):
+            os.utime(path, (old, old))
+
+        fresh = create_upload("new.csv", 1_000)["upload_id"]
+        assert not directory.exists()
+        assert upload_state(fresh)["size"] == 1_000
+
+
+class TestColumnProfile:
+    def test_single_pass_matches_pandas(self):
+        s = pd.Series(["a", "bb", None, "a", "cccc"])
+        stats = profile_column(s)
+        assert stats["missing_count"] == 1
+        assert stats["unique_count"] == s.nunique()
+        assert stats["min_length"] == 1
+        assert stats["max_length"] == 4
+        assert stats["avg_length"] == pytest.approx(2.0)
+        assert stats["top_values"][0] == {"value": "a", "count": 2}
+        assert stats["sample_values"] == ["a", "bb", "a", "cccc"]
+
+    def test_numeric_moments(self):
+        s = pd.Series([1.0, 2.0, None, 100.0])
+        stats = profile_column(s)
+        assert stats["min"] == 1.0
+        assert stats["max"] == 100.0
+        assert stats["median"] == 2.0
+        assert stats["std"] == pytest.approx(s.std())
+
+    def test_all_null_column(self):
+        stats = profile_column(pd.Series([None, None], dtype=object))
+        assert stats["unique_count"] == 0
+        assert stats["max_length"] == 0
+        assert stats["suggested_type"] == "string"
+
+    def test_distinct_count_switches_to_hll(self, monkeypatch):
+        monkeypatch.setattr(settings, "PROFILE_EXACT_DISTINCT_MAX_ROWS", 1_000)
+        stats = profile_column(pd.Series(range(20_000)))
+        assert stats["unique_count_exact"] is False
+        assert abs(stats["unique_count"] - 20_000) < 1_000
+
+    def test_metadata_reuses_column_profiles(self, tmp_path, monkeypatch):
+        p = tmp_path / "s.csv"
+        pd.DataFrame({"score": [1.5, 2.5]}).to_csv(p, index=False)
+        fp = FileProcessor(str(p))
+        fp.get_file_metadata()
+        monkeypatch.setattr(
+            "app.services.file_processor.profile_column",
+            lambda s: pytest.fail("column profiled twice"),
+        )
+        assert fp.get_column_stats("score")["column_name"] == "score"
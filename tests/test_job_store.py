@@ -0,0 +1,678 @@
+import asyncio
+import itertools
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+import redis
+
+from app.core.constants import JobStatus
+from app.models.schemas import ETLJobResult
+from app.worker import job_store
+
+# ── in-memory Redis ───────────────────────────────────────────────────────────
+
+
+def _bound(value):
+    """Parse a ZRANGEBYSCORE bound: -inf/+inf, a number, or "(x" (exclusive)."""
+    if value in ("-inf", "+inf"):
+        return float(value), False
+    if isinstance(value, str) and value.startswith("("):
+        return float(value[1:]), True
+    return float(value), False
+
+
+def _stream_id(entry_id: str):
+    ms, _, seq = entry_id.partition("-")
+    return int(ms), int(seq or 0)
+
+
+class FakeRedis:
+    """
+    Just enough of redis.Redis (decode_responses=True) for job_store:
+    strings, hashes, sorted sets, streams, pipelines and WATCH. Keys never
+    expire.
+    """
+
+    def __init__(self):
+        self.strings = {}
+        self.hashes = {}
+        self.zsets = {}
+        self.streams = {}
+        self._writes = {}
+        self._ids = itertools.count(1)
+
+    def _touch(self, key):
+        self._writes[key] = self._writes.get(key, 0) + 1
+
+    # strings
+    def get(self, key):
+        return self.strings.get(key)
+
+    def mget(self, keys):
+        return [self.strings.get(k) for k in keys]
+
+    def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.strings:
+            return None
+        self.strings[key] = str(value)
+        self._touch(key)
+        return True
+
+    def incr(self, key):
+        self.strings[key] = str(int(self.strings.get(key, 0)) + 1)
+        self._touch(key)
+        return int(self.strings[key])
+
+    def expire(self, key, seconds):
+        return True
+
+    def exists(self, *keys):
+        spaces = (self.strings, self.hashes, self.zsets, self.streams)
+        return sum(any(k in space for space in spaces) for k in keys)
+
+    def delete(self, *keys):
+        removed = 0
+        for key in keys:
+            for space in (self.strings, self.hashes, self.zsets, self.streams):
+                if space.pop(key, None) is not None:
+                    removed += 1
+                    self._touch(key)
+        return removed
+
+    # hashes
+    def hincrby(self, key, field, amount=1):
+        h = self.hashes.setdefault(key, {})
+        h[field] = str(int(h.get(field, 0)) + amount)
+        self._touch(key)
+        return int(h[field])
+
+    def hmget(self, key, *fields):
+        h = self.hashes.get(key, {})
+        return [h.get(f) for f in fields]
+
+    # sorted sets
+    def zadd(self, key, mapping, nx=False):
+        z = self.zsets.setdefault(key, {})
+        added = 0
+        for member, score in mapping.items():
+            if nx and member in z:
+                continue
+            added += member not in z
+            z[member] = float(score)
+        self._touch(key)
+        return added
+
+    def zrem(self, key, *members):
+        z = self.zsets.get(key, {})
+        removed = sum(z.pop(m, None) is not None for m in members)
+        if not z:
+            self.zsets.pop(key, None)
+        return removed
+
+    def zremrangebyscore(self, key, low, high):
+        z = self.zsets.get(key, {})
+        lo, _ = _bound(low)
+        hi, _ = _bound(high)
+        doomed = [m for m, s in z.items() if lo <= s <= hi]
+        return self.zrem(key, *doomed) if doomed else 0
+
+    def zcard(self, key):
+        return len(self.zsets.get(key, {}))
+
+    def zrevrangebyscore(self, key, high, low, start=None, num=None, withscores=False):
+        hi, hi_open = _bound(high)
+        lo, lo_open = _bound(low)
+        entries = sorted(
+            (
+                (m, s)
+                for m, s in self.zsets.get(key, {}).items()
+                if (s < hi if hi_open else s <= hi) and (s > lo if lo_open else s >= lo)
+            ),
+            key=lambda e: (e[1], e[0]),
+            reverse=True,
+        )
+        if start is not None:
+            entries = entries[start : start + num]
+        return entries if withscores else [m for m, _ in entries]
+
+    # streams
+    def xadd(self, key, fields, maxlen=None, approximate=True):
+        entry_id = f"{next(self._ids)}-0"
+        stream = self.streams.setdefault(key, [])
+        stream.append((entry_id, dict(fields)))
+        if maxlen is not None:
+            del stream[:-maxlen]
+        self._touch(key)
+        return entry_id
+
+    def xrevrange(self, key, max="+", min="-", count=None):
+        entries = list(reversed(self.streams.get(key, [])))
+        return entries[:count] if count else entries
+
+    def xread(self, streams, count=None, block=None):
+        reply = []
+        for key, last_id in streams.items():
+            after = _stream_id(last_id)
+            entries = [
+                e for e in self.streams.get(key, []) if _stream_id(e[0]) > after
+            ][:count]
+            if entries:
+                reply.append([key, entries])
+        return reply
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    """Queues commands until execute(); runs them at once while WATCHing."""
+
+    def __init__(self, redis_):
+        self._redis = redis_
+        self._commands = []
+        self._watched = None
+        self._immediate = False
+
+    def watch(self, *keys):
+        self._watched = {k: self._redis._writes.get(k, 0) for k in keys}
+        self._immediate = True
+
+    def multi(self):
+        self._immediate = False
+
+    def execute(self):
+        commands, self._commands = self._commands, []
+        if self._watched is not None:
+            watched, self._watched = self._watched, None
+            if any(self._redis._writes.get(k, 0) != v for k, v in watched.items()):
+                raise redis.WatchError("Watched variable changed.")
+        return [getattr(self._redis, name)(*a, **kw) for name, a, kw in commands]
+
+    def __getattr__(self, name):
+        command = getattr(self._redis, name)
+
+        def call(*args, **kwargs):
+            if self._immediate:
+                return command(*args, **kwargs)
+            self._commands.append((name, args, kwargs))
+            return self
+
+        return call
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._commands, self._watched = [], None
+
+
+class FakeAsyncRedis:
+    """redis.asyncio face over a FakeRedis. XREAD BLOCK polls for entries."""
+
+    def __init__(self, sync: FakeRedis):
+        self.sync = sync
+        self.blocking_reads = []
+
+    def __getattr__(self, name):
+        command = getattr(self.sync, name)
+
+        async def call(*args, **kwargs):
+            return command(*args, **kwargs)
+
+        return call
+
+    async def xread(self, streams, count=None, block=None):
+        if block is None:
+            return self.sync.xread(streams, count)
+        self.blocking_reads.append(sorted(streams))
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + block / 1000
+        while not (reply := self.sync.xread(streams, count)):
+            if loop.time() >= deadline:
+                break
+            await asyncio.sleep(0.005)
+        return reply
+
+    def pipeline(self, transaction=True):
+        return FakeAsyncPipeline(self.sync.pipeline(transaction))
+
+    async def aclose(self):
+        pass
+
+
+class FakeAsyncPipeline:
+    def __init__(self, pipe: FakePipeline):
+        self._pipe = pipe
+
+    def __getattr__(self, name):
+        return getattr(self._pipe, name)
+
+    async def execute(self):
+        return self._pipe.execute()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    fake = FakeRedis()
+    fake.aio = FakeAsyncRedis(fake)
+    monkeypatch.setattr(job_store, "_client", lambda: fake)
+    monkeypatch.setattr(job_store, "_async_client", lambda: fake.aio)
+    return fake
+
+
+def _result(job_id: str, message: str = "queued", success: bool = False):
+    return ETLJobResult(
+        job_id=job_id,
+        success=success,
+        message=message,
+        total_rows=0,
+        processed_rows=0,
+        failed_rows=0,
+    )
+
+
+# ── idempotent claims ─────────────────────────────────────────────────────────
+
+
+class TestClaimJob:
+    def test_first_caller_creates_the_job(self, fake_redis):
+        owner, record = job_store.claim_job("h1", "job-a")
+        assert owner == "job-a" and record.message == "queued"
+        assert job_store.get_job("job-a").message == "queued"
+        assert "job-a" in fake_redis.zsets[job_store._status_key(JobStatus.QUEUED)]
+
+    def test_losing_caller_gets_the_owners_record(self, fake_redis):
+        job_store.claim_job("h1", "job-a")
+        job_store.save_job(_result("job-a", "running"))
+
+        owner, record = job_store.claim_job("h1", "job-b")
+        assert owner == "job-a"
+        assert record.message == "running"
+        assert job_store.get_job("job-b") is None
+
+    def test_expired_owner_is_taken_over(self, fake_redis):
+        job_store.claim_job("h1", "job-a")
+        fake_redis.delete("job:job-a")  # record expired, idempotency key didn't
+
+        owner, record = job_store.claim_job("h1", "job-b")
+        assert owner == "job-b" and record.job_id == "job-b"
+        assert fake_redis.get("job:idem:h1") == "job-b"
+        assert job_store.get_job("job-b").message == "queued"
+
+    def test_concurrent_takeover_has_one_winner(self, fake_redis, monkeypatch):
+        job_store.claim_job("h1", "job-a")
+        fake_redis.delete("job:job-a")
+
+        # Another API process takes the key over between our WATCH and MULTI
+        exists = fake_redis.exists
+
+        def exists_then_race(*keys):
+            monkeypatch.setattr(fake_redis, "exists", exists)
+            job_store.claim_job("h1", "job-c")
+            return exists(*keys)
+
+        monkeypatch.setattr(fake_redis, "exists", exists_then_race)
+
+        owner, record = job_store.claim_job("h1", "job-b")
+        assert owner == "job-c" and record.job_id == "job-c"
+        assert fake_redis.get("job:idem:h1") == "job-c"
+        assert job_store.get_job("job-b") is None
+
+
+# ── listing ───────────────────────────────────────────────────────────────────
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Freeze job_store's clocks; set clock.now to move them."""
+    clock = SimpleNamespace(now=1_000.0)
+    monkeypatch.setattr(
+        job_store,
+        "time",
+        SimpleNamespace(time=lambda: clock.now, monotonic=lambda: clock.now),
+    )
+    return clock
+
+
+def _pages(limit, status=None):
+    jobs, cursor = [], None
+    while True:
+        page, cursor, total = job_store.list_jobs(limit, cursor, status)
+        jobs += [j.job_id for j in page]
+        if cursor is None:
+            return jobs, total
+
+
+class TestListJobs:
+    def test_pages_through_tied_timestamps(self, fake_redis, clock):
+        # Seven jobs in the same instant, then three later ones
+        for i in range(7):
+            job_store.save_job(_result(f"job-{i}"))
+        clock.now += 1
+        for i in range(7, 10):
+            job_store.save_job(_result(f"job-{i}"))
+
+        for limit in (1, 2, 3, 4, 50):
+            jobs, total = _pages(limit)
+            assert total == 10
+            assert sorted(jobs) == sorted(f"job-{i}" for i in range(10))
+            assert len(jobs) == 10
+            # Newest first
+            assert set(jobs[:3]) == {"job-7", "job-8", "job-9"}
+
+    def test_filters_by_status(self, fake_redis, clock):
+        for i in range(5):
+            job_store.save_job(_result(f"job-{i}"))
+        for i in (1, 3):
+            clock.now += 1
+            job_store.save_job(_result(f"job-{i}", "done", success=True))
+
+        jobs, total = _pages(1, JobStatus.SUCCESS)
+        assert jobs == ["job-3", "job-1"] and total == 2
+        jobs, total = _pages(2, JobStatus.QUEUED)
+        assert sorted(jobs) == ["job-0", "job-2", "job-4"] and total == 3
+
+    def test_prunes_expired_jobs_from_every_index(self, fake_redis, clock):
+        for i in range(4):
+            job_store.save_job(_result(f"job-{i}"))
+        fake_redis.delete("job:job-1", "job:job-2")
+
+        jobs, _ = _pages(10)
+        assert sorted(jobs) == ["job-0", "job-3"]
+        for key in (job_store._INDEX_KEY, job_store._status_key(JobStatus.QUEUED)):
+            assert set(fake_redis.zsets[key]) == {"job-0", "job-3"}
+
+    def test_rejects_a_malformed_cursor(self, fake_redis):
+        with pytest.raises(ValueError, match="cursor"):
+            job_store.list_jobs(cursor="yesterday:job-1")
+
+
+# ── progress events ───────────────────────────────────────────────────────────
+
+
+def _stream(fake, job_id):
+    return [
+        (e["stage"], e["message"])
+        for e in job_store._decode_entries(
+            fake.streams.get(job_store._events_key(job_id), [])
+        )
+    ]
+
+
+def _event(job_id, stage, message):
+    return {"job_id": job_id, "stage": stage, "progress": 0, "message": message}
+
+
+class TestProgressEmitter:
+    def test_coalesces_bursts_within_a_stage(self, fake_redis, clock):
+        emitter = job_store.ProgressEmitter(max_rate=2)
+        sent = [
+            emitter.emit("j", _event("j", "transform", f"step {i}")) for i in range(5)
+        ]
+        assert sent == [True, False, False, False, False]
+        clock.now += 0.5
+        assert emitter.emit("j", _event("j", "transform", "step 5"))
+        assert _stream(fake_redis, "j") == [
+            ("transform", "step 0"),
+            ("transform", "step 5"),
+        ]
+
+    def test_last_event_of_each_stage_is_delivered(self, fake_redis, clock):
+        emitter = job_store.ProgressEmitter(max_rate=2)
+        emitter.emit("j", _event("j", "transform", "rows 0"))
+        emitter.emit("j", _event("j", "transform", "rows 500"))
+        emitter.emit("j", _event("j", "transform", "rows 1000"))
+        emitter.emit("j", _event("j", "load", "loading"))
+        emitter.emit("j", _event("j", "load", "batch 1"))
+        emitter.emit("j", _event("j", "done", "finished"), result=_result("j", "ok"))
+
+        assert _stream(fake_redis, "j") == [
+            ("transform", "rows 0"),
+            ("transform", "rows 1000"),
+            ("load", "loading"),
+            ("load", "batch 1"),
+            ("done", "finished"),
+        ]
+        assert job_store.get_job("j").message == "ok"
+        assert "j" not in emitter._jobs
+
+    def test_flush_publishes_held_event_and_forgets_job(self, fake_redis, clock):
+        emitter = job_store.ProgressEmitter(max_rate=2)
+        emitter.emit("j", _event("j", "load", "partition 1"))
+        emitter.emit("j", _event("j", "load", "partition 2"))
+        emitter.flush("j")
+        assert _stream(fake_redis, "j")[-1] == ("load", "partition 2")
+        assert "j" not in emitter._jobs
+
+    def test_idle_jobs_are_dropped(self, fake_redis, clock):
+        emitter = job_store.ProgressEmitter(max_rate=2)
+        emitter.emit("a", _event("a", "load", "partition 1"))
+        emitter.emit("a", _event("a", "load", "partition 2"))  # held back
+
+        clock.now += emitter.IDLE_AFTER
+        emitter.emit("b", _event("b", "extract", "reading"))
+        assert set(emitter._jobs) == {"b"}
+        assert _stream(fake_redis, "a")[-1] == ("load", "partition 2")
+
+    def test_concurrent_jobs_share_one_emitter(self, fake_redis, clock, monkeypatch):
+        emitter = job_store.ProgressEmitter(max_rate=2)
+        monkeypatch.setattr(emitter, "IDLE_AFTER", 0.0)  # sweep on every emit
+
+        def run(n):
+            for i in range(1000):
+                job_id = f"{n}-{i % 20}"
+                emitter.emit(job_id, _event(job_id, "load", f"batch {i}"))
+                if i % 3 == 0:
+                    emitter.flush(job_id)
+
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)  # switch threads often to expose races
+        try:
+            with ThreadPoolExecutor(8) as pool:
+                list(pool.map(run, range(8)))  # re-raises any worker error
+        finally:
+            sys.setswitchinterval(interval)
+        assert all(_stream(fake_redis, f"{n}-0") for n in range(8))
+
+
+# ── progress streaming ────────────────────────────────────────────────────────
+
+
+@pytest.fixture
+async def hub(monkeypatch):
+    monkeypatch.setattr(job_store.StreamHub, "BLOCK_MS", 20)
+    monkeypatch.setattr(job_store.ProgressStream, "BLOCK_MS", 50)
+    yield job_store.stream_hub
+    await job_store.stream_hub.close()
+
+
+def _append(fake, job_id, stage, message=""):
+    with fake.pipeline() as pipe:
+        job_store._publish(pipe, job_id, _event(job_id, stage, message))
+        pipe.execute()
+    return fake.streams[job_store._events_key(job_id)][-1][0]
+
+
+async def _collect(job_id, last_event_id=None):
+    from app.api.v1.endpoints.etl import _progress_events
+
+    return [
+        event if event is None else event.get("stage")
+        async for event in _progress_events(job_id, last_event_id)
+    ]
+
+
+class TestProgressEvents:
+    async def test_replays_backlog_then_result(self, fake_redis, hub):
+        job_store.save_job(_result("j", "running"))
+        for stage in ("extract", "transform", "load", "done"):
+            _append(fake_redis, "j", stage)
+        job_store.save_job(_result("j", "ok", success=True))
+
+        assert await _collect("j") == ["extract", "transform", "load", "done", "done"]
+
+    async def test_resumes_after_last_event_id(self, fake_redis, hub):
+        job_store.save_job(_result("j", "running"))
+        _append(fake_redis, "j", "extract")
+        seen = _append(fake_redis, "j", "transform")
+        _append(fake_redis, "j", "failed")
+        job_store.save_job(_result("j", "boom"))
+
+        assert await _collect("j", seen) == ["failed", "failed"]
+
+    async def test_follows_live_events_until_done(self, fake_redis, hub):
+        job_store.save_job(_result("j", "running"))
+        _append(fake_redis, "j", "extract")
+
+        async def worker():
+            await asyncio.sleep(0.03)
+            _append(fake_redis, "j", "load")
+            await asyncio.sleep(0.03)
+            _append(fake_redis, "j", "done")
+            job_store.save_job(_result("j", "ok", success=True))
+
+        task = asyncio.create_task(worker())
+        stages = await asyncio.wait_for(_collect("j"), 5)
+        await task
+        assert [s for s in stages if s is not None] == [
+            "extract",
+            "load",
+            "done",
+            "done",
+        ]
+
+    async def test_keepalive_while_idle(self, fake_redis, hub):
+        from app.api.v1.endpoints.etl import _progress_events
+
+        job_store.save_job(_result("j", "running"))
+        events = _progress_events("j", None)
+        try:
+            assert await asyncio.wait_for(events.__anext__(), 5) is None
+        finally:
+            await events.aclose()
+
+    async def test_stops_when_stream_expired_after_finish(self, fake_redis, hub):
+        job_store.save_job(_result("j", "ok", success=True))
+        assert await _collect("j") == ["done"]
+
+    async def test_stops_for_unknown_job(self, fake_redis, hub):
+        assert await _collect("missing") == []
+
+
+class TestStreamHub:
+    async def test_one_reader_serves_every_subscriber(self, fake_redis, hub):
+        for job_id in ("a", "b"):
+            job_store.save_job(_result(job_id, "running"))
+        streams = [job_store.ProgressStream(j) for j in ("a", "a", "b")]
+        for stream in streams:
+            assert await stream.read() == []
+
+        _append(fake_redis, "a", "load", "a1")
+        _append(fake_redis, "b", "load", "b1")
+        got = [await stream.read(block_ms=1_000) for stream in streams]
+        assert [[e["message"] for e in events] for events in got] == [
+            ["a1"],
+            ["a1"],
+            ["b1"],
+        ]
+        # Blocking reads come from the hub alone, over both streams at once
+        assert fake_redis.aio.blocking_reads
+        assert all(
+            keys == [job_store._events_key("a"), job_store._events_key("b")]
+            for keys in fake_redis.aio.blocking_reads
+        )
+
+        for stream in streams:
+            await stream.aclose()
+        assert not hub._queues and not hub._positions
+
+    async def test_catches_up_after_falling_behind(self, fake_redis, hub, monkeypatch):
+        monkeypatch.setattr(job_store.StreamHub, "QUEUE_SIZE", 2)
+        stream = job_store.ProgressStream("j")
+        assert await stream.read() == []
+        for i in range(6):
+            _append(fake_redis, "j", "load", str(i))
+            await asyncio.sleep(0.03)  # one hub read, one queue entry each
+
+        events = await stream.read(block_ms=100)
+        assert [e["message"] for e in events] == [str(i) for i in range(6)]
+        await stream.aclose()
+
+
+# ── status endpoint ───────────────────────────────────────────────────────────
+
+
+@pytest.fixture
+async def api(fake_redis, hub):
+    import httpx
+    from fastapi import FastAPI
+
+    from app.api.v1.endpoints import etl
+
+    app = FastAPI()
+    app.include_router(etl.router, prefix="/v1/etl")
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://t") as c:
+        yield c
+
+
+class TestJobStatusEndpoint:
+    async def test_etag_and_not_modified(self, api, fake_redis):
+        job_store.save_job(_result("j", "running"))
+        first = await api.get("/v1/etl/status/j")
+        assert first.status_code == 202
+        etag = first.headers["etag"]
+
+        same = await api.get("/v1/etl/status/j", headers={"If-None-Match": etag})
+        assert same.status_code == 304 and same.headers["etag"] == etag
+        assert same.content == b""
+
+        job_store.save_job(_result("j", "ok", success=True))
+        changed = await api.get("/v1/etl/status/j", headers={"If-None-Match": etag})
+        assert changed.status_code == 200
+        assert changed.headers["etag"] != etag
+        assert changed.json()["message"] == "ok"
+
+    async def test_wait_returns_when_the_job_changes(self, api, fake_redis):
+        job_store.save_job(_result("j", "running"))
+        etag = (await api.get("/v1/etl/status/j")).headers["etag"]
+
+        async def worker():
+            await asyncio.sleep(0.1)
+            _append(fake_redis, "j", "done")
+            job_store.save_job(_result("j", "ok", success=True))
+
+        task = asyncio.create_task(worker())
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        response = await api.get(
+            "/v1/etl/status/j", params={"wait": 10}, headers={"If-None-Match": etag}
+        )
+        await task
+        assert response.status_code == 200
+        assert response.json()["message"] == "ok"
+        assert loop.time() - started < 5
+
+    async def test_wait_times_out_with_not_modified(self, api, fake_redis):
+        job_store.save_job(_result("j", "running"))
+        etag = (await api.get("/v1/etl/status/j")).headers["etag"]
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        response = await api.get(
+            "/v1/etl/status/j", params={"wait": 0.2}, headers={"If-None-Match": etag}
+        )
+        assert response.status_code == 304
+        assert loop.time() - started >= 0.2
+
+    async def test_unknown_job_is_404(self, api):
+        response = await api.get("/v1/etl/status/missing")
+        assert response.status_code == 404
@@ -26,6 +26,7 @@ from app.services.db_reader import (
     read_from_db,
 )
 from app.services.etl_runner import run_etl_job
+from app.services.partitioner import plan_partitions, read_partition
 
 # ── fixtures ──────────────────────────────────────────────────────────────────
 
@@ -108,6 +109,22 @@ class TestDatabaseSourceSchema:
         )
         assert src.columns == ["order_id", "customer"]
 
+    def test_partition_column_must_be_selected(self, source_db):
+        with pytest.raises(Exception, match="partition_column"):
+            DatabaseSource(
+                connection=_src_conn(source_db),
+                table_name="orders",
+                columns=["customer", "amount"],
+                partition_column="order_id",
+            )
+        src = DatabaseSource(
+            connection=_src_conn(source_db),
+            table_name="orders",
+            columns=["order_id", "amount"],
+            partition_column="order_id",
+        )
+        assert src.partition_column == "order_id"
+
 
 # ── read_from_db ──────────────────────────────────────────────────────────────
 
@@ -390,6 +407,161 @@ class TestDBMigrationRequest:
         assert req.batch_size == 10_000
 
 
+# ── partitioned execution ─────────────────────────────────────────────────────
+
+
+class TestPartitioner:
+    def _file_request(self, file_id, partitions):
+        return ETLJobRequest(
+            file_id=file_id,
+            column_mappings=[],
+            partitions=partitions,
+            db_destination=DatabaseDestination(
+                connection=_dst_conn(":memory:"), table_name="out"
+            ),
+        )
+
+    def test_csv_partitions_cover_every_row(self, tmp_path, monkeypatch):
+        from app.core.config import settings
+
+        monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+        df = pd.DataFrame({"id": range(1000), "name": [f"n{i}" for i in range(1000)]})
+        df.to_csv(tmp_path / "big.csv", index=False)
+
+        request = self._file_request("big.csv", 4)
+        partitions = plan_partitions(request)
+        assert len(partitions) == 4
+
+        parts = [read_partition(request, p)[0] for p in partitions]
+        assert all(list(p.columns) == ["id", "name"] for p in parts)
+        assert pd.concat(parts)["id"].tolist() == list(range(1000))
+
+    def test_parquet_partitions_by_row_group(self, tmp_path, monkeypatch):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        from app.core.config import settings
+
+        monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+        table = pa.table({"id": list(range(100))})
+        pq.write_table(table, tmp_path / "big.parquet", row_group_size=10)
+
+        request = self._file_request("big.parquet", 3)
+        partitions = plan_partitions(request)
+        assert len(partitions) == 3
+
+        ids = sorted(i for p in partitions for i in read_partition(request, p)[0]["id"])
+        assert ids == list(range(100))
+
+    def test_db_key_ranges(self, source_db, dest_db):
+        request = ETLJobRequest(
+            db_source=DatabaseSource(
+                connection=_src_conn(source_db),
+                table_name="orders",
+                partition_column="order_id",
+            ),
+            column_mappings=[],
+            partitions=2,
+            db_destination=DatabaseDestination(
+                connection=_dst_conn(dest_db), table_name="out"
+            ),
+        )
+        partitions = plan_partitions(request)
+        assert [p["kind"] for p in partitions] == ["db_key_range"] * 2
+
+        ids = []
+        for p in partitions:
+            df, mappings = read_partition(request, p)
+            assert mappings
+            ids.extend(df["order_id"].tolist())
+        assert sorted(ids) == [1, 2, 3, 4, 5]
+
+    def test_csv_partitions_share_dtypes(self, tmp_path, monkeypatch):
+        from app.core.config import settings
+
+        monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+        rows = [f"{i},n{i}" for i in range(1000)]
+        rows[900] = ",n900"  # a blank only the last slice sees
+        (tmp_path / "big.csv").write_text("id,name\n" + "\n".join(rows) + "\n")
+
+        request = self._file_request("big.csv", 4)
+        parts = [read_partition(request, p)[0] for p in plan_partitions(request)]
+        assert len({tuple(map(str, p.dtypes)) for p in parts}) == 1
+        assert pd.concat(parts)["id"].isnull().sum() == 1
+
+    def test_csv_with_multiline_fields_is_whole(self, tmp_path, monkeypatch):
+        from app.core.config import settings
+
+        monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+        rows = [f'{i},"line one\nline ""two"""' for i in range(200)]
+        (tmp_path / "notes.csv").write_text("id,note\n" + "\n".join(rows) + "\n")
+
+        request = self._file_request("notes.csv", 4)
+        partitions = plan_partitions(request)
+        assert partitions == [{"index": 0, "count": 1, "kind": "whole"}]
+        assert len(read_partition(request, partitions[0])[0]) == 200
+
+    def test_db_key_ranges_keep_null_and_large_keys(self, tmp_path, dest_db):
+        db_path = str(tmp_path / "keys.db")
+        conn = sqlite3.connect(db_path)
+        conn.execute("CREATE TABLE t (k INTEGER, v TEXT)")
+        big = 2**62 + 1  # rounds down to 2**62 as a float
+        conn.executemany(
+            "INSERT INTO t VALUES (?, ?)",
+            [(1, "a"), (None, "b"), (2**61, "c"), (None, "d"), (big, "e")],
+        )
+        conn.commit()
+        conn.close()
+
+        request = ETLJobRequest(
+            db_source=DatabaseSource(
+                connection=_src_conn(db_path), table_name="t", partition_column="k"
+            ),
+            column_mappings=[],
+            partitions=3,
+            db_destination=DatabaseDestination(
+                connection=_dst_conn(dest_db), table_name="out"
+            ),
+        )
+        partitions = plan_partitions(request)
+        assert partitions[-1]["upper"] == big
+
+        values = []
+        for p in partitions:
+            values.extend(read_partition(request, p)[0]["v"].tolist())
+        assert sorted(values) == ["a", "b", "c", "d", "e"]
+
+    def test_unsplittable_source_is_whole(self, source_db, dest_db):
+        request = ETLJobRequest(
+            db_source=DatabaseSource(
+                connection=_src_conn(source_db), table_name="orders"
+            ),
+            column_mappings=[],
+            partitions=4,
+            db_destination=DatabaseDestination(
+                connection=_dst_conn(dest_db), table_name="out"
+            ),
+        )
+        assert plan_partitions(request) == [{"index": 0, "count": 1, "kind": "whole"}]
+
+    def test_aggregations_rejected(self, source_db, dest_db):
+        with pytest.raises(Exception, match="partitions"):
+            ETLJobRequest(
+                db_source=DatabaseSource(
+                    connection=_src_conn(source_db), table_name="orders"
+                ),
+                column_mappings=[],
+                partitions=2,
+                aggregations={
+                    "group_by": ["status"],
+                    "aggregations": [{"column": "amount", "function": "sum"}],
+                },
+                db_destination=DatabaseDestination(
+                    connection=_dst_conn(dest_db), table_name="out"
+                ),
+            )
+
+
 # ── Migration API endpoints ───────────────────────────────────────────────────
 
 
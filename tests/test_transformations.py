@@ -47,6 +47,29 @@ class TestSchemaMapper:
         )
         assert result["price"].dropna().tolist() == [1000, 2500]
 
+    def test_float_mostly_clean_column_patches_dirty_rows(self):
+        values = [str(i) for i in range(1_500)] + ["$1,250.5", "n/a", None]
+        df = pd.DataFrame({"v": values})
+        result = SchemaMapper(df).apply_column_mapping([_mapping("v", DataType.FLOAT)])
+        assert result["v"][10] == 10.0
+        assert result["v"][1_500] == 1250.5
+        assert pd.isna(result["v"][1_501])
+        assert pd.isna(result["v"][1_502])
+
+    def test_float_comma_decimal_separator(self):
+        df = pd.DataFrame({"v": ["1.234,5", "€ 2,75", "3"]})
+        result = SchemaMapper(df).apply_column_mapping(
+            [_mapping("v", DataType.FLOAT, decimal_separator=",")]
+        )
+        assert result["v"].tolist() == [1234.5, 2.75, 3.0]
+
+    @pytest.mark.parametrize("dtype", [DataType.FLOAT, DataType.INTEGER])
+    def test_bools_in_text_column_stay_unparsed(self, dtype):
+        df = pd.DataFrame({"v": pd.Series([True, False, "3", None], dtype=object)})
+        result = SchemaMapper(df).apply_column_mapping([_mapping("v", dtype)])
+        assert result["v"].isnull().tolist() == [True, True, False, True]
+        assert result["v"][2] == 3
+
     def test_float_cast(self):
         df = pd.DataFrame({"v": ["3.14", "2.71"]})
         result = SchemaMapper(df).apply_column_mapping([_mapping("v", DataType.FLOAT)])
@@ -135,6 +158,30 @@ class TestSchemaMapper:
         mapper.apply_column_mapping([_mapping("nonexistent", DataType.INTEGER)])
         assert len(mapper.transformation_errors) == 1
 
+    def test_parallel_matches_sequential(self):
+        df = pd.DataFrame(
+            {
+                "n": ["1", "2", None],
+                "f": ["$1.5", "2", "x"],
+                "d": ["2024-01-15", "bad", None],
+                "s": ["abc", "defgh", None],
+            }
+        )
+        mappings = [
+            _mapping("n", DataType.INTEGER, rename_to="num"),
+            _mapping("f", DataType.FLOAT),
+            _mapping("d", DataType.DATE),
+            _mapping("s", DataType.STRING, max_length=2),
+            _mapping("ghost", DataType.STRING),
+        ]
+        seq = SchemaMapper(df, max_workers=1)
+        par = SchemaMapper(df, max_workers=4)
+        pd.testing.assert_frame_equal(
+            seq.apply_column_mapping(mappings), par.apply_column_mapping(mappings)
+        )
+        assert par.transformation_errors == seq.transformation_errors
+        assert [e["column"] for e in par.transformation_errors] == ["ghost"]
+
 
 # ── RowFilter ─────────────────────────────────────────────────────────────────
 
@@ -200,6 +247,24 @@ class TestRowFilter:
         )
         assert len(df) == 2  # Alice, Charlie
 
+    def test_not_contains(self):
+        df, _ = RowFilter().apply(
+            self._df(),
+            [
+                FilterRule(
+                    column="name", operator=FilterOperator.NOT_CONTAINS, value="li"
+                )
+            ],
+        )
+        assert len(df) == 2  # None, Dave
+
+    def test_contains_is_regex(self):
+        df, _ = RowFilter().apply(
+            self._df(),
+            [FilterRule(column="name", operator=FilterOperator.CONTAINS, value="^D")],
+        )
+        assert df["name"].tolist() == ["Dave"]
+
     def test_filtered_out_df_is_complement(self):
         source = self._df()
         kept, dropped = RowFilter().apply(
@@ -225,6 +290,26 @@ class TestRowFilter:
         )
         assert len(kept) == len(df)
 
+    def test_plan_groups_rules_by_column(self):
+        row_filter = RowFilter()
+        kept, _ = row_filter.apply(
+            self._df(),
+            [
+                FilterRule(
+                    column="score", operator=FilterOperator.GREATER_THAN, value=60
+                ),
+                FilterRule(column="name", operator=FilterOperator.IS_NOT_NULL),
+                FilterRule(column="score", operator=FilterOperator.LESS_THAN, value=85),
+                FilterRule(column="nope", operator=FilterOperator.IS_NULL),
+            ],
+        )
+        assert kept["name"].tolist() == ["Dave"]
+        plan = row_filter.plan.describe()
+        score = plan["columns"][0]
+        assert score["column"] == "score"
+        assert [r["position"] for r in score["rules"]] == [0, 2]
+        assert plan["skipped_columns"] == ["nope"]
+
 
 # ── Aggregator ────────────────────────────────────────────────────────────────
 
@@ -276,6 +361,152 @@ class TestAggregator:
         assert "dept" in result.columns
         assert "total" in result.columns
 
+    def _rule(self):
+        return AggregationRule(
+            group_by=["dept"],
+            aggregations=[
+                {"column": "salary", "function": "sum", "alias": "total"},
+                {"column": "salary", "function": "avg", "alias": "avg_salary"},
+                {"column": "salary", "function": "min", "alias": "lo"},
+                {"column": "salary", "function": "max", "alias": "hi"},
+                {"column": "id", "function": "count", "alias": "n"},
+                {"column": "salary", "function": "count_distinct", "alias": "uniq"},
+            ],
+        )
+
+    def test_same_column_several_functions(self):
+        result = Aggregator().apply(self._df(), self._rule()).set_index("dept")
+        assert result.loc["eng", "total"] == 220
+        assert result.loc["eng", "avg_salary"] == 110.0
+        assert result.loc["sales", "lo"] == 80
+        assert result.loc["sales", "hi"] == 90
+        assert result.loc["sales", "n"] == 2
+        assert result.loc["eng", "uniq"] == 2
+
+    def test_chunks_match_single_pass(self):
+        df = pd.concat([self._df()] * 3, ignore_index=True)
+        df.loc[len(df)] = ["eng", 500, 99]
+        chunks = [df.iloc[i : i + 5] for i in range(0, len(df), 5)]
+
+        whole = Aggregator().apply(df, self._rule())
+        chunked = Aggregator().apply_chunks(chunks, self._rule())
+        pd.testing.assert_frame_equal(chunked, whole)
+        assert whole.set_index("dept").loc["eng", "uniq"] == 3
+
+    def test_combine_partials_from_workers(self):
+        agg, rule = Aggregator(), self._rule()
+        df = self._df()
+        partials = [agg.partial(df.iloc[:3], rule), agg.partial(df.iloc[3:], rule)]
+        result = agg.finalize(agg.combine(partials, rule), rule).set_index("dept")
+        assert result.loc["sales", "avg_salary"] == 85.0
+        assert result.loc["sales", "uniq"] == 2
+
+    def test_approximate_functions(self):
+        df = pd.DataFrame(
+            {
+                "dept": ["eng", "sales"] * 5000,
+                "user": [i % 1500 for i in range(10_000)],
+                "latency": [float(i % 1000) for i in range(10_000)],
+            }
+        )
+        rule = AggregationRule(
+            group_by=["dept"],
+            aggregations=[
+                {"column": "user", "function": "approx_count_distinct", "alias": "u"},
+                {
+                    "column": "latency",
+                    "function": "approx_percentile",
+                    "percentile": 0.9,
+                    "alias": "p90",
+                },
+            ],
+        )
+        chunks = [df.iloc[i : i + 999] for i in range(0, len(df), 999)]
+        for result in (
+            Aggregator().apply(df, rule),
+            Aggregator().apply_chunks(chunks, rule),
+        ):
+            eng = result.set_index("dept").loc["eng"]
+            assert abs(eng["u"] - 750) <= 750 * 0.05
+            assert abs(eng["p90"] - 899) <= 10
+
+    @pytest.mark.parametrize("percentile", ["95", 95, -0.5])
+    def test_percentile_out_of_range_rejected(self, percentile):
+        with pytest.raises(Exception, match="percentile"):
+            AggregationRule(
+                group_by=["dept"],
+                aggregations=[
+                    {
+                        "column": "salary",
+                        "function": "approx_percentile",
+                        "percentile": percentile,
+                    }
+                ],
+            )
+
+    def test_percentile_accepts_number_or_string(self):
+        rule = AggregationRule(
+            group_by=["dept"],
+            aggregations=[
+                {"column": "a", "function": "approx_percentile", "percentile": 0.95},
+                {"column": "b", "function": "approx_percentile", "percentile": "0.5"},
+            ],
+        )
+        assert rule.aggregations[0]["percentile"] == 0.95
+
+    def _wide(self):
+        rows = 80_000
+        return pd.DataFrame(
+            {
+                "key": [f"k{i % 60_000}" for i in range(rows)],
+                "value": [float(i % 97) for i in range(rows)],
+            }
+        )
+
+    def test_spills_above_memory_budget(self, tmp_path, monkeypatch):
+        from app.core.config import settings
+
+        monkeypatch.setattr(settings, "SPILL_DIR", str(tmp_path))
+        df = self._wide()
+        for func in ("sum", "median"):
+            rule = AggregationRule(
+                group_by=["key"],
+                aggregations=[{"column": "value", "function": func, "alias": "v"}],
+            )
+            agg = Aggregator(memory_budget_mb=1, spill_buckets=4)
+            result = agg.apply(df, rule)
+            assert agg.spilled
+            pd.testing.assert_frame_equal(result, Aggregator().apply(df, rule))
+        assert list(tmp_path.iterdir()) == []
+
+    def test_chunked_state_spills(self, tmp_path, monkeypatch):
+        from app.core.config import settings
+
+        monkeypatch.setattr(settings, "SPILL_DIR", str(tmp_path))
+        df = self._wide()
+        rule = AggregationRule(
+            group_by=["key"],
+            aggregations=[
+                {"column": "value", "function": "avg", "alias": "avg"},
+                {"column": "value", "function": "count_distinct", "alias": "n"},
+            ],
+        )
+        agg = Aggregator(memory_budget_mb=1, spill_buckets=4)
+        chunks = [df.iloc[i : i + 20_000] for i in range(0, len(df), 20_000)]
+        result = agg.apply_chunks(chunks, rule)
+        assert agg.spilled
+        pd.testing.assert_frame_equal(result, Aggregator().apply(df, rule))
+
+    def test_non_decomposable_falls_back(self):
+        rule = AggregationRule(
+            group_by=["dept"],
+            aggregations=[{"column": "salary", "function": "median", "alias": "med"}],
+        )
+        result = Aggregator().apply(self._df(), rule)
+        assert result.set_index("dept").loc["eng", "med"] == 110.0
+        with pytest.raises(ValueError, match="chunks"):
+            Aggregator().apply_chunks([self._df()], rule)
+
 
 # ── DataValidator ─────────────────────────────────────────────────────────────
 
@@ -332,6 +563,35 @@ class TestDataValidator:
         valid, invalid, errors = DataValidator().validate(df, [rule])
         assert len(invalid) == 1
 
+    def test_regex_python_only_syntax_falls_back(self):
+        # Lookaheads aren't supported by Arrow's RE2 engine
+        df = pd.DataFrame({"pw": ["abc1", "abcd", "1234"]})
+        rule = ValidationRule(
+            column="pw",
+            rule_type=ValidationRuleType.REGEX,
+            params={"pattern": r"(?=.*\d)(?=.*[a-z])"},
+        )
+        valid, invalid, errors = DataValidator().validate(df, [rule])
+        assert valid["pw"].tolist() == ["abc1"]
+
+    def test_length_rules(self):
+        df = pd.DataFrame({"s": ["a", "abc", "abcdef"]})
+        rules = [
+            ValidationRule(
+                column="s",
+                rule_type=ValidationRuleType.MIN_LENGTH,
+                params={"min_length": 2},
+            ),
+            ValidationRule(
+                column="s",
+                rule_type=ValidationRuleType.MAX_LENGTH,
+                params={"max_length": 5},
+            ),
+        ]
+        valid, invalid, errors = DataValidator().validate(df, rules)
+        assert valid["s"].tolist() == ["abc"]
+        assert len(errors) == 2
+
     def test_allowed_values(self):
         df = pd.DataFrame({"status": ["active", "inactive", "deleted", "active"]})
         rule = ValidationRule(
@@ -342,6 +602,45 @@ class TestDataValidator:
         valid, invalid, errors = DataValidator().validate(df, [rule])
         assert len(invalid) == 1
 
+    def test_date_format(self):
+        df = pd.DataFrame({"d": ["2024-01-15", "15/01/2024", None, "2024-02-30"]})
+        rule = ValidationRule(
+            column="d",
+            rule_type=ValidationRuleType.DATE_FORMAT,
+            params={"format": "%Y-%m-%d"},
+        )
+        valid, invalid, errors = DataValidator().validate(df, [rule])
+        assert len(valid) == 2  # good date + null
+        assert sorted(e["row_index"] for e in errors) == [1, 3]
+
+    def test_date_format_treats_blank_cells_as_missing(self):
+        df = pd.DataFrame({"d": ["2024-01-15", "", "  ", "nope", None]})
+        rule = ValidationRule(
+            column="d",
+            rule_type=ValidationRuleType.DATE_FORMAT,
+            params={"format": "%Y-%m-%d"},
+        )
+        valid, invalid, errors = DataValidator().validate(df, [rule])
+        assert [e["row_index"] for e in errors] == [3]
+        assert len(valid) == 4
+
+    def test_errors_follow_rule_order(self):
+        rules = [
+            ValidationRule(column="name", rule_type=ValidationRuleType.NOT_NULL),
+            ValidationRule(column="email", rule_type=ValidationRuleType.EMAIL),
+            ValidationRule(
+                column="name",
+                rule_type=ValidationRuleType.MIN_LENGTH,
+                params={"min_length": 5},
+            ),
+        ]
+        validator = DataValidator()
+        valid, invalid, errors = validator.validate(self._df(), rules)
+        assert [e["rule"] for e in errors] == ["not_null", "email", "min_length"]
+        assert valid["name"].tolist() == ["Alice", "Charlie"]
+        views = {c["column"]: c["views"] for c in validator.plan.describe()["columns"]}
+        assert views == {"name": ["raw", "string"], "email": ["string"]}
+
     def test_custom_error_message(self):
         rule = ValidationRule(
             column="name",